@@ -0,0 +1,7 @@
+# PROJECT_ROOT: benchmarks/__init__.py
+"""
+Бенчмарки сборки дашборда (запуск из корня проекта)
+
+- synthetic - синтетические входные файлы заданного размера
+- bench_pipeline - время и пиковая память этапов main.py, результат в JSON
+"""
@@ -0,0 +1,338 @@
+# PROJECT_ROOT: benchmarks/bench_pipeline.py
+"""
+Бенчмарк сборки дашборда без браузера
+
+Повторяет этапы main.py на синтетических данных (benchmarks/synthetic.py)
+и измеряет каждый этап отдельно:
+
+    load_sales              load_sales_data: чтение входного файла (Excel - с записью кэша)
+    load_sales_cached       load_sales_data ещё раз: чтение из кэша Excel (только --format xlsx)
+    normalize_sales_schema
+    merge_store_area
+    enrich_with_checks
+    build_sales_cube
+    global_filters          GlobalFilters(df)
+    precompute_slices       precompute_slice_results(df)
+    build_tabs              графики и вкладки (DEA LP, декомпозиция рядов)
+    dashboard_engine        DashboardEngine(...)
+    generate_html           DashboardEngine.generate_html (в т.ч. потоковая
+                            сериализация данных columnar + base64)
+
+Время этапа - лучшее из repeat прогонов без трассировки памяти. Пиковая
+память (tracemalloc, прирост над памятью до этапа) снимается отдельным
+прогоном: трассировка замедляет pandas и исказила бы время.
+
+total_seconds - сборка от начала до конца с холодным кэшем: сумма этапов
+без load_sales_cached (это повтор загрузки). total_cached_seconds - то же
+при готовом кэше Excel (load_sales_cached вместо load_sales).
+
+Результат - JSON (окружение, параметры, размеры данных, этапы). С --baseline
+этапы сравниваются с прошлым результатом; замедление больше --threshold
+даёт код возврата 1.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_pipeline --stores 50 --products 100 --years 3
+    python -m benchmarks.bench_pipeline --grain day --format parquet
+    python -m benchmarks.bench_pipeline --baseline benchmarks/results/base.json
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import engine.data_processor as data_processor
+from engine.data_processor import (
+    load_sales_data, normalize_sales_schema, merge_store_area,
+    enrich_with_checks, build_sales_cube
+)
+from engine.dashboard import DashboardEngine
+from engine.filters import GlobalFilters
+from engine.analytics import precompute_slice_results
+from main import FILTER_CONFIG, build_tabs
+
+from benchmarks.synthetic import GRAINS, FILE_FORMATS, generate_inputs, write_inputs
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Этапы быстрее этого порога (секунды) не считаются регрессией: это шум таймера
+NOISE_FLOOR_SECONDS = 0.05
+
+# Повтор загрузки из кэша: не входит в total_seconds
+CACHED_STAGE = 'load_sales_cached'
+
+_MB = 1024 * 1024
+
+
+class StageRecorder:
+    """
+    Замер этапов: время (perf_counter) и, при trace_memory, пиковая память
+
+    Вывод этапов (print в data_processor, generate_html) подавляется.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+
+    def run(self, name: str, func, *args, **kwargs):
+        """
+        Выполняет этап и записывает его замер
+
+        Args:
+            name: имя этапа
+            func: функция этапа
+
+        Returns:
+            результат func
+        """
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            seconds = time.perf_counter() - start
+
+        record = {'seconds': seconds}
+        if self.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            record['peak_mb'] = (peak - baseline) / _MB
+        self.stages[name] = record
+        return result
+
+
+def run_pipeline(paths: dict, workdir: str, recorder: StageRecorder) -> dict:
+    """
+    Один прогон этапов main.py
+
+    Args:
+        paths: пути к входным файлам (write_inputs)
+        workdir: рабочий каталог (кэш Excel и HTML)
+        recorder: StageRecorder
+
+    Returns:
+        Размеры данных: {'sales_rows', 'cube_rows', 'data_json_chars', 'cube_json_chars', 'html_bytes'}
+    """
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        # Холодный старт: без кэша Excel на диске и файла чеков в памяти процесса
+        shutil.rmtree(data_processor.CACHE_DIR, ignore_errors=True)
+        data_processor._read_checks.cache_clear()
+        df = recorder.run('load_sales', load_sales_data, paths['sales'])
+        if paths['sales'].endswith('.xlsx'):
+            df = recorder.run(CACHED_STAGE, load_sales_data, paths['sales'])
+
+        df = recorder.run('normalize_sales_schema', normalize_sales_schema, df)
+        df = recorder.run('merge_store_area', merge_store_area, df, paths['store_area'])
+        df = recorder.run('enrich_with_checks', enrich_with_checks, df, paths['checks'])
+        cube = recorder.run('build_sales_cube', build_sales_cube, df)
+
+        filters = recorder.run('global_filters', GlobalFilters, df)
+        precomputed = recorder.run('precompute_slices', precompute_slice_results, df)
+        tabs = recorder.run('build_tabs', build_tabs, cube, filters.available_detail_levels)
+
+        engine = recorder.run(
+            'dashboard_engine', DashboardEngine, df, tabs=tabs, enable_context=False,
+            filter_config=FILTER_CONFIG, data_format='columnar', cube=cube, lazy_tabs=True,
+            precomputed_results=precomputed
+        )
+        html_path = recorder.run('generate_html', engine.generate_html,
+                                 os.path.join(workdir, 'dashboard.html'), binary_numeric=True)
+
+        return {
+            'sales_rows': len(df),
+            'cube_rows': len(cube),
+            'data_json_chars': engine.section_sizes.get('DATA_JSON', 0),
+            'cube_json_chars': engine.section_sizes.get('CUBE_JSON', 0),
+            'html_bytes': os.path.getsize(html_path),
+        }
+    finally:
+        os.chdir(cwd)
+
+
+def run_benchmark(stores: int = 20, products: int = 50, years: int = 3, types: int = 3,
+                  grain: str = 'month', seed: int = 42, repeat: int = 1,
+                  trace_memory: bool = True, workdir: str = None, file_format: str = 'xlsx') -> dict:
+    """
+    Бенчмарк на синтетических данных заданного размера
+
+    Args:
+        stores, products, years, types, grain, seed: параметры generate_inputs
+        file_format: формат входных файлов ('xlsx' | 'parquet', см. write_inputs)
+        repeat: число прогонов для времени (берётся лучший)
+        trace_memory: дополнительный прогон с tracemalloc для пиковой памяти
+        workdir: рабочий каталог (None - временный, удаляется после замера)
+
+    Returns:
+        Результат для JSON: environment, params, dataset, stages, total_seconds,
+        total_cached_seconds (только xlsx)
+    """
+    own_workdir = workdir is None
+    workdir = os.path.abspath(workdir or tempfile.mkdtemp(prefix='store_bench_'))
+    try:
+        start = time.perf_counter()
+        inputs = generate_inputs(stores, products, years, types=types, grain=grain, seed=seed)
+        paths = write_inputs(workdir, inputs, file_format)
+        setup_seconds = time.perf_counter() - start
+
+        runs = []
+        for _ in range(max(1, repeat)):
+            recorder = StageRecorder()
+            sizes = run_pipeline(paths, workdir, recorder)
+            runs.append(recorder.stages)
+
+        stages = {
+            name: {
+                'seconds': min(run[name]['seconds'] for run in runs),
+                'runs': [run[name]['seconds'] for run in runs],
+            }
+            for name in runs[0]
+        }
+
+        if trace_memory:
+            recorder = StageRecorder(trace_memory=True)
+            tracemalloc.start()
+            try:
+                run_pipeline(paths, workdir, recorder)
+            finally:
+                tracemalloc.stop()
+            for name, record in recorder.stages.items():
+                stages[name]['peak_mb'] = record['peak_mb']
+
+        total_seconds = sum(stage['seconds'] for name, stage in stages.items() if name != CACHED_STAGE)
+        result = {
+            'benchmark': 'pipeline',
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'environment': {
+                'python': platform.python_version(),
+                'pandas': pd.__version__,
+                'numpy': np.__version__,
+                'pyarrow': data_processor._HAS_PYARROW,
+                'platform': platform.platform(),
+            },
+            'params': {'stores': stores, 'products': products, 'years': years, 'types': types,
+                       'grain': grain, 'seed': seed, 'repeat': repeat, 'format': file_format},
+            'dataset': {
+                **sizes,
+                'checks_rows': len(inputs['checks']),
+                'input_bytes': {name: os.path.getsize(path) for name, path in paths.items()},
+                'setup_seconds': setup_seconds,
+            },
+            'stages': stages,
+            'total_seconds': total_seconds,
+        }
+        if CACHED_STAGE in stages:
+            result['total_cached_seconds'] = (
+                total_seconds - stages['load_sales']['seconds'] + stages[CACHED_STAGE]['seconds']
+            )
+        return result
+    finally:
+        if own_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def compare_results(result: dict, baseline: dict, threshold: float = 0.2) -> list:
+    """
+    Этапы, замедлившиеся относительно baseline
+
+    Args:
+        result: результат run_benchmark
+        baseline: прошлый результат (JSON)
+        threshold: допустимое относительное замедление (0.2 = +20%)
+
+    Returns:
+        [{'stage', 'seconds', 'baseline_seconds', 'ratio'}] - только регрессии
+    """
+    regressions = []
+    for name, stage in result['stages'].items():
+        base = baseline.get('stages', {}).get(name)
+        if not base:
+            continue
+        if max(stage['seconds'], base['seconds']) < NOISE_FLOOR_SECONDS:
+            continue
+        ratio = stage['seconds'] / max(base['seconds'], 1e-9)
+        if ratio > 1 + threshold:
+            regressions.append({'stage': name, 'seconds': stage['seconds'],
+                                'baseline_seconds': base['seconds'], 'ratio': ratio})
+    return regressions
+
+
+def format_report(result: dict) -> str:
+    """Таблица этапов для консоли"""
+    lines = [
+        f"Строк продаж: {result['dataset']['sales_rows']:,}, "
+        f"куба: {result['dataset']['cube_rows']:,}, "
+        f"HTML: {result['dataset']['html_bytes'] / _MB:.1f} МБ",
+        f"{'Этап':<26}{'Время, с':>12}{'Пик, МБ':>12}",
+    ]
+    for name, stage in result['stages'].items():
+        peak = f"{stage['peak_mb']:.1f}" if 'peak_mb' in stage else '-'
+        lines.append(f"{name:<26}{stage['seconds']:>12.3f}{peak:>12}")
+    lines.append(f"{'Итого':<26}{result['total_seconds']:>12.3f}")
+    if 'total_cached_seconds' in result:
+        lines.append(f"{'Итого (кэш Excel)':<26}{result['total_cached_seconds']:>12.3f}")
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Бенчмарк сборки дашборда на синтетических данных')
+    parser.add_argument('--stores', type=int, default=20)
+    parser.add_argument('--products', type=int, default=50)
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--types', type=int, default=3)
+    parser.add_argument('--grain', choices=GRAINS, default='month')
+    parser.add_argument('--format', choices=FILE_FORMATS, default='xlsx', dest='file_format',
+                        help='формат входных файлов (больше 1 048 575 строк - parquet)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=1, help='прогонов для времени (берётся лучший)')
+    parser.add_argument('--no-memory', action='store_true', help='без прогона с tracemalloc')
+    parser.add_argument('--workdir', help='каталог для входных файлов и HTML (по умолчанию временный)')
+    parser.add_argument('--output', help='JSON результата (по умолчанию benchmarks/results/...)')
+    parser.add_argument('--baseline', help='JSON прошлого результата для сравнения')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='допустимое замедление этапа относительно baseline (0.2 = +20%%)')
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args.stores, args.products, args.years, types=args.types,
+                           grain=args.grain, seed=args.seed,
+                           repeat=args.repeat, trace_memory=not args.no_memory,
+                           workdir=args.workdir, file_format=args.file_format)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR,
+        f'pipeline-{args.stores}x{args.products}x{args.years}-{args.grain}-{args.file_format}.json'
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print(format_report(result))
+    print(f"Результат: {output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_results(result, json.load(f), args.threshold)
+        for item in regressions:
+            print(f"РЕГРЕССИЯ {item['stage']}: {item['seconds']:.3f} с "
+                  f"(было {item['baseline_seconds']:.3f} с, x{item['ratio']:.2f})")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,288 @@
+# PROJECT_ROOT: benchmarks/synthetic.py
+"""
+Синтетические входные данные дашборда для бенчмарков и нагрузочных проверок
+
+Три таблицы в тех же форматах, что читает engine/data_processor:
+- продажи (final_flat_clean.xlsx): Магазин, Товар, Тип, Год, Месяц, суммы, чеки
+  (при зерне 'day' - ещё Дата: строка за каждый день). Пайплайн строки не
+  сводит: create_date_column заменяет Дату первым числом месяца по Год/Месяц,
+  и дневные строки остаются - до 31 строки на товар в месяце с одной датой.
+  Это нагрузка объёма строк (загрузка, фильтры, агрегации), а не дневной разрез
+- большие наборы пишутся в Parquet (--format parquet): load_sales_data читает
+  .parquet напрямую
+- площади (store.xlsx): Магазин, Торговая площадь магазина
+- чеки по типам (final_flat_clean_chek_type.xlsx, long-формат, всегда по месяцам):
+  Тип, Год, Месяц, Магазин, Чеки_по_типу (+ тип 'Всего')
+
+Параметры: магазины, товары, типы товаров, годы, зерно (месяц / день).
+Модель выручки: масштаб магазина (площадь) × доля товара × сезонность типа
+по месяцам × рост магазина год к году × день недели (зерно 'day') × шум.
+Часть магазинов открывается позже начала данных: до открытия строк нет,
+первые месяцы после открытия - разгон выручки.
+
+Таблицы строятся целиком на NumPy: строки - повтор пар магазин × период по
+товарам, измерения - Categorical из кодов, чеки по типам - bincount по
+кодам. Генератор детерминирован при одном seed; 10 млн строк продаж
+строятся за секунды (запись - Parquet, Excel ограничен 1 048 575 строками).
+
+Запуск из корня проекта:
+    python -m benchmarks.synthetic --stores 500 --products 300 --years 5 --format parquet --output data
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from engine.data_processor import MONTH_ORDER
+
+
+# Названия типов товаров (при types > len - 'Тип N')
+PRODUCT_TYPES = ['Товар', 'Скоропорт', 'Непрод', 'СП']
+
+# Тип строки общего числа чеков (см. get_total_checks)
+TOTAL_CHECKS_TYPE = 'Всего'
+
+# Имена файлов, которые читает main.py (для Parquet меняется расширение)
+SALES_FILE = 'final_flat_clean.xlsx'
+STORE_AREA_FILE = 'store.xlsx'
+CHECKS_FILE = 'final_flat_clean_chek_type.xlsx'
+
+GRAINS = ('month', 'day')
+FILE_FORMATS = ('xlsx', 'parquet')
+
+# Строк данных на листе Excel (без заголовка)
+EXCEL_MAX_ROWS = 1_048_575
+
+# Сезонность розницы по месяцам (январь - декабрь): провал в начале года,
+# пик в декабре. Амплитуда у каждого типа своя (0.5 - 1.5 от профиля)
+MONTH_SEASONALITY = np.array([0.85, 0.88, 0.97, 0.98, 1.00, 0.97,
+                              0.96, 0.98, 0.99, 1.02, 1.05, 1.35])
+
+# День недели (понедельник - воскресенье) для зерна 'day'
+WEEKDAY_FACTORS = np.array([0.92, 0.94, 0.96, 1.00, 1.10, 1.15, 0.93])
+
+# Месяцев разгона выручки после открытия магазина (постоянная экспоненты)
+RAMP_UP_MONTHS = 4
+
+
+def type_names(types: int) -> list:
+    """Названия types типов товаров"""
+    return [PRODUCT_TYPES[i] if i < len(PRODUCT_TYPES) else f'Тип {i + 1}' for i in range(types)]
+
+
+def _calendar(years: int, first_year: int, grain: str) -> dict:
+    """
+    Периоды данных
+
+    Returns:
+        {'month_index': номер месяца от начала (0..years*12-1), 'weekday': фактор
+         дня недели, 'dates': даты дней (None для зерна 'month')}
+    """
+    if grain == 'month':
+        month_index = np.arange(years * 12)
+        return {'month_index': month_index, 'weekday': np.ones(len(month_index)), 'dates': None}
+
+    dates = pd.date_range(f'{first_year}-01-01', f'{first_year + years - 1}-12-31', freq='D')
+    month_index = (dates.year.to_numpy() - first_year) * 12 + dates.month.to_numpy() - 1
+    return {
+        'month_index': month_index,
+        # Дневная выручка ~ месячная / число дней в месяце
+        'weekday': WEEKDAY_FACTORS[dates.weekday.to_numpy()] / dates.days_in_month.to_numpy(),
+        'dates': dates,
+    }
+
+
+def _categorical(codes: np.ndarray, categories) -> pd.Categorical:
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def generate_inputs(stores: int = 20, products: int = 50, years: int = 3, types: int = 3,
+                    grain: str = 'month', first_year: int = 2022, opening_share: float = 0.2,
+                    seed: int = 42) -> dict:
+    """
+    Генерирует три входные таблицы
+
+    Args:
+        stores: число магазинов
+        products: число товаров (каждый продаётся в каждом открытом магазине каждый период)
+        years: число лет подряд, начиная с first_year
+        types: число типов товаров (товар i получает тип i % types)
+        grain: 'month' - строка за месяц, 'day' - за день (колонка Дата)
+        first_year: первый год данных
+        opening_share: доля магазинов, открывшихся после начала данных
+        seed: seed генератора случайных чисел
+
+    Returns:
+        {'sales', 'store_area', 'checks'} - DataFrame в форматах исходных файлов
+        (измерения продаж - Categorical)
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"Неизвестное зерно данных: {grain}")
+
+    rng = np.random.default_rng(seed)
+    n_months = years * 12
+    calendar = _calendar(years, first_year, grain)
+    month_index = calendar['month_index']
+
+    store_names = [f'Магазин {i}' for i in range(1, stores + 1)]
+    product_names = [f'Товар {i}' for i in range(1, products + 1)]
+    product_type = np.arange(products) % types
+
+    # Магазины: площадь, масштаб выручки, рост год к году, средний чек, месяц открытия
+    area = rng.integers(100, 600, size=stores).astype(float)
+    store_scale = area * rng.uniform(80, 160, size=stores)
+    growth = rng.normal(0.05, 0.05, size=stores)
+    avg_check = rng.uniform(300, 900, size=stores)
+    opening = np.where(rng.random(stores) < opening_share,
+                       rng.integers(1, max(2, n_months * 3 // 4), size=stores), 0)
+
+    # Пары магазин × период, где магазин уже открыт (по магазинам, затем по времени)
+    open_mask = month_index[None, :] >= opening[:, None]
+    pair_store, pair_period = np.nonzero(open_mask)
+    pair_month = month_index[pair_period]
+    age = pair_month - opening[pair_store]
+    ramp = np.where(opening[pair_store] > 0, 1 - 0.5 * np.exp(-age / RAMP_UP_MONTHS), 1.0)
+    pair_factor = (store_scale[pair_store] * ramp * calendar['weekday'][pair_period]
+                   * (1 + growth[pair_store]) ** (pair_month / 12))
+
+    # Строки: каждая пара повторяется по всем товарам
+    store_idx = np.repeat(pair_store, products)
+    period_idx = np.repeat(pair_period, products)
+    row_month = np.repeat(pair_month, products)
+    product_idx = np.tile(np.arange(products, dtype=np.int32), len(pair_store))
+    row_type = product_type[product_idx]
+    n_rows = len(store_idx)
+
+    # Сезонность: профиль месяца с амплитудой типа
+    amplitude = rng.uniform(0.5, 1.5, size=types)
+    seasonality = 1 + amplitude[:, None] * (MONTH_SEASONALITY[None, :] - 1)    # (types, 12)
+    product_share = rng.dirichlet(np.ones(products)) * products
+
+    revenue = (np.repeat(pair_factor, products) * product_share[product_idx]
+               * seasonality[row_type, row_month % 12] * rng.lognormal(0.0, 0.25, size=n_rows))
+    margin = rng.uniform(0.2, 0.4, size=products)[product_idx]
+    checks = np.maximum(1, np.round(revenue / (avg_check[store_idx] * rng.uniform(0.8, 1.2, size=n_rows))))
+
+    sales = pd.DataFrame({
+        'Магазин': _categorical(store_idx, store_names),
+        'Товар': _categorical(product_idx, product_names),
+        'Тип': _categorical(row_type, type_names(types)),
+        'Год': first_year + row_month // 12,
+        'Месяц': _categorical(row_month % 12, MONTH_ORDER),
+        'Сумма в чеке': revenue.round(2),
+        'Наценка продажи в чеке': (revenue * margin).round(2),
+        'Себестоимость продажи в чеке': (revenue * (1 - margin)).round(2),
+        'Число чеков': checks.astype('int64'),
+        'Количество в чеке': rng.uniform(1, 5, size=n_rows).round(3),
+    })
+    if calendar['dates'] is not None:
+        sales.insert(5, 'Дата', calendar['dates'][period_idx])
+
+    store_area = pd.DataFrame({'Магазин': store_names, 'Торговая площадь магазина': area})
+
+    # Чеки по типам за месяц: сумма чеков товаров типа (bincount по коду
+    # тип × месяц × магазин), 'Всего' - меньше суммы типов (один чек
+    # содержит товары разных типов)
+    cell = (row_type * n_months + row_month) * stores + store_idx
+    by_type = np.bincount(cell, weights=checks, minlength=types * n_months * stores)
+    present = np.bincount(cell, minlength=types * n_months * stores) > 0
+    cell_type, cell_month, cell_store = np.unravel_index(np.flatnonzero(present), (types, n_months, stores))
+
+    total = by_type.reshape(types, n_months * stores).sum(axis=0)
+    total_cells = np.flatnonzero(total > 0)
+    total_month, total_store = np.unravel_index(total_cells, (n_months, stores))
+    total_checks = np.round(total[total_cells] * rng.uniform(0.6, 0.8, size=len(total_cells)))
+
+    all_types = type_names(types) + [TOTAL_CHECKS_TYPE]
+    check_month = np.concatenate([cell_month, total_month])
+    checks_by_type = pd.DataFrame({
+        'Тип': _categorical(np.concatenate([cell_type, np.full(len(total_cells), types)]), all_types),
+        'Год': first_year + check_month // 12,
+        'Месяц': _categorical(check_month % 12, MONTH_ORDER),
+        'Магазин': _categorical(np.concatenate([cell_store, total_store]), store_names),
+        'Чеки_по_типу': np.concatenate([by_type[present], total_checks]).astype('int64'),
+    })
+
+    return {'sales': sales, 'store_area': store_area, 'checks': checks_by_type}
+
+
+def input_paths(directory: str, file_format: str = 'xlsx') -> dict:
+    """
+    Пути входных файлов в каталоге
+
+    Args:
+        directory: каталог
+        file_format: 'xlsx' или 'parquet' (меняется расширение)
+
+    Returns:
+        {'sales', 'store_area', 'checks'} - пути
+    """
+    if file_format not in FILE_FORMATS:
+        raise ValueError(f"Неизвестный формат файлов: {file_format}")
+    names = {'sales': SALES_FILE, 'store_area': STORE_AREA_FILE, 'checks': CHECKS_FILE}
+    return {
+        name: os.path.join(directory, f'{os.path.splitext(file_name)[0]}.{file_format}')
+        for name, file_name in names.items()
+    }
+
+
+def write_inputs(directory: str, inputs: dict, file_format: str = 'xlsx') -> dict:
+    """
+    Записывает таблицы generate_inputs под именами, которые читает main.py
+
+    Args:
+        directory: каталог для файлов (создаётся при необходимости)
+        inputs: результат generate_inputs
+        file_format: 'xlsx' (читается пайплайном как есть) или 'parquet'
+            (большие наборы: Excel медленный и ограничен EXCEL_MAX_ROWS строками)
+
+    Returns:
+        {'sales', 'store_area', 'checks'} - пути к файлам
+    """
+    paths = input_paths(directory, file_format)
+    if file_format == 'xlsx':
+        too_long = [name for name in paths if len(inputs[name]) > EXCEL_MAX_ROWS]
+        if too_long:
+            raise ValueError(f"Больше {EXCEL_MAX_ROWS:,} строк для Excel: {too_long}, используйте parquet")
+
+    os.makedirs(directory, exist_ok=True)
+    for name, path in paths.items():
+        if file_format == 'parquet':
+            inputs[name].to_parquet(path, index=False)
+        else:
+            inputs[name].to_excel(path, index=False)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Синтетические входные данные дашборда')
+    parser.add_argument('--stores', type=int, default=20)
+    parser.add_argument('--products', type=int, default=50)
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--types', type=int, default=3)
+    parser.add_argument('--grain', choices=GRAINS, default='month')
+    parser.add_argument('--first-year', type=int, default=2022)
+    parser.add_argument('--opening-share', type=float, default=0.2,
+                        help='доля магазинов, открывшихся после начала данных')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--format', choices=FILE_FORMATS, default='xlsx')
+    parser.add_argument('--output', default='.', help='каталог для файлов')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    inputs = generate_inputs(args.stores, args.products, args.years, types=args.types,
+                             grain=args.grain, first_year=args.first_year,
+                             opening_share=args.opening_share, seed=args.seed)
+    generated = time.perf_counter()
+    paths = write_inputs(args.output, inputs, args.format)
+    written = time.perf_counter()
+
+    for name, path in paths.items():
+        print(f"{path}: {len(inputs[name]):,} строк")
+    print(f"Генерация: {generated - start:.2f} с, запись: {written - generated:.2f} с")
+
+
+if __name__ == '__main__':
+    main()
@@ -30,6 +30,19 @@ class BaseChart:
         'hovermode': 'x unified'
     }
 
+    # Измерения глобальных фильтров, от которых зависит график:
+    # 'magazines', 'years', 'months', 'productTypes', 'products', 'area', 'date'.
+    # None - все измерения; пустой кортеж - график строится по rawData и фильтры не учитывает.
+    # При изменении только остальных измерений график не перерисовывается (см. updateAllCharts)
+    FILTER_DIMENSIONS = None
+
+    # Отрисовка точечных и линейных трасс (type 'scatter'):
+    # 'svg' - всегда SVG, 'webgl' - всегда scattergl,
+    # 'auto' - scattergl, если точек в таких трассах больше WEBGL_POINT_THRESHOLD
+    RENDER_BACKENDS = ('svg', 'webgl', 'auto')
+    RENDER_BACKEND = 'svg'
+    WEBGL_POINT_THRESHOLD = 2000
+
     def __init__(
             self,
             chart_id: str,
@@ -43,7 +56,9 @@ class BaseChart:
             show_prompt: bool = True,
             ai_view_mode: Optional[str] = None,
             ai_max_lines: Optional[int] = None,
-            ai_context_config: Optional[Dict[str, bool]] = None
+            ai_context_config: Optional[Dict[str, bool]] = None,
+            render_backend: Optional[str] = None,
+            webgl_threshold: Optional[int] = None
     ):
         """
         Инициализация графика
@@ -62,6 +77,10 @@ class BaseChart:
             ai_max_lines: Количество строк при collapsed режиме
             ai_context_config: Конфигурация AI-контекста для этого графика
                 {'company_context': True, 'filters_context': True, 'dashboard_metrics': True}
+            render_backend: Отрисовка scatter-трасс: 'svg', 'webgl' или 'auto'
+                (по умолчанию RENDER_BACKEND класса)
+            webgl_threshold: Число точек, с которого 'auto' переключается на scattergl
+                (по умолчанию WEBGL_POINT_THRESHOLD)
         """
         # Загружаем настройки из конфига если не переданы
         from charts.chart_config import GLOBAL_SETTINGS, get_chart_config
@@ -94,6 +113,11 @@ class BaseChart:
         if ai_context_config:
             self.ai_context_config.update(ai_context_config)
 
+        self.render_backend = render_backend or self.RENDER_BACKEND
+        if self.render_backend not in self.RENDER_BACKENDS:
+            raise ValueError(f"Неизвестный способ отрисовки: {self.render_backend}")
+        self.webgl_threshold = webgl_threshold if webgl_threshold is not None else self.WEBGL_POINT_THRESHOLD
+
         # Хранилище для контекста (будет установлен из DashboardEngine)
         self.analysis_context = None
 
@@ -1132,6 +1156,40 @@ class BaseChart:
         }}
         '''
 
+    def _generate_render_js(self) -> str:
+        """
+        Генерирует JS функцию отрисовки графика renderPlot_{chart_id}(traces, layout, config).
+
+        Отрисовка через PlotRenderer (engine/plot_renderer.py): повторные вызовы
+        с тем же набором трасс - restyle/relayout только изменившихся свойств,
+        вместо пересоздания графика. scatter-трассы рисуются через WebGL
+        (scattergl) по render_backend / webgl_threshold.
+
+        Returns:
+            JS код функции
+        """
+        options = json.dumps({'backend': self.render_backend, 'threshold': self.webgl_threshold})
+        return f'''
+        function renderPlot_{self.chart_id}(traces, layout, config) {{
+            return PlotRenderer.render('{self.chart_id}', traces, layout, config || {{responsive: true}}, {options});
+        }}
+        '''
+
+    def _generate_filter_dimensions_js(self) -> str:
+        """
+        Генерирует JS регистрацию измерений фильтров графика (FILTER_DIMENSIONS)
+
+        Returns:
+            JS код или пустая строка, если график зависит от всех измерений
+        """
+        if self.FILTER_DIMENSIONS is None:
+            return ''
+        dimensions_json = json.dumps(list(self.FILTER_DIMENSIONS))
+        return f'''
+        window.chartFilterDimensions = window.chartFilterDimensions || {{}};
+        window.chartFilterDimensions['{self.chart_id}'] = {dimensions_json};
+        '''
+
     def _generate_local_filters_js(self) -> str:
         """
         Генерирует JS код для работы локальных фильтров
@@ -1239,11 +1297,7 @@ class BaseChart:
         if not self.show_table and not self.show_prompt:
             return ""
 
-        natural_sort_js = self._get_natural_sort_js()
-
         return f'''
-        {natural_sort_js}
-
         function toggleView_{self.chart_id}(view) {{
             const chartDiv = document.getElementById('{self.chart_id}');
             const tableDiv = document.getElementById('{self.chart_id}_table');
@@ -1298,56 +1352,30 @@ class BaseChart:
             html += '<div class="table-info">' + (isTransposed_{self.chart_id} ? 'Транспонированный' : 'Строк: ' + tableData.length) + '</div>';
             html += '<div class="export-buttons">';
             html += '<button class="transpose-btn' + (isTransposed_{self.chart_id} ? ' active' : '') + '" onclick="transposeTable_{self.chart_id}()">⇄ Транспонировать</button>';
-            html += '<button class="export-btn" onclick="exportTableToCSV_{self.chart_id}()">📥 CSV</button>';
-            html += '<button class="export-btn" onclick="exportTableToExcel_{self.chart_id}()">📊 Excel</button>';
+            html += '<button class="export-btn" onclick="exportTableToCSV_{self.chart_id}(this)">📥 CSV</button>';
+            html += '<button class="export-btn" onclick="exportTableToExcel_{self.chart_id}(this)">📊 Excel</button>';
             html += '</div>';
             html += '</div>';
+            html += '<div class="table-scroll-wrapper"></div>';
 
-            html += '<div class="table-scroll-wrapper">';
-            html += '<table class="chart-table">';
-
-            const columns = Object.keys(tableData[0]);
+            const tableDiv = document.getElementById('{self.chart_id}_table');
+            tableDiv.innerHTML = html;
 
-            if (isTransposed_{self.chart_id}) {{
-                // Транспонированный режим
-                columns.forEach(col => {{
-                    html += '<tr>';
-                    html += '<th>' + col + '</th>';
-                    tableData.forEach(row => {{
-                        const value = row[col];
-                        const displayValue = typeof value === 'number' ? value.toLocaleString('ru-RU') : value;
-                        html += '<td>' + displayValue + '</td>';
-                    }});
-                    html += '</tr>';
-                }});
-            }} else {{
-                // Обычный режим
-                html += '<thead><tr>';
-                columns.forEach(col => {{
+            // Рисуются только видимые строки (см. engine/virtual_table.py)
+            VirtualTable.render(tableDiv.querySelector('.table-scroll-wrapper'), {{
+                rows: tableData,
+                transposed: isTransposed_{self.chart_id},
+                headerCell: col => {{
                     const sortIndicator = currentSortColumn_{self.chart_id} === col
                         ? (currentSortOrder_{self.chart_id} === 'asc' ? ' ▲' : ' ▼')
                         : '';
-                    html += '<th onclick="sortTable_{self.chart_id}(\\'' + col + '\\')">' + col + sortIndicator + '</th>';
-                }});
-                html += '</tr></thead>';
-
-                html += '<tbody>';
-                tableData.forEach(row => {{
-                    html += '<tr>';
-                    columns.forEach(col => {{
-                        const value = row[col];
-                        const displayValue = typeof value === 'number' ? value.toLocaleString('ru-RU') : value;
-                        html += '<td>' + displayValue + '</td>';
-                    }});
-                    html += '</tr>';
-                }});
-                html += '</tbody>';
-            }}
-
-            html += '</table>';
-            html += '</div>';
-
-            document.getElementById('{self.chart_id}_table').innerHTML = html;
+                    return '<th onclick="sortTable_{self.chart_id}(\\'' + col + '\\')">' + col + sortIndicator + '</th>';
+                }},
+                cell: (row, col) => {{
+                    const value = row[col];
+                    return typeof value === 'number' ? value.toLocaleString('ru-RU') : value;
+                }}
+            }});
         }}
 
         function transposeTable_{self.chart_id}() {{
@@ -1363,76 +1391,25 @@ class BaseChart:
                 currentSortOrder_{self.chart_id} = 'asc';
             }}
 
-            const tableData = getTableData_{self.chart_id}();
-            tableData.sort((a, b) => {{
-                let aVal = a[column];
-                let bVal = b[column];
-
-                if (typeof aVal === 'number' && typeof bVal === 'number') {{
-                    return currentSortOrder_{self.chart_id} === 'asc' ? aVal - bVal : bVal - aVal;
-                }} else if (column === 'Период' && typeof aVal === 'string' && typeof bVal === 'string') {{
-                    // Специальная сортировка для дат в формате DD.MM.YYYY
-                    const parseDate = (dateStr) => {{
-                        const parts = dateStr.split('.');
-                        if (parts.length === 3) {{
-                            return new Date(parts[2], parts[1] - 1, parts[0]);
-                        }}
-                        return new Date(0);
-                    }};
-                    const dateA = parseDate(aVal);
-                    const dateB = parseDate(bVal);
-                    return currentSortOrder_{self.chart_id} === 'asc' ? dateA - dateB : dateB - dateA;
-                }} else {{
-                    const comparison = naturalSort(aVal, bVal);
-                    return currentSortOrder_{self.chart_id} === 'asc' ? comparison : -comparison;
-                }}
-            }});
-
-            // Перезаписываем результат getTableData
-            window.sortedTableData_{self.chart_id} = tableData;
+            // Сортировка по типизированным ключам колонки (даты DD.MM.YYYY - по порядку дат)
+            window.sortedTableData_{self.chart_id} = VirtualTable.sortRows(
+                getTableData_{self.chart_id}(), column, currentSortOrder_{self.chart_id});
             generateTable_{self.chart_id}();
         }}
 
-        function exportTableToCSV_{self.chart_id}() {{
+        function exportTableToCSV_{self.chart_id}(button) {{
             const tableData = window.sortedTableData_{self.chart_id} || getTableData_{self.chart_id}();
             if (!tableData || tableData.length === 0) return;
 
-            const columns = Object.keys(tableData[0]);
-            let csv = columns.join(',') + '\\n';
-
-            tableData.forEach(row => {{
-                const values = columns.map(col => {{
-                    const value = row[col];
-                    return typeof value === 'string' && value.includes(',') ? '"' + value + '"' : value;
-                }});
-                csv += values.join(',') + '\\n';
-            }});
-
-            const blob = new Blob([csv], {{ type: 'text/csv;charset=utf-8;' }});
-            const link = document.createElement('a');
-            link.href = URL.createObjectURL(blob);
-            link.download = '{self.chart_id}_data.csv';
-            link.click();
+            // Порциями в Blob, с прогрессом на кнопке (см. engine/table_export.py)
+            TableExport.toCSV(tableData, {{ fileName: '{self.chart_id}_data', button: button }});
         }}
 
-        function exportTableToExcel_{self.chart_id}() {{
+        function exportTableToExcel_{self.chart_id}(button) {{
             const tableData = window.sortedTableData_{self.chart_id} || getTableData_{self.chart_id}();
             if (!tableData || tableData.length === 0) return;
 
-            const columns = Object.keys(tableData[0]);
-            let html = '<table>';
-            html += '<tr>' + columns.map(col => '<th>' + col + '</th>').join('') + '</tr>';
-
-            tableData.forEach(row => {{
-                html += '<tr>' + columns.map(col => '<td>' + row[col] + '</td>').join('') + '</tr>';
-            }});
-            html += '</table>';
-
-            const blob = new Blob([html], {{ type: 'application/vnd.ms-excel' }});
-            const link = document.createElement('a');
-            link.href = URL.createObjectURL(blob);
-            link.download = '{self.chart_id}_data.xls';
-            link.click();
+            TableExport.toExcel(tableData, {{ fileName: '{self.chart_id}_data', button: button }});
         }}
 
         function loadPrompt_{self.chart_id}() {{
@@ -1549,40 +1526,3 @@ class BaseChart:
             loadPrompt_{self.chart_id}();
         }}
         '''
-
-    def _get_natural_sort_js(self) -> str:
-        """
-        Генерирует JavaScript функцию для естественной сортировки
-        (правильная сортировка текста с числами: Магазин 1, Магазин 2, ..., Магазин 10)
-
-        Returns:
-            JS код функции naturalSort
-        """
-        return '''
-        function naturalSort(a, b) {
-            const regex = /(\\d+)|(\\D+)/g;
-            const aParts = String(a).match(regex) || [];
-            const bParts = String(b).match(regex) || [];
-
-            for (let i = 0; i < Math.max(aParts.length, bParts.length); i++) {
-                const aPart = aParts[i] || '';
-                const bPart = bParts[i] || '';
-
-                const aNum = parseInt(aPart);
-                const bNum = parseInt(bPart);
-
-                // Оба части - числа
-                if (!isNaN(aNum) && !isNaN(bNum)) {
-                    if (aNum !== bNum) return aNum - bNum;
-                }
-                // Обычная строковая сортировка
-                else {
-                    if (aPart !== bPart) {
-                        return aPart.localeCompare(bPart);
-                    }
-                }
-            }
-
-            return 0;
-        }
-        '''
@@ -183,19 +183,13 @@ class ChartAreaPerformance(BaseChart):
                 return;
             }}
 
-            const columns = Object.keys(tableData[0]);
-            let html = '<div class="table-scroll-wrapper"><table class="chart-table">';
-            html += '<thead><tr>' + columns.map(c => '<th>' + c + '</th>').join('') + '</tr></thead>';
-            html += '<tbody>';
-            tableData.forEach(row => {{
-                html += '<tr>' + columns.map(c => {{
+            VirtualTable.render('{self.chart_id}_table', {{
+                rows: tableData,
+                cell: (row, c) => {{
                     const val = row[c];
-                    return '<td>' + (typeof val === 'number' ? val.toLocaleString('ru-RU') : val) + '</td>';
-                }}).join('') + '</tr>';
+                    return typeof val === 'number' ? val.toLocaleString('ru-RU') : val;
+                }}
             }});
-            html += '</tbody></table></div>';
-
-            document.getElementById('{self.chart_id}_table').innerHTML = html;
         }}
 
         /**
@@ -421,7 +415,7 @@ class ChartAreaPerformance(BaseChart):
                 modeBarButtonsToRemove: ['lasso2d', 'select2d']
             }};
 
-            Plotly.react('{self.chart_id}', [trace], layout, config);
+            renderPlot_{self.chart_id}([trace], layout, config);
 
             // Обновляем таблицу если открыта
             const tableDiv = document.getElementById('{self.chart_id}_table');
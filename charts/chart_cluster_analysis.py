@@ -4,6 +4,8 @@
 - Box-plot по кластерам (Малые, Средние, Крупные)
 - Отметки лидеров в каждом кластере
 - Статистика по кластерам
+- Метод k-means++: кластеры по выручке/м², наценке, среднему чеку и росту,
+  число кластеров - вручную или по силуэту (см. engine/analytics/kmeans.py)
 """
 from charts.base_chart import BaseChart
 
@@ -26,8 +28,14 @@ class ChartClusterAnalysis(BaseChart):
             ('profitPerM2', 'Прибыль/м²')
         ]
 
-        # Количество кластеров
-        self.cluster_options = [2, 3, 4]
+        # Метод кластеризации
+        self.method_options = [
+            ('area', 'По площади (квантили)'),
+            ('kmeans', 'k-means++ (выручка/м², наценка, чек, рост)')
+        ]
+
+        # Количество кластеров ('auto' - по силуэту; для метода по площади - не больше 4)
+        self.cluster_options = [2, 3, 4, 5, 6, 'auto']
 
         super().__init__(chart_id=chart_id, **kwargs)
 
@@ -38,8 +46,18 @@ class ChartClusterAnalysis(BaseChart):
             for val, label in self.metric_options
         ])
 
+        method_html = ''.join([
+            f'<option value="{val}"{" selected" if val == "area" else ""}>{label}</option>'
+            for val, label in self.method_options
+        ])
+
+        def cluster_label(n):
+            if n == 'auto':
+                return 'Авто (силуэт)'
+            return f'{n} кластера' if n < 5 else f'{n} кластеров'
+
         cluster_html = ''.join([
-            f'<option value="{n}"{" selected" if n == 3 else ""}>{n} кластера</option>'
+            f'<option value="{n}"{" selected" if n == 3 else ""}>{cluster_label(n)}</option>'
             for n in self.cluster_options
         ])
 
@@ -51,6 +69,12 @@ class ChartClusterAnalysis(BaseChart):
                     {metric_html}
                 </select>
             </div>
+            <div class="selector-group" style="display: flex; align-items: center; gap: 8px;">
+                <label style="font-weight: 500; font-size: 13px; color: #495057;">Метод:</label>
+                <select id="{self.chart_id}_method" onchange="update{self.chart_id}()" style="padding: 6px 12px; border: 1px solid #ced4da; border-radius: 6px; font-size: 13px; background: white;">
+                    {method_html}
+                </select>
+            </div>
             <div class="selector-group" style="display: flex; align-items: center; gap: 8px;">
                 <label style="font-weight: 500; font-size: 13px; color: #495057;">Кластеры:</label>
                 <select id="{self.chart_id}_clusters" onchange="update{self.chart_id}()" style="padding: 6px 12px; border: 1px solid #ced4da; border-radius: 6px; font-size: 13px; background: white;">
@@ -183,49 +207,29 @@ class ChartClusterAnalysis(BaseChart):
             }}
 
             const sortState = window.tableSortState_{self.chart_id};
-            const sortedData = [...allStoresData];
-
-            if (sortState.column) {{
-                sortedData.sort((a, b) => {{
-                    let valA = a[sortState.column];
-                    let valB = b[sortState.column];
-                    if (typeof valA === 'number' && typeof valB === 'number') {{
-                        return sortState.direction === 'asc' ? valA - valB : valB - valA;
-                    }}
-                    // Натуральная сортировка для строк (Магазин 1, 2, ... 10, 11)
-                    const cmp = window.naturalCompare ? window.naturalCompare(valA, valB) : String(valA || '').localeCompare(String(valB || ''), 'ru');
-                    return sortState.direction === 'asc' ? cmp : -cmp;
-                }});
-            }}
-
-            const columns = ['Магазин', 'Площадь', 'Выручка/м²', 'Прибыль/м²', 'Кластер', 'Статус'];
-            let html = '<div class="table-scroll-wrapper"><table class="chart-table">';
-
-            html += '<thead><tr>' + columns.map((c, idx) => {{
-                const isActive = sortState.column === c;
-                const arrow = isActive ? (sortState.direction === 'asc' ? ' ↑' : ' ↓') : '';
-                const style = 'cursor: pointer; user-select: none;' + (isActive ? ' background: #e3f2fd;' : '');
-                return `<th style="${{style}}" data-col-idx="${{idx}}" class="sortable-header-{self.chart_id}">${{c}}${{arrow}}</th>`;
-            }}).join('') + '</tr></thead>';
+            const sortedData = VirtualTable.sortRows(allStoresData, sortState.column, sortState.direction);
 
+            const columns = Object.keys(allStoresData[0]);
             window.tableColumns_{self.chart_id} = columns;
 
-            html += '<tbody>';
-            sortedData.forEach(row => {{
-                const isLeader = row['Статус'] === '★ Лидер';
-                const rowStyle = isLeader ? 'background: #fff3cd; font-weight: 500;' : '';
-                html += `<tr style="${{rowStyle}}">` + columns.map(c => {{
-                    const val = row[c];
-                    let cellContent = typeof val === 'number' ? val.toLocaleString('ru-RU') : (val || '-');
-                    if (c === 'Статус' && isLeader) {{
-                        cellContent = `<span style="color: #d4a106;">${{cellContent}}</span>`;
+            VirtualTable.render('{self.chart_id}_table', {{
+                rows: sortedData,
+                columns: columns,
+                headerCell: (c, idx) => {{
+                    const isActive = sortState.column === c;
+                    const arrow = isActive ? (sortState.direction === 'asc' ? ' ↑' : ' ↓') : '';
+                    const style = 'cursor: pointer; user-select: none;' + (isActive ? ' background: #e3f2fd;' : '');
+                    return `<th style="${{style}}" data-col-idx="${{idx}}" class="sortable-header-{self.chart_id}">${{c}}${{arrow}}</th>`;
+                }},
+                rowStyle: row => row['Статус'] === '★ Лидер' ? 'background: #fff3cd; font-weight: 500;' : '',
+                cell: (row, c) => {{
+                    const cellContent = VirtualTable.formatValue(row[c]);
+                    if (c === 'Статус' && row['Статус'] === '★ Лидер') {{
+                        return `<span style="color: #d4a106;">${{cellContent}}</span>`;
                     }}
-                    return '<td>' + cellContent + '</td>';
-                }}).join('') + '</tr>';
+                    return cellContent;
+                }}
             }});
-            html += '</tbody></table></div>';
-
-            document.getElementById('{self.chart_id}_table').innerHTML = html;
         }}
 
         function sortTable_{self.chart_id}(column) {{
@@ -253,28 +257,17 @@ class ChartClusterAnalysis(BaseChart):
         /**
          * Агрегация данных по магазинам
          */
-        function aggregateStoreData_{self.chart_id}(data) {{
-            const storeMap = {{}};
-
-            data.forEach(row => {{
-                const store = row['Магазин'];
-                const area = parseFloat(row['Торговая площадь магазина']) || 0;
-                const revenue = parseFloat(row['Сумма в чеке']) || 0;
-                const profit = parseFloat(row['Наценка продажи в чеке']) || 0;
-
-                if (!storeMap[store]) {{
-                    storeMap[store] = {{
-                        store: store,
-                        area: area,
-                        revenue: 0,
-                        profit: 0
-                    }};
-                }}
-                storeMap[store].revenue += revenue;
-                storeMap[store].profit += profit;
-            }});
-
-            return Object.values(storeMap).map(s => {{
+        function aggregateStoreData_{self.chart_id}() {{
+            // Суммы по магазинам из общего агрегатора (один проход на состояние фильтров)
+            const stores = groupBy(['Магазин'], Aggregator.STORE_TOTALS).map(g => ({{
+                store: g['Магазин'],
+                area: g.area,
+                revenue: g.revenue,
+                profit: g.profit,
+                cost: g.cost
+            }}));
+
+            return stores.map(s => {{
                 const revenuePerM2 = s.area > 0 ? Math.round(s.revenue / s.area) : 0;
                 const profitPerM2 = s.area > 0 ? Math.round(s.profit / s.area) : 0;
                 return {{
@@ -290,6 +283,7 @@ class ChartClusterAnalysis(BaseChart):
 
         /**
          * Разбиение на кластеры по квантилям площади
+         * (копии магазинов: результаты с разным k хранятся в кэше одновременно)
          */
         function assignClusters_{self.chart_id}(storeData, numClusters) {{
             const sorted = [...storeData].sort((a, b) => a.area - b.area);
@@ -303,12 +297,10 @@ class ChartClusterAnalysis(BaseChart):
 
             const clusterSize = Math.ceil(n / numClusters);
 
-            sorted.forEach((store, idx) => {{
+            return sorted.map((store, idx) => {{
                 const clusterIdx = Math.min(Math.floor(idx / clusterSize), numClusters - 1);
-                store.cluster = clusterNames[clusterIdx];
+                return Object.assign({{}}, store, {{ cluster: clusterNames[clusterIdx] }});
             }});
-
-            return sorted;
         }}
 
         /**
@@ -365,11 +357,317 @@ class ChartClusterAnalysis(BaseChart):
             return stats;
         }}
 
+        // ========== K-MEANS++ ПО НЕСКОЛЬКИМ ПРИЗНАКАМ ==========
+        // Те же алгоритм, генератор и константы, что в engine/analytics/kmeans.py
+
+        const kmeansConfig_{self.chart_id} = {{
+            features: ['revenuePerM2', 'margin', 'avgCheck', 'growth'],
+            seed: 42,
+            nInit: 4,
+            maxIter: 100,
+            autoK: [2, 6],
+            areaK: [2, 4],
+            tieTolerance: 1e-12
+        }};
+
+        /**
+         * Генератор псевдослучайных чисел mulberry32 (детерминирован по seed)
+         */
+        function mulberry32_{self.chart_id}(seed) {{
+            let state = seed >>> 0;
+            return function () {{
+                state = (state + 0x6D2B79F5) >>> 0;
+                let t = Math.imul(state ^ (state >>> 15), state | 1);
+                t = ((t + Math.imul(t ^ (t >>> 7), t | 61)) ^ t) >>> 0;
+                return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+            }};
+        }}
+
+        /**
+         * Признаки магазинов: наценка %, средний чек, рост выручки %
+         * (последние h месяцев к предыдущим h, h = min(12, половина месяцев периода))
+         */
+        function clusterFeatures_{self.chart_id}(storeData) {{
+            const checks = {{}};
+            groupBy(['Магазин'], {{ checks: {{ column: 'Число чеков', op: 'checks' }} }}).forEach(g => {{
+                checks[g['Магазин']] = g.checks;
+            }});
+
+            const monthly = groupBy(['@period', 'Магазин'], {{ revenue: 'Сумма в чеке' }}).map(g => {{
+                return {{ period: g['@period'], store: g['Магазин'], revenue: g.revenue }};
+            }});
+            const months = [...new Set(monthly.map(m => m.period))].sort((a, b) => a - b);
+            const h = Math.min(12, Math.floor(months.length / 2));
+            const recentFrom = h > 0 ? months[months.length - h] : Infinity;
+            const previousFrom = h > 0 ? months[months.length - 2 * h] : Infinity;
+            const recent = {{}};
+            const previous = {{}};
+            monthly.forEach(m => {{
+                if (m.period >= recentFrom) recent[m.store] = (recent[m.store] || 0) + m.revenue;
+                else if (m.period >= previousFrom) previous[m.store] = (previous[m.store] || 0) + m.revenue;
+            }});
+
+            return storeData.map(s => {{
+                const storeChecks = checks[s.store] || 0;
+                const prev = previous[s.store] || 0;
+                return Object.assign({{}}, s, {{
+                    margin: s.revenue > 0 ? s.profit / s.revenue * 100 : 0,
+                    avgCheck: storeChecks > 0 ? s.revenue / storeChecks : 0,
+                    growth: prev > 0 ? ((recent[s.store] || 0) / prev - 1) * 100 : 0
+                }});
+            }});
+        }}
+
+        /**
+         * z-оценки признаков: матрица n×d построчно в Float64Array
+         */
+        function standardize_{self.chart_id}(rows, features) {{
+            const n = rows.length;
+            const d = features.length;
+            const X = new Float64Array(n * d);
+            features.forEach((f, j) => {{
+                let sum = 0;
+                for (let i = 0; i < n; i++) sum += rows[i][f];
+                const mean = sum / n;
+                let sq = 0;
+                for (let i = 0; i < n; i++) sq += (rows[i][f] - mean) * (rows[i][f] - mean);
+                const std = Math.sqrt(sq / n);
+                for (let i = 0; i < n; i++) X[i * d + j] = std > 0 ? (rows[i][f] - mean) / std : 0;
+            }});
+            return X;
+        }}
+
+        function sqDistance_{self.chart_id}(A, i, B, j, d) {{
+            let sum = 0;
+            for (let f = 0; f < d; f++) {{
+                const diff = A[i * d + f] - B[j * d + f];
+                sum += diff * diff;
+            }}
+            return sum;
+        }}
+
+        /**
+         * Начальные центры k-means++: следующий - с вероятностью, пропорциональной D²
+         */
+        function initCenters_{self.chart_id}(X, n, d, k, random) {{
+            const centers = new Float64Array(k * d);
+            const first = Math.min(Math.floor(random() * n), n - 1);
+            centers.set(X.subarray(first * d, first * d + d), 0);
+            const closest = new Float64Array(n);
+            for (let i = 0; i < n; i++) closest[i] = sqDistance_{self.chart_id}(X, i, centers, 0, d);
+
+            for (let c = 1; c < k; c++) {{
+                let total = 0;
+                for (let i = 0; i < n; i++) total += closest[i];
+                let index = n - 1;
+                if (total <= 0) {{
+                    index = Math.min(Math.floor(random() * n), n - 1);
+                }} else {{
+                    const threshold = random() * total;
+                    let acc = 0;
+                    for (let i = 0; i < n; i++) {{
+                        acc += closest[i];
+                        if (acc >= threshold) {{ index = i; break; }}
+                    }}
+                }}
+                centers.set(X.subarray(index * d, index * d + d), c * d);
+                for (let i = 0; i < n; i++) {{
+                    closest[i] = Math.min(closest[i], sqDistance_{self.chart_id}(X, i, X, index, d));
+                }}
+            }}
+            return centers;
+        }}
+
+        /**
+         * Итерации Ллойда до стабилизации меток; пустой кластер сохраняет центр
+         */
+        function lloyd_{self.chart_id}(X, n, d, centers, k, maxIter) {{
+            let labels = null;
+            for (let iter = 0; iter < maxIter; iter++) {{
+                const next = new Int32Array(n);
+                for (let i = 0; i < n; i++) {{
+                    let best = 0;
+                    let bestDistance = sqDistance_{self.chart_id}(X, i, centers, 0, d);
+                    for (let c = 1; c < k; c++) {{
+                        const distance = sqDistance_{self.chart_id}(X, i, centers, c, d);
+                        if (distance < bestDistance) {{ best = c; bestDistance = distance; }}
+                    }}
+                    next[i] = best;
+                }}
+                if (labels && next.every((label, i) => label === labels[i])) break;
+                labels = next;
+
+                const sums = new Float64Array(k * d);
+                const counts = new Int32Array(k);
+                for (let i = 0; i < n; i++) {{
+                    counts[labels[i]]++;
+                    for (let f = 0; f < d; f++) sums[labels[i] * d + f] += X[i * d + f];
+                }}
+                for (let c = 0; c < k; c++) {{
+                    if (counts[c] === 0) continue;
+                    for (let f = 0; f < d; f++) centers[c * d + f] = sums[c * d + f] / counts[c];
+                }}
+            }}
+            let inertia = 0;
+            for (let i = 0; i < n; i++) inertia += sqDistance_{self.chart_id}(X, i, centers, labels[i], d);
+            return {{ labels, inertia }};
+        }}
+
+        /**
+         * k-means++: лучший по инерции из nInit запусков
+         */
+        function kmeans_{self.chart_id}(X, n, d, k) {{
+            const config = kmeansConfig_{self.chart_id};
+            const random = mulberry32_{self.chart_id}(config.seed);
+            let best = null;
+            for (let run = 0; run < config.nInit; run++) {{
+                const centers = initCenters_{self.chart_id}(X, n, d, k, random);
+                const result = lloyd_{self.chart_id}(X, n, d, centers, k, config.maxIter);
+                if (!best || result.inertia < best.inertia * (1 - config.tieTolerance)) best = result;
+            }}
+            return best;
+        }}
+
+        /**
+         * Инерция разбиения: сумма квадратов расстояний до центров кластеров
+         */
+        function clusterInertia_{self.chart_id}(X, n, d, labels, k) {{
+            const sums = new Float64Array(k * d);
+            const counts = new Int32Array(k);
+            for (let i = 0; i < n; i++) {{
+                counts[labels[i]]++;
+                for (let f = 0; f < d; f++) sums[labels[i] * d + f] += X[i * d + f];
+            }}
+            let total = 0;
+            for (let i = 0; i < n; i++) {{
+                for (let f = 0; f < d; f++) {{
+                    const diff = X[i * d + f] - sums[labels[i] * d + f] / counts[labels[i]];
+                    total += diff * diff;
+                }}
+            }}
+            return total;
+        }}
+
+        /**
+         * Средний силуэт разбиения (кластер из одного магазина - силуэт 0)
+         */
+        function silhouette_{self.chart_id}(X, n, d, labels, k) {{
+            const sizes = new Int32Array(k);
+            for (let i = 0; i < n; i++) sizes[labels[i]]++;
+            if (sizes.filter(size => size > 0).length < 2) return 0;
+
+            let total = 0;
+            const sums = new Float64Array(k);
+            for (let i = 0; i < n; i++) {{
+                sums.fill(0);
+                for (let j = 0; j < n; j++) {{
+                    sums[labels[j]] += Math.sqrt(sqDistance_{self.chart_id}(X, i, X, j, d));
+                }}
+                const own = labels[i];
+                if (sizes[own] < 2) continue;
+                const a = sums[own] / (sizes[own] - 1);
+                let b = Infinity;
+                for (let c = 0; c < k; c++) {{
+                    if (c !== own && sizes[c] > 0) b = Math.min(b, sums[c] / sizes[c]);
+                }}
+                const scale = Math.max(a, b);
+                if (scale > 0) total += (b - a) / scale;
+            }}
+            return total / n;
+        }}
+
+        /**
+         * Выбор k по наибольшему силуэту; partition(k) -> {{ labels, inertia }}
+         * quality - инерция (метод локтя) и силуэт по каждому k
+         */
+        function selectK_{self.chart_id}(X, n, d, kValues, partition) {{
+            let best = null;
+            const quality = [];
+            kValues.forEach(k => {{
+                const result = partition(k);
+                const score = silhouette_{self.chart_id}(X, n, d, result.labels, k);
+                quality.push({{ k, inertia: result.inertia, silhouette: score }});
+                if (!best || score > best.score + kmeansConfig_{self.chart_id}.tieTolerance) {{
+                    best = {{ k, labels: result.labels, score }};
+                }}
+            }});
+            return {{ k: best.k, labels: best.labels, quality }};
+        }}
+
+        function kRange_{self.chart_id}(range, n) {{
+            const values = [];
+            for (let k = range[0]; k <= Math.max(range[0], Math.min(range[1], n - 1)); k++) values.push(k);
+            return values;
+        }}
+
+        /**
+         * Кластеры k-means++ по признакам ('Кластер 1..k' по возрастанию средней площади)
+         */
+        function assignKMeans_{self.chart_id}(storeData, numClusters) {{
+            const config = kmeansConfig_{self.chart_id};
+            const sorted = clusterFeatures_{self.chart_id}(storeData).sort((a, b) => a.area - b.area);
+            const n = sorted.length;
+            const d = config.features.length;
+            const X = standardize_{self.chart_id}(sorted, config.features);
+            const partition = k => kmeans_{self.chart_id}(X, n, d, k);
+
+            let k, labels, quality = null;
+            if (numClusters === 'auto') {{
+                ({{ k, labels, quality }} = selectK_{self.chart_id}(X, n, d, kRange_{self.chart_id}(config.autoK, n), partition));
+            }} else {{
+                k = Math.max(1, Math.min(numClusters, n));
+                labels = partition(k).labels;
+            }}
+
+            // Номера кластеров - по возрастанию средней площади
+            const areaSums = {{}};
+            const counts = {{}};
+            labels.forEach((label, i) => {{
+                areaSums[label] = (areaSums[label] || 0) + sorted[i].area;
+                counts[label] = (counts[label] || 0) + 1;
+            }});
+            const order = Object.keys(areaSums).map(Number)
+                .sort((a, b) => areaSums[a] / counts[a] - areaSums[b] / counts[b] || a - b);
+            sorted.forEach((store, i) => {{
+                store.cluster = 'Кластер ' + (order.indexOf(labels[i]) + 1);
+            }});
+            return {{ stores: sorted, k, quality }};
+        }}
+
+        /**
+         * Кластеры по квантилям площади; 'auto' - k по силуэту площади
+         */
+        function assignAreaClusters_{self.chart_id}(storeData, numClusters) {{
+            const config = kmeansConfig_{self.chart_id};
+            if (numClusters !== 'auto') {{
+                const k = Math.min(numClusters, config.areaK[1]);
+                return {{ stores: assignClusters_{self.chart_id}(storeData, k), k, quality: null }};
+            }}
+
+            const ordered = [...storeData].sort((a, b) => a.area - b.area);
+            const n = ordered.length;
+            const X = standardize_{self.chart_id}(ordered, ['area']);
+            const partition = k => {{
+                const names = assignClusters_{self.chart_id}(ordered, k).map(s => s.cluster);
+                const index = {{}};
+                const labels = Int32Array.from(names, name => index[name] ??= Object.keys(index).length);
+                return {{ labels, inertia: clusterInertia_{self.chart_id}(X, n, 1, labels, k) }};
+            }};
+            const {{ k, quality }} = selectK_{self.chart_id}(X, n, 1, kRange_{self.chart_id}(config.areaK, n), partition);
+            return {{ stores: assignClusters_{self.chart_id}(storeData, k), k, quality }};
+        }}
+
         const clusterColors_{self.chart_id} = {{
             'Малые': '#2ecc71',
             'Средние': '#9b59b6',
             'Крупные': '#e74c3c',
-            'Очень крупные': '#3498db'
+            'Очень крупные': '#3498db',
+            'Кластер 1': '#2ecc71',
+            'Кластер 2': '#9b59b6',
+            'Кластер 3': '#e74c3c',
+            'Кластер 4': '#3498db',
+            'Кластер 5': '#f39c12',
+            'Кластер 6': '#1abc9c'
         }};
 
         const metricLabels_{self.chart_id} = {{
@@ -392,8 +690,7 @@ class ChartClusterAnalysis(BaseChart):
                 return;
             }}
 
-            const data = window.filteredData || window.rawData;
-            const storeData = aggregateStoreData_{self.chart_id}(data);
+            const storeData = aggregateStoreData_{self.chart_id}();
 
             if (storeData.length < 3) {{
                 Plotly.purge('{self.chart_id}');
@@ -403,33 +700,53 @@ class ChartClusterAnalysis(BaseChart):
 
             // Параметры
             const metric = document.getElementById('{self.chart_id}_metric')?.value || 'revenuePerM2';
-            const numClusters = parseInt(document.getElementById('{self.chart_id}_clusters')?.value) || 3;
+            const method = document.getElementById('{self.chart_id}_method')?.value || 'area';
+            const clustersValue = document.getElementById('{self.chart_id}_clusters')?.value || '3';
+            const numClusters = clustersValue === 'auto' ? 'auto' : (parseInt(clustersValue) || 3);
+            const isKMeans = method === 'kmeans';
             const showPoints = document.getElementById('{self.chart_id}_showPoints')?.checked ?? true;
             const showLeaders = document.getElementById('{self.chart_id}_showLeaders')?.checked ?? true;
 
             const metricLabel = metricLabels_{self.chart_id}[metric];
 
-            // Разбиваем на кластеры
-            const clusteredData = assignClusters_{self.chart_id}(storeData, numClusters);
-            const clusterStats = calculateClusterStats_{self.chart_id}(clusteredData, metric);
+            // Разбиваем на кластеры (результат - в общем кэше по фильтрам и параметрам)
+            const clusterResult = ResultCache.get('cluster', {{ metric, numClusters, method }}, () => {{
+                const partition = isKMeans
+                    ? assignKMeans_{self.chart_id}(storeData, numClusters)
+                    : assignAreaClusters_{self.chart_id}(storeData, numClusters);
+                return {{
+                    k: partition.k,
+                    quality: partition.quality,
+                    clusters: calculateClusterStats_{self.chart_id}(partition.stores, metric)
+                }};
+            }});
+            const clusterStats = clusterResult.clusters;
+            const chosenQuality = (clusterResult.quality || []).find(q => q.k === clusterResult.k);
 
             // Сохраняем для таблицы - все магазины с отметкой лидеров
             const allStoresTable = [];
             clusterStats.forEach(cs => {{
                 cs.stores.forEach(store => {{
                     const isLeader = store.store === cs.leader.store;
-                    allStoresTable.push({{
+                    const row = {{
                         'Магазин': store.store,
                         'Площадь': store.area,
                         'Выручка/м²': store.revenuePerM2,
-                        'Прибыль/м²': store.profitPerM2,
-                        'Кластер': cs.cluster,
-                        'Статус': isLeader ? '★ Лидер' : ''
-                    }});
+                        'Прибыль/м²': store.profitPerM2
+                    }};
+                    if (isKMeans) {{
+                        row['Наценка, %'] = Math.round(store.margin * 10) / 10;
+                        row['Средний чек'] = Math.round(store.avgCheck);
+                        row['Рост выручки, %'] = Math.round(store.growth * 10) / 10;
+                    }}
+                    row['Кластер'] = cs.cluster;
+                    row['Статус'] = isLeader ? '★ Лидер' : '';
+                    allStoresTable.push(row);
                 }});
             }});
             window.allStoresTableData_{self.chart_id} = allStoresTable;
             window.clusterStats_{self.chart_id} = clusterStats;
+            window.clusterQuality_{self.chart_id} = clusterResult.quality;
 
             const traces = [];
             const annotations = [];
@@ -482,7 +799,9 @@ class ChartClusterAnalysis(BaseChart):
 
             const layout = {{
                 title: {{
-                    text: `Метод 4: Кластеризация + Бенчмаркинг (${{metricLabel}})`,
+                    text: isKMeans
+                        ? `Метод 4: Кластеризация k-means++ + Бенчмаркинг (${{metricLabel}}, k = ${{clusterResult.k}})`
+                        : `Метод 4: Кластеризация + Бенчмаркинг (${{metricLabel}})`,
                     font: {{ size: 16 }}
                 }},
                 xaxis: {{
@@ -511,7 +830,8 @@ class ChartClusterAnalysis(BaseChart):
                         y: 1.06,
                         xref: 'paper',
                         yref: 'paper',
-                        text: `Оптимум (средн. лидеров): <b>${{avgLeaderArea}} м²</b>`,
+                        text: `Оптимум (средн. лидеров): <b>${{avgLeaderArea}} м²</b>` +
+                            (chosenQuality ? ` · силуэт k = ${{chosenQuality.k}}: ${{chosenQuality.silhouette.toFixed(2)}}` : ''),
                         showarrow: false,
                         font: {{ size: 13, color: '#495057' }},
                         bgcolor: 'rgba(255,255,255,0.9)',
@@ -526,7 +846,7 @@ class ChartClusterAnalysis(BaseChart):
                 modeBarButtonsToRemove: ['lasso2d', 'select2d']
             }};
 
-            Plotly.react('{self.chart_id}', traces, layout, config);
+            renderPlot_{self.chart_id}(traces, layout, config);
 
             // Обновляем таблицу если открыта
             const tableDiv = document.getElementById('{self.chart_id}_table');
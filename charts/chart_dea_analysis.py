@@ -5,7 +5,10 @@ DEA (Data Envelopment Analysis) - Метод оболочечного анали
 - Балл эффективности для каждого магазина (0-100%)
 - Идентификация эталонных магазинов
 - Потенциал улучшения для неэффективных магазинов
+- Модели CCR / BCC на линейном программировании (engine.analytics.dea_lp):
+  считаются в Python по всем данным и встраиваются в график
 """
+import json
 from charts.base_chart import BaseChart
 
 
@@ -18,7 +21,15 @@ class ChartDEAAnalysis(BaseChart):
     - Таблица с рекомендациями по улучшению
     """
 
-    def __init__(self, chart_id='chart_dea_analysis', **kwargs):
+    # Магазины и граница эффективности: при большой сети - WebGL
+    RENDER_BACKEND = 'auto'
+
+    def __init__(self, chart_id='chart_dea_analysis', lp_results=None, **kwargs):
+        """
+        Args:
+            lp_results: результаты CCR/BCC (engine.analytics.dea_lp_payload);
+                без них доступен только композитный балл
+        """
         kwargs.setdefault('show_table', True)
         kwargs.setdefault('show_prompt', True)
 
@@ -29,6 +40,13 @@ class ChartDEAAnalysis(BaseChart):
             ('ebitda', 'EBITDA')
         ]
 
+        self.lp_results = lp_results
+
+        # Модели расчёта эффективности
+        self.model_options = [('composite', 'Композитный балл')]
+        if lp_results:
+            self.model_options += [('ccr', 'DEA CCR (LP)'), ('bcc', 'DEA BCC (LP)')]
+
         super().__init__(chart_id=chart_id, **kwargs)
 
     def _generate_chart_selectors_html(self) -> str:
@@ -38,6 +56,17 @@ class ChartDEAAnalysis(BaseChart):
             for val, label in self.output_metrics
         ])
 
+        model_html = ''
+        if len(self.model_options) > 1:
+            options_html = ''.join(f'<option value="{val}">{label}</option>' for val, label in self.model_options)
+            model_html = f'''
+            <div class="selector-group" style="display: flex; align-items: center; gap: 8px;">
+                <label style="font-weight: 500; font-size: 13px; color: #495057;" title="CCR / BCC - оценка по линейному программированию (входы: {', '.join(self.lp_results['inputs'])}; выходы: {', '.join(self.lp_results['outputs'])}), рассчитана по всем данным без учёта фильтров">Модель:</label>
+                <select id="{self.chart_id}_dea_model" onchange="update{self.chart_id}()" style="padding: 6px 12px; border: 1px solid #ced4da; border-radius: 6px; font-size: 13px; background: white;">
+                    {options_html}
+                </select>
+            </div>'''
+
         return f'''
         <div class="chart-selectors" style="display: flex; gap: 20px; margin-bottom: 12px; padding: 10px; background: #f8f9fa; border-radius: 8px; border: 1px solid #e9ecef; flex-wrap: wrap;">
             <div class="selector-group" style="display: flex; align-items: center; gap: 8px;">
@@ -61,7 +90,7 @@ class ChartDEAAnalysis(BaseChart):
                 <select id="{self.chart_id}_output" onchange="update{self.chart_id}()" style="padding: 6px 12px; border: 1px solid #ced4da; border-radius: 6px; font-size: 13px; background: white;">
                     {output_html}
                 </select>
-            </div>
+            </div>{model_html}
             <div class="selector-group" style="display: flex; align-items: center; gap: 8px;">
                 <label style="font-size: 13px;"><input type="checkbox" id="{self.chart_id}_showLabels" onchange="update{self.chart_id}()"> Подписи магазинов</label>
                 <label style="font-size: 13px;"><input type="checkbox" id="{self.chart_id}_showFrontier" checked onchange="update{self.chart_id}()"> Граница эффективности</label>
@@ -222,7 +251,13 @@ class ChartDEAAnalysis(BaseChart):
         '''
 
     def get_js_code(self):
+        # Закрывающий тег внутри JSON завершил бы <script> шаблона
+        lp_json = json.dumps(self.lp_results, ensure_ascii=False).replace('</', '<\\/')
+
         return f"""
+        // Результаты DEA CCR / BCC (линейное программирование, по всем данным без фильтров)
+        window.deaLP_{self.chart_id} = {lp_json};
+
         /**
          * Переключение модального окна с метриками DEA
          */
@@ -291,64 +326,40 @@ class ChartDEAAnalysis(BaseChart):
             }}
 
             const sortState = window.tableSortState_{self.chart_id};
-            const sortedData = [...tableData];
-
-            if (sortState.column) {{
-                sortedData.sort((a, b) => {{
-                    let valA = a[sortState.column];
-                    let valB = b[sortState.column];
-                    if (typeof valA === 'number' && typeof valB === 'number') {{
-                        return sortState.direction === 'asc' ? valA - valB : valB - valA;
-                    }}
-                    const cmp = window.naturalCompare ? window.naturalCompare(valA, valB) : String(valA || '').localeCompare(String(valB || ''), 'ru');
-                    return sortState.direction === 'asc' ? cmp : -cmp;
-                }});
-            }}
-
-            const columns = ['Ранг', 'Магазин', 'Площадь', 'Выручка/м²', 'Прибыль/м²', 'EBITDA/м²',
-                           'Балл (Revenue)', 'Балл (Profit)', 'Балл (EBITDA)', 'Композитный балл',
-                           'Статус', 'Потенциал', 'Эталон'];
-            let html = '<div class="table-scroll-wrapper"><table class="chart-table">';
-
-            html += '<thead><tr>' + columns.map((c, idx) => {{
-                const isActive = sortState.column === c;
-                const arrow = isActive ? (sortState.direction === 'asc' ? ' ↑' : ' ↓') : '';
-                const style = 'cursor: pointer; user-select: none; white-space: nowrap;' + (isActive ? ' background: #e3f2fd;' : '');
-                return `<th style="${{style}}" data-col-idx="${{idx}}" class="sortable-header-{self.chart_id}">${{c}}${{arrow}}</th>`;
-            }}).join('') + '</tr></thead>';
+            const sortedData = VirtualTable.sortRows(tableData, sortState.column, sortState.direction);
 
+            // Колонки зависят от модели (композитный балл / LP)
+            const columns = Object.keys(tableData[0]);
             window.tableColumns_{self.chart_id} = columns;
 
-            html += '<tbody>';
-            sortedData.forEach((row, idx) => {{
-                const isEfficient = row['Статус'] === '★ Эталонный';
-                const rowStyle = isEfficient ? 'background: #d4edda; font-weight: 500;' : '';
-                html += `<tr style="${{rowStyle}}">` + columns.map(c => {{
-                    let val = row[c];
-                    let cellContent;
-
-                    if (c === 'Композитный балл') {{
+            VirtualTable.render('{self.chart_id}_table', {{
+                rows: sortedData,
+                columns: columns,
+                headerCell: (c, idx) => {{
+                    const isActive = sortState.column === c;
+                    const arrow = isActive ? (sortState.direction === 'asc' ? ' ↑' : ' ↓') : '';
+                    const style = 'cursor: pointer; user-select: none; white-space: nowrap;' + (isActive ? ' background: #e3f2fd;' : '');
+                    return `<th style="${{style}}" data-col-idx="${{idx}}" class="sortable-header-{self.chart_id}">${{c}}${{arrow}}</th>`;
+                }},
+                rowStyle: row => row['Статус'] === '★ Эталонный' ? 'background: #d4edda; font-weight: 500;' : '',
+                cell: (row, c) => {{
+                    const val = row[c];
+                    if (c === 'Композитный балл' || c === 'Эффективность') {{
                         // Парсим значение без знака %
                         const numVal = typeof val === 'string' ? parseFloat(val) : val;
                         const color = numVal >= 95 ? '#28a745' : numVal >= 70 ? '#ffc107' : '#dc3545';
-                        cellContent = `<span style="color: ${{color}}; font-weight: 700;">${{val}}</span>`;
+                        return `<span style="color: ${{color}}; font-weight: 700;">${{val}}</span>`;
                     }} else if (c.startsWith('Балл (')) {{
                         // Балл по отдельной метрике
                         const numVal = typeof val === 'string' ? parseFloat(val) : val;
                         const color = numVal >= 90 ? '#28a745' : numVal >= 60 ? '#ffc107' : '#fd7e14';
-                        cellContent = `<span style="color: ${{color}}; font-weight: 500; font-size: 11px;">${{val}}</span>`;
-                    }} else if (c === 'Статус' && isEfficient) {{
-                        cellContent = `<span style="color: #28a745;">${{val}}</span>`;
-                    }} else {{
-                        cellContent = typeof val === 'number' ? val.toLocaleString('ru-RU') : (val || '-');
+                        return `<span style="color: ${{color}}; font-weight: 500; font-size: 11px;">${{val}}</span>`;
+                    }} else if (c === 'Статус' && row['Статус'] === '★ Эталонный') {{
+                        return `<span style="color: #28a745;">${{val}}</span>`;
                     }}
-
-                    return '<td>' + cellContent + '</td>';
-                }}).join('') + '</tr>';
+                    return VirtualTable.formatValue(val);
+                }}
             }});
-            html += '</tbody></table></div>';
-
-            document.getElementById('{self.chart_id}_table').innerHTML = html;
         }}
 
         function sortTable_{self.chart_id}(column) {{
@@ -358,7 +369,7 @@ class ChartDEAAnalysis(BaseChart):
             }} else {{
                 sortState.column = column;
                 // По умолчанию: сортировка по убыванию для всех балльных колонок и ранга
-                const descColumns = ['Композитный балл', 'Балл (Revenue)', 'Балл (Profit)', 'Балл (EBITDA)', 'Ранг'];
+                const descColumns = ['Композитный балл', 'Эффективность', 'Балл (Revenue)', 'Балл (Profit)', 'Балл (EBITDA)', 'Ранг'];
                 sortState.direction = descColumns.includes(column) ? 'desc' : 'asc';
             }}
             generateTable_{self.chart_id}();
@@ -378,31 +389,17 @@ class ChartDEAAnalysis(BaseChart):
         /**
          * Агрегация данных по магазинам
          */
-        function aggregateStoreData_{self.chart_id}(data) {{
-            const storeMap = {{}};
-
-            data.forEach(row => {{
-                const store = row['Магазин'];
-                const area = parseFloat(row['Торговая площадь магазина']) || 0;
-                const revenue = parseFloat(row['Сумма в чеке']) || 0;
-                const profit = parseFloat(row['Наценка продажи в чеке']) || 0;
-                const cost = parseFloat(row['Себестоимость продажи в чеке']) || 0;
-
-                if (!storeMap[store]) {{
-                    storeMap[store] = {{
-                        store: store,
-                        area: area,
-                        revenue: 0,
-                        profit: 0,
-                        cost: 0
-                    }};
-                }}
-                storeMap[store].revenue += revenue;
-                storeMap[store].profit += profit;
-                storeMap[store].cost += cost;
-            }});
-
-            return Object.values(storeMap).map(s => {{
+        function aggregateStoreData_{self.chart_id}() {{
+            // Суммы по магазинам из общего агрегатора (один проход на состояние фильтров)
+            const stores = groupBy(['Магазин'], Aggregator.STORE_TOTALS).map(g => ({{
+                store: g['Магазин'],
+                area: g.area,
+                revenue: g.revenue,
+                profit: g.profit,
+                cost: g.cost
+            }}));
+
+            return stores.map(s => {{
                 // EBITDA = Прибыль (так как у нас нет данных по амортизации)
                 const ebitda = s.profit;
                 return {{
@@ -533,6 +530,48 @@ class ChartDEAAnalysis(BaseChart):
             return deaResults;
         }}
 
+        /**
+         * DEA CCR / BCC: оценки, эталоны и целевые значения из Python (engine.analytics.dea_lp)
+         * для магазинов, оставшихся после фильтров
+         */
+        function calculateLPDEA_{self.chart_id}(storeData, outputMetric, model) {{
+            const lp = (window.deaLP_{self.chart_id} || {{}})[model] || {{}};
+
+            const deaResults = storeData.filter(s => lp[s.store]).map(s => {{
+                const r = lp[s.store];
+                const score = r.efficiency * 100;
+                return {{
+                    store: s.store,
+                    area: s.area,
+                    output: s[outputMetric],
+                    outputPerM2: s[outputMetric + 'PerM2'],
+                    revenuePerM2: s.revenuePerM2,
+                    profitPerM2: s.profitPerM2,
+                    ebitdaPerM2: s.ebitdaPerM2,
+                    efficiencyScore: Math.round(score * 10) / 10,
+                    isEfficient: r.isEfficient,
+                    potentialImprovement: Math.round((100 - score) * 10) / 10,
+                    // Эталоны по убыванию веса λ (сам магазин не показываем)
+                    peers: r.peers.filter(p => p[0] !== s.store).sort((a, b) => b[1] - a[1]),
+                    targets: r.targets
+                }};
+            }});
+
+            deaResults.sort((a, b) => b.efficiencyScore - a.efficiencyScore);
+            deaResults.forEach((s, idx) => {{
+                s.rank = idx + 1;
+            }});
+
+            return deaResults;
+        }}
+
+        const lpColumnLabels_{self.chart_id} = {{
+            'area': 'площадь',
+            'checks': 'чеки',
+            'revenue': 'выручка',
+            'profit': 'наценка'
+        }};
+
         /**
          * Поиск ближайшего эталонного магазина для неэффективного
          */
@@ -575,8 +614,7 @@ class ChartDEAAnalysis(BaseChart):
                 return;
             }}
 
-            const data = window.filteredData || window.rawData;
-            const storeData = aggregateStoreData_{self.chart_id}(data);
+            const storeData = aggregateStoreData_{self.chart_id}();
 
             if (storeData.length < 3) {{
                 Plotly.purge('{self.chart_id}');
@@ -590,16 +628,41 @@ class ChartDEAAnalysis(BaseChart):
             const showFrontier = document.getElementById('{self.chart_id}_showFrontier')?.checked ?? true;
 
             const outputLabel = outputLabels_{self.chart_id}[outputMetric];
+            const lp = window.deaLP_{self.chart_id};
+            const model = lp ? (document.getElementById('{self.chart_id}_dea_model')?.value || 'composite') : 'composite';
+            const isLP = model !== 'composite';
+            const scoreLabel = isLP ? 'Эффективность' : 'Композитный балл';
 
-            // Рассчитываем DEA scores
-            const deaResults = calculateDEA_{self.chart_id}(storeData, outputMetric);
+            // Рассчитываем DEA scores (композитный балл - через общий кэш результатов)
+            const deaResults = isLP
+                ? calculateLPDEA_{self.chart_id}(storeData, outputMetric, model)
+                : ResultCache.get('dea', {{ outputMetric }},
+                    () => calculateDEA_{self.chart_id}(storeData, outputMetric));
 
             // Разделяем на эффективные и неэффективные
             const efficientStores = deaResults.filter(s => s.isEfficient);
             const inefficientStores = deaResults.filter(s => !s.isEfficient);
 
             // Подготовка данных для таблицы с детализацией по метрикам
-            const tableData = deaResults.map(s => {{
+            const tableData = isLP ? deaResults.map(s => {{
+                const row = {{
+                    'Ранг': s.rank,
+                    'Магазин': s.store,
+                    'Площадь': Math.round(s.area),
+                    'Выручка/м²': Math.round(s.revenuePerM2),
+                    'Прибыль/м²': Math.round(s.profitPerM2),
+                    'Эффективность': s.efficiencyScore + '%',
+                    'Статус': s.isEfficient ? '★ Эталонный' : 'Неэффективный',
+                    'Потенциал': s.potentialImprovement + '%'
+                }};
+                lp.inputs.concat(lp.outputs).forEach(col => {{
+                    row['Цель: ' + (lpColumnLabels_{self.chart_id}[col] || col)] = Math.round(s.targets[col]);
+                }});
+                row['Эталоны (λ)'] = s.peers.length > 0
+                    ? s.peers.map(p => `${{p[0]}} (${{p[1].toFixed(2)}})`).join(', ')
+                    : '-';
+                return row;
+            }}) : deaResults.map(s => {{
                 const benchmark = s.isEfficient ? '-' : findBenchmark_{self.chart_id}(s, efficientStores);
                 return {{
                     'Ранг': s.rank,
@@ -648,7 +711,7 @@ class ChartDEAAnalysis(BaseChart):
                             [1, '#fd7e14']
                         ],
                         colorbar: {{
-                            title: 'Композитный<br>балл',
+                            title: scoreLabel.replace(' ', '<br>'),
                             titleside: 'right',
                             ticksuffix: '%',
                             x: 1.15
@@ -660,7 +723,7 @@ class ChartDEAAnalysis(BaseChart):
                                    'Выручка/м²: %{{customdata[1]:,.0f}}<br>' +
                                    'Прибыль/м²: %{{customdata[2]:,.0f}}<br>' +
                                    'EBITDA/м²: %{{customdata[3]:,.0f}}<br>' +
-                                   '<b>Композитный балл: %{{customdata[0]:.1f}}%</b><br>' +
+                                   '<b>' + scoreLabel + ': %{{customdata[0]:.1f}}%</b><br>' +
                                    '<extra></extra>'
                 }});
             }}
@@ -670,7 +733,7 @@ class ChartDEAAnalysis(BaseChart):
                 traces.push({{
                     type: 'scatter',
                     mode: showLabels ? 'markers+text' : 'markers',
-                    name: 'Эталонные (≥95%)',
+                    name: isLP ? 'Эталонные (на границе)' : 'Эталонные (≥95%)',
                     x: efficientStores.map(s => s.area),
                     y: efficientStores.map(s => s.outputPerM2),
                     text: efficientStores.map(s => s.store),
@@ -693,7 +756,7 @@ class ChartDEAAnalysis(BaseChart):
                                    'Выручка/м²: %{{customdata[1]:,.0f}}<br>' +
                                    'Прибыль/м²: %{{customdata[2]:,.0f}}<br>' +
                                    'EBITDA/м²: %{{customdata[3]:,.0f}}<br>' +
-                                   '<b>Композитный балл: %{{customdata[0]:.1f}}%</b><br>' +
+                                   '<b>' + scoreLabel + ': %{{customdata[0]:.1f}}%</b><br>' +
                                    '<b>ЭТАЛОННЫЙ МАГАЗИН</b><extra></extra>'
                 }});
             }}
@@ -737,7 +800,9 @@ class ChartDEAAnalysis(BaseChart):
 
             const layout = {{
                 title: {{
-                    text: `DEA Многокритериальный анализ (Revenue 40% + Profit 35% + EBITDA 25%)`,
+                    text: isLP
+                        ? `DEA ${{model.toUpperCase()}} (LP): входы - ${{lp.inputs.map(c => lpColumnLabels_{self.chart_id}[c] || c).join(', ')}}; выходы - ${{lp.outputs.map(c => lpColumnLabels_{self.chart_id}[c] || c).join(', ')}}`
+                        : `DEA Многокритериальный анализ (Revenue 40% + Profit 35% + EBITDA 25%)`,
                     font: {{ size: 16 }}
                 }},
                 xaxis: {{
@@ -770,7 +835,8 @@ class ChartDEAAnalysis(BaseChart):
                         y: 1.08,
                         xref: 'paper',
                         yref: 'paper',
-                        text: `Эталонных: <b>${{efficientCount}}</b> из ${{totalCount}} | Средний балл: <b>${{avgScore}}%</b>`,
+                        text: `Эталонных: <b>${{efficientCount}}</b> из ${{totalCount}} | Средний балл: <b>${{avgScore}}%</b>` +
+                            (isLP ? ' | оценка по всем данным, без фильтров' : ''),
                         showarrow: false,
                         font: {{ size: 13, color: '#495057' }},
                         bgcolor: 'rgba(255,255,255,0.9)',
@@ -785,7 +851,7 @@ class ChartDEAAnalysis(BaseChart):
                 modeBarButtonsToRemove: ['lasso2d', 'select2d']
             }};
 
-            Plotly.react('{self.chart_id}', traces, layout, config);
+            renderPlot_{self.chart_id}(traces, layout, config);
 
             // Обновляем таблицу если открыта
             const tableDiv = document.getElementById('{self.chart_id}_table');
@@ -13,6 +13,9 @@ class ChartLifecycleFromZero(BaseChart):
     Жизненный цикл магазинов - динамика с первого месяца работы
     """
 
+    # Строится по rawData с локальным фильтром периода - глобальные фильтры не влияют
+    FILTER_DIMENSIONS = ()
+
     def __init__(self, chart_id='chart_lifecycle_from_zero', default_show_labels=False, **kwargs):
         kwargs.setdefault('show_table', True)
         kwargs.setdefault('show_prompt', True)
@@ -199,43 +202,21 @@ class ChartLifecycleFromZero(BaseChart):
             }}
 
             const sortState = window.tableSortState_{self.chart_id};
-            const sortedData = [...tableData];
-
-            if (sortState.column) {{
-                sortedData.sort((a, b) => {{
-                    let valA = a[sortState.column];
-                    let valB = b[sortState.column];
-                    if (typeof valA === 'number' && typeof valB === 'number') {{
-                        return sortState.direction === 'asc' ? valA - valB : valB - valA;
-                    }}
-                    // Используем natural sort для строк (правильная сортировка Магазин 1, 2, ..., 10)
-                    const cmp = naturalSort_{self.chart_id}(valA, valB);
-                    return sortState.direction === 'asc' ? cmp : -cmp;
-                }});
-            }}
+            const sortedData = VirtualTable.sortRows(tableData, sortState.column, sortState.direction);
 
             const columns = Object.keys(tableData[0]);
-            let html = '<div class="table-scroll-wrapper"><table class="chart-table">';
-
-            html += '<thead><tr>' + columns.map((c, idx) => {{
-                const isActive = sortState.column === c;
-                const arrow = isActive ? (sortState.direction === 'asc' ? ' ↑' : ' ↓') : '';
-                const style = 'cursor: pointer; user-select: none;' + (isActive ? ' background: #e3f2fd;' : '');
-                return `<th style="${{style}}" data-col-idx="${{idx}}" class="sortable-header-{self.chart_id}">${{c}}${{arrow}}</th>`;
-            }}).join('') + '</tr></thead>';
-
             window.tableColumns_{self.chart_id} = columns;
 
-            html += '<tbody>';
-            sortedData.forEach(row => {{
-                html += '<tr>' + columns.map(c => {{
-                    const val = row[c];
-                    return '<td>' + (typeof val === 'number' ? val.toLocaleString('ru-RU') : (val || '-')) + '</td>';
-                }}).join('') + '</tr>';
+            VirtualTable.render('{self.chart_id}_table', {{
+                rows: sortedData,
+                columns: columns,
+                headerCell: (c, idx) => {{
+                    const isActive = sortState.column === c;
+                    const arrow = isActive ? (sortState.direction === 'asc' ? ' ↑' : ' ↓') : '';
+                    const style = 'cursor: pointer; user-select: none;' + (isActive ? ' background: #e3f2fd;' : '');
+                    return `<th style="${{style}}" data-col-idx="${{idx}}" class="sortable-header-{self.chart_id}">${{c}}${{arrow}}</th>`;
+                }}
             }});
-            html += '</tbody></table></div>';
-
-            document.getElementById('{self.chart_id}_table').innerHTML = html;
         }}
 
         function sortTable_{self.chart_id}(column) {{
@@ -732,7 +713,7 @@ class ChartLifecycleFromZero(BaseChart):
                 modeBarButtonsToRemove: ['lasso2d', 'select2d']
             }};
 
-            Plotly.react('{self.chart_id}', traces, layout, config);
+            renderPlot_{self.chart_id}(traces, layout, config);
 
             // Обновляем таблицу если открыта
             const tableDiv = document.getElementById('{self.chart_id}_table');
@@ -249,7 +249,7 @@ class ChartLifecyclePhases(BaseChart):
                 annotations: annotations
             }};
 
-            Plotly.newPlot('{self.chart_id}', [trace], layout, {{responsive: true}});
+            renderPlot_{self.chart_id}([trace], layout, {{responsive: true}});
 
             // Обновляем таблицу если открыта
             const tableDiv = document.getElementById('{self.chart_id}_table');
@@ -17,6 +17,9 @@ class ChartMarginalAnalysis(BaseChart):
     - Вертикальная линия = Оптимум (пик предельной выручки)
     """
 
+    # Кривые выручки и предельной выручки по магазинам - scattergl от WEBGL_POINT_THRESHOLD точек
+    RENDER_BACKEND = 'auto'
+
     def __init__(self, chart_id='chart_marginal_analysis', **kwargs):
         kwargs.setdefault('show_table', True)
         kwargs.setdefault('show_prompt', True)
@@ -195,50 +198,31 @@ class ChartMarginalAnalysis(BaseChart):
             const storeRows = tableData.filter(row => !row['Магазин'].startsWith('---') && !row['Магазин'].startsWith('Пик'));
             const resultRows = tableData.filter(row => row['Магазин'].startsWith('---') || row['Магазин'].startsWith('Пик'));
 
-            // Применяем сортировку к данным магазинов
+            // Сортируются только данные магазинов, итоговые строки - в конце без сортировки
             const sortState = window.tableSortState_{self.chart_id};
-            if (sortState.column) {{
-                storeRows.sort((a, b) => {{
-                    let valA = a[sortState.column];
-                    let valB = b[sortState.column];
-
-                    if (typeof valA === 'number' && typeof valB === 'number') {{
-                        return sortState.direction === 'asc' ? valA - valB : valB - valA;
-                    }}
-                    // Натуральная сортировка для строк (Магазин 1, 2, ... 10, 11)
-                    const cmp = window.naturalCompare ? window.naturalCompare(valA, valB) : String(valA || '').localeCompare(String(valB || ''), 'ru');
-                    return sortState.direction === 'asc' ? cmp : -cmp;
-                }});
-            }}
+            const sortedRows = VirtualTable.sortRows(storeRows, sortState.column, sortState.direction);
+            const resultRowSet = new Set(resultRows);
 
             const columns = Object.keys(tableData[0]);
-            let html = '<div class="table-scroll-wrapper"><table class="chart-table">';
-
-            html += '<thead><tr>' + columns.map((c, idx) => {{
-                const isActive = sortState.column === c;
-                const arrow = isActive ? (sortState.direction === 'asc' ? ' ↑' : ' ↓') : '';
-                const style = 'cursor: pointer; user-select: none;' + (isActive ? ' background: #e3f2fd;' : '');
-                return `<th style="${{style}}" data-col-idx="${{idx}}" class="sortable-header-{self.chart_id}">${{c}}${{arrow}}</th>`;
-            }}).join('') + '</tr></thead>';
-
+            // Сохраняем колонки для обработчика клика
             window.tableColumns_{self.chart_id} = columns;
 
-            html += '<tbody>';
-            storeRows.forEach(row => {{
-                html += '<tr>' + columns.map(c => {{
-                    const val = row[c];
-                    return '<td>' + (typeof val === 'number' ? val.toLocaleString('ru-RU') : val) + '</td>';
-                }}).join('') + '</tr>';
-            }});
-            resultRows.forEach(row => {{
-                html += '<tr style="background: #f0f0f0; font-style: italic;">' + columns.map(c => {{
+            VirtualTable.render('{self.chart_id}_table', {{
+                rows: sortedRows.concat(resultRows),
+                columns: columns,
+                // Заголовки с возможностью сортировки
+                headerCell: (c, idx) => {{
+                    const isActive = sortState.column === c;
+                    const arrow = isActive ? (sortState.direction === 'asc' ? ' ↑' : ' ↓') : '';
+                    const style = 'cursor: pointer; user-select: none;' + (isActive ? ' background: #e3f2fd;' : '');
+                    return `<th style="${{style}}" data-col-idx="${{idx}}" class="sortable-header-{self.chart_id}">${{c}}${{arrow}}</th>`;
+                }},
+                rowStyle: row => resultRowSet.has(row) ? 'background: #f0f0f0; font-style: italic;' : '',
+                cell: (row, c) => {{
                     const val = row[c];
-                    return '<td>' + (typeof val === 'number' ? val.toLocaleString('ru-RU') : val) + '</td>';
-                }}).join('') + '</tr>';
+                    return typeof val === 'number' ? val.toLocaleString('ru-RU') : val;
+                }}
             }});
-            html += '</tbody></table></div>';
-
-            document.getElementById('{self.chart_id}_table').innerHTML = html;
         }}
 
         function sortTable_{self.chart_id}(column) {{
@@ -266,28 +250,17 @@ class ChartMarginalAnalysis(BaseChart):
         /**
          * Агрегация данных по магазинам
          */
-        function aggregateStoreData_{self.chart_id}(data) {{
-            const storeMap = {{}};
-
-            data.forEach(row => {{
-                const store = row['Магазин'];
-                const area = parseFloat(row['Торговая площадь магазина']) || 0;
-                const revenue = parseFloat(row['Сумма в чеке']) || 0;
-                const profit = parseFloat(row['Наценка продажи в чеке']) || 0;
-
-                if (!storeMap[store]) {{
-                    storeMap[store] = {{
-                        store: store,
-                        area: area,
-                        revenue: 0,
-                        profit: 0
-                    }};
-                }}
-                storeMap[store].revenue += revenue;
-                storeMap[store].profit += profit;
-            }});
+        function aggregateStoreData_{self.chart_id}() {{
+            // Суммы по магазинам из общего агрегатора (один проход на состояние фильтров)
+            const stores = groupBy(['Магазин'], Aggregator.STORE_TOTALS).map(g => ({{
+                store: g['Магазин'],
+                area: g.area,
+                revenue: g.revenue,
+                profit: g.profit,
+                cost: g.cost
+            }}));
 
-            const result = Object.values(storeMap).map(s => {{
+            const result = stores.map(s => {{
                 const revenuePerM2 = s.area > 0 ? Math.round(s.revenue / s.area) : 0;
                 const profitPerM2 = s.area > 0 ? Math.round(s.profit / s.area) : 0;
                 return {{
@@ -388,8 +361,7 @@ class ChartMarginalAnalysis(BaseChart):
                 return;
             }}
 
-            const data = window.filteredData || window.rawData;
-            const storeData = aggregateStoreData_{self.chart_id}(data);
+            const storeData = aggregateStoreData_{self.chart_id}();
 
             if (storeData.length < 3) {{
                 Plotly.purge('{self.chart_id}');
@@ -820,7 +792,7 @@ class ChartMarginalAnalysis(BaseChart):
                 modeBarButtonsToRemove: ['lasso2d', 'select2d']
             }};
 
-            Plotly.react('{self.chart_id}', traces, layout, config);
+            renderPlot_{self.chart_id}(traces, layout, config);
 
             // Обновляем таблицу если открыта
             const tableDiv = document.getElementById('{self.chart_id}_table');
@@ -285,7 +285,6 @@ class ChartOptimalAreaTrend(BaseChart):
         }}
 
         function update{self.chart_id}() {{
-            const data = window.filteredData || window.rawData;
             const metricSelect = document.getElementById('{self.chart_id}_metric');
             const topSelect = document.getElementById('{self.chart_id}_top');
             const sortSelect = document.getElementById('{self.chart_id}_sort');
@@ -294,43 +293,24 @@ class ChartOptimalAreaTrend(BaseChart):
             const topValue = topSelect ? topSelect.value : '8';
             const sortMode = sortSelect ? sortSelect.value : 'less_efficient';
 
-            // Группировка по месяцам для всех магазинов
+            // Группировка по месяцам для всех магазинов (общий агрегатор)
             const allStoresMonthlyData = {{}};
 
-            data.forEach(row => {{
-                const store = row['Магазин'];
-                const dateStr = row['Дата'];
-                if (!store || !dateStr) return;
-
-                const parts = dateStr.split('.');
-                if (parts.length !== 3) return;
-
-                const month = parseInt(parts[1]);
-                const year = parseInt(parts[2]);
-                const periodKey = `01.${{String(month).padStart(2, '0')}}.${{year}}`;
-
+            groupBy(['@period', 'Магазин'], Aggregator.STORE_TOTALS).forEach(g => {{
+                const periodKey = g['@period'];
                 if (!allStoresMonthlyData[periodKey]) {{
                     allStoresMonthlyData[periodKey] = {{}};
                 }}
-
-                if (!allStoresMonthlyData[periodKey][store]) {{
-                    allStoresMonthlyData[periodKey][store] = {{
-                        revenue: 0,
-                        profit: 0,
-                        area: parseFloat(row['Торговая площадь магазина']) || 0
-                    }};
-                }}
-
-                allStoresMonthlyData[periodKey][store].revenue += parseFloat(row['Сумма в чеке']) || 0;
-                allStoresMonthlyData[periodKey][store].profit += parseFloat(row['Наценка продажи в чеке']) || 0;
+                allStoresMonthlyData[periodKey][g['Магазин']] = {{
+                    revenue: g.revenue,
+                    profit: g.profit,
+                    area: g.area
+                }};
             }});
 
-            // Сортируем периоды
-            const periods = Object.keys(allStoresMonthlyData).sort((a, b) => {{
-                const [d1, m1, y1] = a.split('.');
-                const [d2, m2, y2] = b.split('.');
-                return (parseInt(y1) * 12 + parseInt(m1)) - (parseInt(y2) * 12 + parseInt(m2));
-            }});
+            // Сортируем периоды (порядковые номера месяцев) и подписи '01.MM.YYYY' для оси X
+            const periods = Object.keys(allStoresMonthlyData).map(Number).sort((a, b) => a - b);
+            const periodLabels = periods.map(period => periodParts(period).monthKey);
 
             // Получаем список всех магазинов
             const allStores = new Set();
@@ -471,7 +451,7 @@ class ChartOptimalAreaTrend(BaseChart):
 
                 // Фактическая площадь (синяя)
                 traces.push({{
-                    x: periods,
+                    x: periodLabels,
                     y: result.actualAreas,
                     type: 'scatter',
                     mode: 'lines',
@@ -484,7 +464,7 @@ class ChartOptimalAreaTrend(BaseChart):
 
                 // Оптимальная площадь (оранжевая пунктирная)
                 traces.push({{
-                    x: periods,
+                    x: periodLabels,
                     y: result.optimalAreas,
                     type: 'scatter',
                     mode: 'lines',
@@ -548,12 +528,12 @@ class ChartOptimalAreaTrend(BaseChart):
             // Сохраняем данные для таблицы
             window.{self.chart_id}_tableData = {{
                 stores: sortedStores,
-                periods: periods,
+                periods: periodLabels,
                 storeResults: storeResults,
                 metric: selectedMetric
             }};
 
-            Plotly.newPlot('{self.chart_id}', traces, layout, {{responsive: true}});
+            renderPlot_{self.chart_id}(traces, layout, {{responsive: true}});
 
             // Обновляем таблицу если открыта
             const tableDiv = document.getElementById('{self.chart_id}_table');
@@ -144,7 +144,6 @@ class ChartRevenueDynamics(BaseChart):
         {self._generate_detail_level_js()}
 
         function update{self.chart_id}() {{
-            const data = window.filteredData || window.rawData;
             const level = getDetailLevel_{self.chart_id}();
 
             // Получаем выбранные значения из селекторов
@@ -154,6 +153,10 @@ class ChartRevenueDynamics(BaseChart):
 
             const metricField = metricSelect ? metricSelect.value : 'Число чеков';
             const groupByField = groupBySelect ? groupBySelect.value : 'Товар';
+            // Без разреза по товарам достаточно куба Магазин×Год×Месяц×Тип
+            const data = groupByField === 'Товар'
+                ? (window.filteredData || window.rawData)
+                : getStoreLevelData();
             const displayMode = displayModeSelect ? displayModeSelect.value : 'absolute';
 
             const showLabelsCheckbox = document.getElementById('{self.chart_id}_show_labels');
@@ -175,13 +178,10 @@ class ChartRevenueDynamics(BaseChart):
 
                 if (!dateStr || !groupValue) return;
 
-                const parts = dateStr.split('.');
-                if (parts.length !== 3) return;
+                const dateInfo = rowDate(row);
+                if (!dateInfo) return;
 
-                const day = parseInt(parts[0]);
-                const month = parseInt(parts[1]);
-                const year = parseInt(parts[2]);
-                const date = new Date(year, month - 1, day);
+                const {{ day, month, year, date }} = dateInfo;
 
                 let periodKey;
                 switch(level) {{
@@ -340,7 +340,7 @@ class ChartRevenueDynamics(BaseChart):
                 annotations: annotations
             }};
 
-            Plotly.newPlot('{self.chart_id}', traces, layout, {{responsive: true}});
+            renderPlot_{self.chart_id}(traces, layout, {{responsive: true}});
 
             // Обновляем таблицу если открыта
             const tableDiv = document.getElementById('{self.chart_id}_table');
@@ -350,7 +350,6 @@ class ChartRevenueDynamics(BaseChart):
         }}
 
         function getTableData_{self.chart_id}() {{
-            const data = window.filteredData || window.rawData;
             const level = getDetailLevel_{self.chart_id}();
 
             const metricSelect = document.getElementById('{self.chart_id}_metric');
@@ -358,6 +357,10 @@ class ChartRevenueDynamics(BaseChart):
 
             const metricField = metricSelect ? metricSelect.value : 'Число чеков';
             const groupByField = groupBySelect ? groupBySelect.value : 'Товар';
+            // Без разреза по товарам достаточно куба Магазин×Год×Месяц×Тип
+            const data = groupByField === 'Товар'
+                ? (window.filteredData || window.rawData)
+                : getStoreLevelData();
 
             const periodData = {{}};
 
@@ -371,13 +374,10 @@ class ChartRevenueDynamics(BaseChart):
 
                 if (!dateStr || !groupValue) return;
 
-                const parts = dateStr.split('.');
-                if (parts.length !== 3) return;
+                const dateInfo = rowDate(row);
+                if (!dateInfo) return;
 
-                const day = parseInt(parts[0]);
-                const month = parseInt(parts[1]);
-                const year = parseInt(parts[2]);
-                const date = new Date(year, month - 1, day);
+                const {{ day, month, year, date }} = dateInfo;
 
                 let periodKey;
                 switch(level) {{
@@ -126,12 +126,10 @@ class ChartSeasonalPatterns(BaseChart):
                 const dateStr = row['Дата'];
                 if (!groupKey || !dateStr) return;
 
-                const parts = dateStr.split('.');
-                if (parts.length !== 3) return;
+                const dateInfo = rowDate(row);
+                if (!dateInfo) return;
 
-                const month = parts[1].padStart(2, '0');
-                const year = parts[2];
-                const period = `01.${{month}}.${{year}}`;
+                const period = dateInfo.monthKey;
                 allPeriods.add(period);
 
                 const revenue = parseFloat(row['Сумма в чеке']) || 0;
@@ -309,7 +307,7 @@ class ChartSeasonalPatterns(BaseChart):
                 annotations: annotations
             }};
 
-            Plotly.newPlot('{self.chart_id}', [trace], layout, {{responsive: true}});
+            renderPlot_{self.chart_id}([trace], layout, {{responsive: true}});
 
             // Обновляем таблицу если открыта
             const tableDiv = document.getElementById('{self.chart_id}_table');
@@ -334,12 +332,10 @@ class ChartSeasonalPatterns(BaseChart):
                 const dateStr = row['Дата'];
                 if (!groupKey || !dateStr) return;
 
-                const parts = dateStr.split('.');
-                if (parts.length !== 3) return;
+                const dateInfo = rowDate(row);
+                if (!dateInfo) return;
 
-                const month = parts[1].padStart(2, '0');
-                const year = parts[2];
-                const period = `01.${{month}}.${{year}}`;
+                const period = dateInfo.monthKey;
                 allPeriods.add(period);
 
                 const revenue = parseFloat(row['Сумма в чеке']) || 0;
@@ -5,6 +5,9 @@ from charts.base_chart import BaseChart
 class ChartSmallMultiples(BaseChart):
     """Шпалера (small multiples) - сетка мини-графиков"""
 
+    # Линии по периодам во всех ячейках сетки (магазин × месяц) - scattergl, если точек много
+    RENDER_BACKEND = 'auto'
+
     def __init__(self, chart_id='chart_small_multiples', available_detail_levels=None,
                  metric_options=None, group_by_options=None, **kwargs):
         kwargs.setdefault('show_table', True)
@@ -311,7 +314,6 @@ class ChartSmallMultiples(BaseChart):
         }}
 
         function update{self.chart_id}() {{
-            const data = window.filteredData || window.rawData;
             const level = getDetailLevel_{self.chart_id}();
 
             const groupBySelect = document.getElementById('{self.chart_id}_groupby');
@@ -321,6 +323,9 @@ class ChartSmallMultiples(BaseChart):
             const compareYoyCheckbox = document.getElementById('{self.chart_id}_compare_yoy');
 
             const groupByField = groupBySelect ? groupBySelect.value : 'Магазин';
+            // Без разреза по товарам достаточно куба Магазин×Год×Месяц×Тип
+            const byProduct = groupByField === 'Товар';
+            const data = byProduct ? (window.filteredData || window.rawData) : getStoreLevelData();
             const metricField = metricSelect ? metricSelect.value : 'Сумма в чеке';
             const topValue = topSelect ? topSelect.value : '20';
             const sortMode = sortSelect ? sortSelect.value : 'sum';
@@ -441,7 +446,7 @@ class ChartSmallMultiples(BaseChart):
             const groupYoyChanges = {{}};
             if (showYoyCompare && level === 'month') {{
                 // Агрегируем данные за прошлый год из rawData (не filteredData!)
-                const rawDataForYoy = window.rawData || [];
+                const rawDataForYoy = (byProduct ? window.rawData : getStoreLevelRawData()) || [];
                 const prevYearData = {{}};  // group -> period -> value
 
                 // Определяем год из текущих отфильтрованных данных
@@ -718,7 +723,7 @@ class ChartSmallMultiples(BaseChart):
                 groupByField: groupByField
             }};
 
-            Plotly.newPlot('{self.chart_id}', traces, layout, {{responsive: true}});
+            renderPlot_{self.chart_id}(traces, layout, {{responsive: true}});
 
             // Обновляем таблицу если открыта
             const tableDiv = document.getElementById('{self.chart_id}_table');
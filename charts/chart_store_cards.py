@@ -360,8 +360,8 @@ class ChartStoreCards(BaseChart):
                 return store;
             }});
 
-            // Расчет АППГ из rawData (аналогично chart_small_multiples)
-            const rawData = window.rawData || [];
+            // Расчет АППГ по всем данным без фильтров (куб, если выгружен)
+            const rawData = getStoreLevelRawData() || [];
             const yearsInFiltered = new Set();
             data.forEach(row => {{
                 const year = row['Год'];
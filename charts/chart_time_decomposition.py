@@ -1,13 +1,23 @@
 # PROJECT_ROOT: charts/chart_time_decomposition.py
+import json
 from charts.base_chart import BaseChart
 
 
 class ChartTimeDecomposition(BaseChart):
     """Декомпозиция временных рядов (тренд + сезонность + остатки)"""
 
-    def __init__(self, chart_id='chart_time_decomposition', **kwargs):
+    # Строится по rawData с локальными фильтрами - глобальные фильтры не влияют
+    FILTER_DIMENSIONS = ()
+
+    def __init__(self, chart_id='chart_time_decomposition', decomposition=None, **kwargs):
+        """
+        Args:
+            decomposition: готовые ряды магазин × тип (engine.analytics.decompose_store_series);
+                без них декомпозиция считается в браузере по rawData
+        """
         kwargs.setdefault('show_table', True)
         kwargs.setdefault('show_prompt', True)
+        self.decomposition = decomposition
         super().__init__(chart_id=chart_id, **kwargs)
 
     def _generate_chart_selectors_html(self) -> str:
@@ -193,10 +203,16 @@ class ChartTimeDecomposition(BaseChart):
         '''
 
     def get_js_code(self):
+        # Закрывающий тег внутри JSON завершил бы <script> шаблона
+        decomposition_json = json.dumps(self.decomposition, ensure_ascii=False).replace('</', '<\\/')
+
         return f"""
         // Глобальное хранилище данных декомпозиции для модального окна
         window.{self.chart_id}_decompositionData = null;
 
+        // Готовая декомпозиция выручки по магазинам и типам (Python, весь период)
+        window.decomposition_{self.chart_id} = {decomposition_json};
+
         /**
          * Переключение модального окна с объяснением декомпозиции
          */
@@ -376,8 +392,8 @@ class ChartTimeDecomposition(BaseChart):
                     Декомпозиция временного ряда — разложение данных на <strong>три составляющие</strong>:
                 </p>
                 <ul style="margin: 10px 0; padding-left: 25px; color: #4a5568;">
-                    <li><strong>Тренд</strong> — долгосрочное направление (скользящее среднее за 12 мес.)</li>
-                    <li><strong>Сезонность</strong> — повторяющиеся паттерны по месяцам</li>
+                    <li><strong>Тренд</strong> — долгосрочное направление (центрированное скользящее среднее 2×12 мес.)</li>
+                    <li><strong>Сезонность</strong> — повторяющиеся паттерны по календарным месяцам</li>
                     <li><strong>Остатки</strong> — случайные колебания, не объяснённые моделью</li>
                 </ul>
                 <div style="background: #e3f2fd; border-radius: 8px; padding: 12px; margin: 15px 0; border-left: 4px solid #2E86AB;">
@@ -404,7 +420,8 @@ class ChartTimeDecomposition(BaseChart):
                 <div style="background: #f8f9fa; border-radius: 8px; padding: 15px; margin: 15px 0;">
                     <ul style="margin: 0; padding-left: 20px; color: #4a5568; font-size: 13px;">
                         <li>Для полноценной декомпозиции нужно <strong>≥24 месяца</strong> данных</li>
-                        <li>При 12 месяцах тренд будет пустым (недостаточно данных для скользящего среднего)</li>
+                        <li>При 12 месяцах тренд будет пустым (окну скользящего среднего нужно 13 месяцев)</li>
+                        <li>Пропущенные месяцы остаются пустыми; тренд рядом с пропуском не считается</li>
                         <li>Локальный фильтр дат работает независимо от глобального фильтра дашборда</li>
                         <li><strong>R² > 80%</strong> — данные хорошо предсказуемы, <strong>R² < 50%</strong> — много случайных факторов</li>
                     </ul>
@@ -519,12 +536,10 @@ class ChartTimeDecomposition(BaseChart):
                     const dateStr = row['Дата'];
                     if (!dateStr) return;
 
-                    const parts = dateStr.split('.');
-                    if (parts.length !== 3) return;
+                    const dateInfo = rowDate(row);
+                    if (!dateInfo) return;
 
-                    const day = parseInt(parts[0]);
-                    const month = parseInt(parts[1]);
-                    const year = parseInt(parts[2]);
+                    const {{ day, month, year }} = dateInfo;
 
                     // Формат для input[type=date]: YYYY-MM-DD
                     const isoDate = `${{year}}-${{String(month).padStart(2, '0')}}-${{String(day).padStart(2, '0')}}`;
@@ -549,113 +564,131 @@ class ChartTimeDecomposition(BaseChart):
             }}
         }}
 
-        // Простая декомпозиция временных рядов
-        function simpleDecompose(values, period = 12) {{
-            const n = values.length;
-
-            // 1. Тренд (скользящее среднее)
-            const trend = [];
-            const halfPeriod = Math.floor(period / 2);
-
-            for (let i = 0; i < n; i++) {{
-                if (i < halfPeriod || i >= n - halfPeriod) {{
-                    trend.push(null);
-                }} else {{
-                    let sum = 0;
-                    for (let j = i - halfPeriod; j <= i + halfPeriod; j++) {{
-                        sum += values[j] || 0;
-                    }}
-                    trend.push(sum / period);
-                }}
+        /**
+         * Классическая декомпозиция месячного ряда (как engine/analytics/decomposition.py)
+         *
+         * Ряд выравнивается по номеру месяца (year * 12 + month): пропущенные
+         * месяцы - null. Тренд - центрированное скользящее среднее 2×12 (если в
+         * окне пропуск - null), сезонность - средние отклонения от тренда по
+         * календарному месяцу, центрированные к нулю, остаток - всё остальное.
+         *
+         * @param {{Array<number>}} values - значения
+         * @param {{Array<number>}} ordinals - номера месяцев значений (по возрастанию)
+         * @param {{number}} period - длина сезонного цикла
+         * @returns {{Object}} {{ ordinals, values, trend, seasonal, residual }} на сплошной сетке месяцев
+         */
+        function seasonalDecompose(values, ordinals, period = 12) {{
+            if (ordinals.length === 0) {{
+                return {{ ordinals: [], values: [], trend: [], seasonal: [], residual: [] }};
             }}
-
-            // 2. Детрендированные данные
-            const detrended = values.map((v, i) => trend[i] !== null ? v - trend[i] : null);
-
-            // 3. Сезонность (средние по месяцам)
-            const seasonalAverages = new Array(period).fill(0);
-            const seasonalCounts = new Array(period).fill(0);
-
-            detrended.forEach((val, i) => {{
-                if (val !== null) {{
-                    const monthIndex = i % period;
-                    seasonalAverages[monthIndex] += val;
-                    seasonalCounts[monthIndex]++;
+            const first = ordinals[0];
+            const n = ordinals[ordinals.length - 1] - first + 1;
+            const grid = new Array(n).fill(null);
+            ordinals.forEach((o, i) => {{ grid[o - first] = values[i]; }});
+
+            // 1. Тренд: веса 2×period (крайние - половинные) или period равных весов
+            const weights = [];
+            if (period % 2 === 0) {{
+                for (let j = 0; j <= period; j++) weights.push((j === 0 || j === period ? 0.5 : 1) / period);
+            }} else {{
+                for (let j = 0; j < period; j++) weights.push(1 / period);
+            }}
+            const half = Math.floor(weights.length / 2);
+            const trend = grid.map((_, i) => {{
+                if (i < half || i >= n - half) return null;
+                let sum = 0;
+                for (let j = 0; j < weights.length; j++) {{
+                    const v = grid[i - half + j];
+                    if (v === null) return null;
+                    sum += v * weights[j];
                 }}
+                return sum;
             }});
 
-            for (let i = 0; i < period; i++) {{
-                if (seasonalCounts[i] > 0) {{
-                    seasonalAverages[i] /= seasonalCounts[i];
-                }}
-            }}
-
-            // Центрируем сезонность
-            const seasonalMean = seasonalAverages.reduce((a, b) => a + b, 0) / period;
-            const seasonal = values.map((_, i) => seasonalAverages[i % period] - seasonalMean);
-
-            // 4. Остатки
-            const residual = values.map((v, i) => {{
-                if (trend[i] !== null) {{
-                    return v - trend[i] - seasonal[i];
+            // 2. Сезонный индекс по календарному месяцу
+            const position = i => (first + i) % period;
+            const sums = new Array(period).fill(0);
+            const counts = new Array(period).fill(0);
+            grid.forEach((v, i) => {{
+                if (v !== null && trend[i] !== null) {{
+                    sums[position(i)] += v - trend[i];
+                    counts[position(i)]++;
                 }}
-                return null;
             }});
-
-            return {{ trend, seasonal, residual }};
+            const averages = sums.map((s, p) => counts[p] > 0 ? s / counts[p] : 0);
+            const withData = counts.filter(c => c > 0).length;
+            const mean = withData > 0 ? averages.reduce((a, b) => a + b, 0) / withData : 0;
+            const index = averages.map((a, p) => counts[p] > 0 ? a - mean : 0);
+
+            // 3. Сезонность и остатки
+            const seasonal = grid.map((_, i) => index[position(i)]);
+            const residual = grid.map((v, i) => v !== null && trend[i] !== null ? v - trend[i] - seasonal[i] : null);
+
+            return {{
+                ordinals: grid.map((_, i) => first + i),
+                values: grid,
+                trend,
+                seasonal,
+                residual
+            }};
         }}
 
-        function update{self.chart_id}() {{
-            // Инициализация селекторов при первом вызове
-            if (!window.{self.chart_id}_initialized) {{
-                initSelectors_{self.chart_id}();
-                window.{self.chart_id}_initialized = true;
-            }}
-
-            // Используем rawData и фильтруем локально
-            const data = window.rawData;
-
-            const storeSelect = document.getElementById('{self.chart_id}_store');
-            const metricSelect = document.getElementById('{self.chart_id}_metric');
-            const typeSelect = document.getElementById('{self.chart_id}_product_type');
-            const productSelect = document.getElementById('{self.chart_id}_product');
-            const dateFromInput = document.getElementById('{self.chart_id}_date_from');
-            const dateToInput = document.getElementById('{self.chart_id}_date_to');
+        /**
+         * Номер месяца (year * 12 + month) -> '01.MM.YYYY'
+         */
+        function monthLabel_{self.chart_id}(ordinal) {{
+            const year = Math.floor((ordinal - 1) / 12);
+            return '01.' + String(ordinal - year * 12).padStart(2, '0') + '.' + year;
+        }}
 
-            const modeSelect = document.getElementById('{self.chart_id}_mode');
+        /**
+         * Ряд выбранного магазина/типа/товара и его декомпозиция
+         *
+         * Для выручки по магазину или типу за весь период - готовые массивы
+         * из Python (decompose_store_series), без прохода по rawData.
+         *
+         * @returns {{Object|null}} {{ periods, values, trend, seasonal, residual }}
+         */
+        function decomposeSelection_{self.chart_id}() {{
+            const selectedStore = document.getElementById('{self.chart_id}_store').value;
+            const selectedMetric = document.getElementById('{self.chart_id}_metric').value;
+            const selectedType = document.getElementById('{self.chart_id}_product_type').value;
+            const selectedProduct = document.getElementById('{self.chart_id}_product').value;
+            const dateFrom = document.getElementById('{self.chart_id}_date_from').value; // YYYY-MM-DD
+            const dateTo = document.getElementById('{self.chart_id}_date_to').value;
 
-            const selectedStore = storeSelect.value;
-            const selectedMetric = metricSelect.value;
-            const selectedType = typeSelect.value;
-            const selectedProduct = productSelect.value;
-            const selectedMode = modeSelect ? modeSelect.value : 'absolute';
-            const dateFrom = dateFromInput.value; // YYYY-MM-DD
-            const dateTo = dateToInput.value;
+            if (!selectedStore) return null;
 
-            if (!selectedStore) return;
+            const precomputed = window.decomposition_{self.chart_id};
+            const range = window.{self.chart_id}_dateRange;
+            const fullRange = !range || ((!dateFrom || dateFrom <= range.min) && (!dateTo || dateTo >= range.max));
+            const series = precomputed && precomputed.series[selectedStore]
+                ? precomputed.series[selectedStore][selectedType]
+                : null;
+            if (series && selectedMetric === precomputed.metric && selectedProduct === 'all' && fullRange) {{
+                return {{
+                    periods: series.values.map((_, i) => monthLabel_{self.chart_id}(series.start + i)),
+                    values: series.values,
+                    trend: series.trend,
+                    seasonal: series.seasonal,
+                    residual: series.residual
+                }};
+            }}
 
-            // Фильтруем данные по магазину, типу, товару и локальным датам
-            const storeData = data.filter(row => {{
-                // Фильтр по магазину
+            // Фильтруем rawData по магазину, типу, товару и локальным датам
+            const storeData = window.rawData.filter(row => {{
                 if (row['Магазин'] !== selectedStore) return false;
-
-                // Фильтр по типу товара
                 if (selectedType !== 'all' && row['Тип'] !== selectedType) return false;
-
-                // Фильтр по товару
                 if (selectedProduct !== 'all' && row['Товар'] !== selectedProduct) return false;
 
-                // Фильтр по локальным датам
                 if (dateFrom || dateTo) {{
                     const dateStr = row['Дата'];
                     if (!dateStr) return false;
 
-                    const parts = dateStr.split('.');
-                    if (parts.length !== 3) return false;
+                    const dateInfo = rowDate(row);
+                    if (!dateInfo) return false;
 
-                    const day = parseInt(parts[0]);
-                    const month = parseInt(parts[1]);
-                    const year = parseInt(parts[2]);
+                    const {{ day, month, year }} = dateInfo;
                     const isoDate = `${{year}}-${{String(month).padStart(2, '0')}}-${{String(day).padStart(2, '0')}}`;
 
                     if (dateFrom && isoDate < dateFrom) return false;
@@ -665,22 +698,20 @@ class ChartTimeDecomposition(BaseChart):
                 return true;
             }});
 
-            // Группировка по месяцам
+            // Группировка по номеру месяца
             const monthlyData = {{}};
 
             storeData.forEach(row => {{
                 const dateStr = row['Дата'];
                 if (!dateStr) return;
 
-                const parts = dateStr.split('.');
-                if (parts.length !== 3) return;
+                const dateInfo = rowDate(row);
+                if (!dateInfo) return;
 
-                const month = parseInt(parts[1]);
-                const year = parseInt(parts[2]);
-                const periodKey = `01.${{String(month).padStart(2, '0')}}.${{year}}`;
+                const ordinal = dateInfo.ordinal;
 
-                if (!monthlyData[periodKey]) {{
-                    monthlyData[periodKey] = {{
+                if (!monthlyData[ordinal]) {{
+                    monthlyData[ordinal] = {{
                         revenue: 0,
                         profit: 0,
                         checks: 0,
@@ -689,23 +720,18 @@ class ChartTimeDecomposition(BaseChart):
                     }};
                 }}
 
-                monthlyData[periodKey].revenue += parseFloat(row['Сумма в чеке']) || 0;
-                monthlyData[periodKey].profit += parseFloat(row['Наценка продажи в чеке']) || 0;
+                monthlyData[ordinal].revenue += parseFloat(row['Сумма в чеке']) || 0;
+                monthlyData[ordinal].profit += parseFloat(row['Наценка продажи в чеке']) || 0;
                 // Используем хелпер для корректного подсчёта чеков (группировка по магазину)
-                monthlyData[periodKey].checks += getChecksValue(row, 'Магазин');
-                monthlyData[periodKey].quantity += parseFloat(row['Количество в чеке']) || 0;
+                monthlyData[ordinal].checks += getChecksValue(row, 'Магазин');
+                monthlyData[ordinal].quantity += parseFloat(row['Количество в чеке']) || 0;
             }});
 
-            // Сортируем по датам
-            const periods = Object.keys(monthlyData).sort((a, b) => {{
-                const [d1, m1, y1] = a.split('.');
-                const [d2, m2, y2] = b.split('.');
-                return (parseInt(y1) * 12 + parseInt(m1)) - (parseInt(y2) * 12 + parseInt(m2));
-            }});
+            const ordinals = Object.keys(monthlyData).map(Number).sort((a, b) => a - b);
 
             // Вычисляем метрику
-            const values = periods.map(p => {{
-                const d = monthlyData[p];
+            const values = ordinals.map(o => {{
+                const d = monthlyData[o];
                 switch (selectedMetric) {{
                     case 'Сумма в чеке': return d.revenue;
                     case 'Число чеков': return d.checks;
@@ -718,8 +744,39 @@ class ChartTimeDecomposition(BaseChart):
                 }}
             }});
 
-            // Декомпозиция
-            const {{ trend, seasonal, residual }} = simpleDecompose(values, 12);
+            const result = seasonalDecompose(values, ordinals, 12);
+            return {{
+                periods: result.ordinals.map(monthLabel_{self.chart_id}),
+                values: result.values,
+                trend: result.trend,
+                seasonal: result.seasonal,
+                residual: result.residual
+            }};
+        }}
+
+        function update{self.chart_id}() {{
+            // Инициализация селекторов при первом вызове
+            if (!window.{self.chart_id}_initialized) {{
+                initSelectors_{self.chart_id}();
+                window.{self.chart_id}_initialized = true;
+            }}
+
+            const storeSelect = document.getElementById('{self.chart_id}_store');
+            const metricSelect = document.getElementById('{self.chart_id}_metric');
+            const typeSelect = document.getElementById('{self.chart_id}_product_type');
+            const productSelect = document.getElementById('{self.chart_id}_product');
+            const modeSelect = document.getElementById('{self.chart_id}_mode');
+
+            const selectedStore = storeSelect.value;
+            const selectedMetric = metricSelect.value;
+            const selectedType = typeSelect.value;
+            const selectedProduct = productSelect.value;
+            const selectedMode = modeSelect ? modeSelect.value : 'absolute';
+
+            // Ряд и декомпозиция
+            const decomposition = decomposeSelection_{self.chart_id}();
+            if (!decomposition) return;
+            const {{ periods, values, trend, seasonal, residual }} = decomposition;
 
             // Расчёт процентного вклада каждой компоненты (через дисперсию)
             function calcVariance(arr) {{
@@ -904,7 +961,7 @@ class ChartTimeDecomposition(BaseChart):
                 yaxis4: {{ title: yAxisTitles.y4, titlefont: {{ size: 12 }} }}
             }};
 
-            Plotly.newPlot('{self.chart_id}', [trace1, trace2, trace3, trace4], layout, {{responsive: true}});
+            renderPlot_{self.chart_id}([trace1, trace2, trace3, trace4], layout, {{responsive: true}});
 
             // Обновляем таблицу если открыта
             const tableDiv = document.getElementById('{self.chart_id}_table');
@@ -914,102 +971,13 @@ class ChartTimeDecomposition(BaseChart):
         }}
 
         function getTableData_{self.chart_id}() {{
-            const data = window.rawData;
-            const storeSelect = document.getElementById('{self.chart_id}_store');
-            const metricSelect = document.getElementById('{self.chart_id}_metric');
-            const typeSelect = document.getElementById('{self.chart_id}_product_type');
-            const productSelect = document.getElementById('{self.chart_id}_product');
-            const dateFromInput = document.getElementById('{self.chart_id}_date_from');
-            const dateToInput = document.getElementById('{self.chart_id}_date_to');
-
-            const selectedStore = storeSelect.value;
-            const selectedMetric = metricSelect.value;
-            const selectedType = typeSelect.value;
-            const selectedProduct = productSelect.value;
-            const dateFrom = dateFromInput.value;
-            const dateTo = dateToInput.value;
-
-            if (!selectedStore) return [];
-
-            const storeData = data.filter(row => {{
-                if (row['Магазин'] !== selectedStore) return false;
-                if (selectedType !== 'all' && row['Тип'] !== selectedType) return false;
-                if (selectedProduct !== 'all' && row['Товар'] !== selectedProduct) return false;
-
-                if (dateFrom || dateTo) {{
-                    const dateStr = row['Дата'];
-                    if (!dateStr) return false;
-
-                    const parts = dateStr.split('.');
-                    if (parts.length !== 3) return false;
-
-                    const day = parseInt(parts[0]);
-                    const month = parseInt(parts[1]);
-                    const year = parseInt(parts[2]);
-                    const isoDate = `${{year}}-${{String(month).padStart(2, '0')}}-${{String(day).padStart(2, '0')}}`;
-
-                    if (dateFrom && isoDate < dateFrom) return false;
-                    if (dateTo && isoDate > dateTo) return false;
-                }}
-
-                return true;
-            }});
-
-            const monthlyData = {{}};
-
-            storeData.forEach(row => {{
-                const dateStr = row['Дата'];
-                if (!dateStr) return;
-
-                const parts = dateStr.split('.');
-                if (parts.length !== 3) return;
-
-                const month = parseInt(parts[1]);
-                const year = parseInt(parts[2]);
-                const periodKey = `01.${{String(month).padStart(2, '0')}}.${{year}}`;
-
-                if (!monthlyData[periodKey]) {{
-                    monthlyData[periodKey] = {{
-                        revenue: 0,
-                        profit: 0,
-                        checks: 0,
-                        quantity: 0,
-                        area: parseFloat(row['Торговая площадь магазина']) || 0
-                    }};
-                }}
-
-                monthlyData[periodKey].revenue += parseFloat(row['Сумма в чеке']) || 0;
-                monthlyData[periodKey].profit += parseFloat(row['Наценка продажи в чеке']) || 0;
-                // Используем хелпер для корректного подсчёта чеков (группировка по магазину)
-                monthlyData[periodKey].checks += getChecksValue(row, 'Магазин');
-                monthlyData[periodKey].quantity += parseFloat(row['Количество в чеке']) || 0;
-            }});
-
-            const periods = Object.keys(monthlyData).sort((a, b) => {{
-                const [d1, m1, y1] = a.split('.');
-                const [d2, m2, y2] = b.split('.');
-                return (parseInt(y1) * 12 + parseInt(m1)) - (parseInt(y2) * 12 + parseInt(m2));
-            }});
-
-            const values = periods.map(p => {{
-                const d = monthlyData[p];
-                switch (selectedMetric) {{
-                    case 'Сумма в чеке': return d.revenue;
-                    case 'Число чеков': return d.checks;
-                    case 'Количество в чеке': return d.quantity;
-                    case 'Наценка продажи в чеке': return d.profit;
-                    case 'revenue_per_m2': return d.area > 0 ? d.revenue / d.area : 0;
-                    case 'profit_per_m2': return d.area > 0 ? d.profit / d.area : 0;
-                    case 'margin': return d.revenue > 0 ? (d.profit / d.revenue) * 100 : 0;
-                    default: return d.revenue;
-                }}
-            }});
-
-            const {{ trend, seasonal, residual }} = simpleDecompose(values, 12);
+            const decomposition = decomposeSelection_{self.chart_id}();
+            if (!decomposition) return [];
+            const {{ periods, values, trend, seasonal, residual }} = decomposition;
 
             return periods.map((period, i) => ({{
                 'Период': period,
-                'Значение': Math.round(values[i] * 100) / 100,
+                'Значение': values[i] !== null ? Math.round(values[i] * 100) / 100 : null,
                 'Тренд': trend[i] !== null ? Math.round(trend[i] * 100) / 100 : null,
                 'Сезонность': Math.round(seasonal[i] * 100) / 100,
                 'Остатки': residual[i] !== null ? Math.round(residual[i] * 100) / 100 : null
@@ -130,11 +130,10 @@ class ChartYoYComparison(BaseChart):
                 const dateStr = row['Дата'];
                 if (!dateStr) return;
 
-                const parts = dateStr.split('.');
-                if (parts.length !== 3) return;
+                const dateInfo = rowDate(row);
+                if (!dateInfo) return;
 
-                const month = parseInt(parts[1]);
-                const year = parseInt(parts[2]);
+                const {{ month, year }} = dateInfo;
 
                 if (!yearMonthData[year]) {{
                     yearMonthData[year] = {{}};
@@ -208,7 +207,7 @@ class ChartYoYComparison(BaseChart):
                 height: 500
             }};
 
-            Plotly.newPlot('{self.chart_id}', traces, layout, {{responsive: true}});
+            renderPlot_{self.chart_id}(traces, layout, {{responsive: true}});
 
             // Обновляем таблицу если открыта
             const tableDiv = document.getElementById('{self.chart_id}_table');
@@ -233,11 +232,10 @@ class ChartYoYComparison(BaseChart):
                 const dateStr = row['Дата'];
                 if (!dateStr) return;
 
-                const parts = dateStr.split('.');
-                if (parts.length !== 3) return;
+                const dateInfo = rowDate(row);
+                if (!dateInfo) return;
 
-                const month = parseInt(parts[1]);
-                const year = parseInt(parts[2]);
+                const {{ month, year }} = dateInfo;
 
                 if (!yearMonthData[year]) {{
                     yearMonthData[year] = {{}};
@@ -0,0 +1,301 @@
+# PROJECT_ROOT: engine/aggregation.py
+"""
+Общий агрегатор для графиков (JS, выгружается в шаблон один раз)
+
+Раньше каждый график содержал свою копию aggregateStoreData_*, parseFloat(row[...])
+и разбор строки 'DD.MM.YYYY', и после каждого applyFilters() шесть графиков
+заново считали почти одинаковые суммы по магазинам.
+
+Теперь графики вызывают:
+    groupBy(['Магазин'], {revenue: 'Сумма в чеке', area: {column: 'Торговая площадь магазина', op: 'first'}})
+
+Результат кэшируется по ключу (версия фильтров, источник, ключи, показатели):
+повторный запрос с тем же набором на том же состоянии фильтров не проходит
+по данным ещё раз. applyFilters() увеличивает window.filterVersion, что
+сбрасывает кэш.
+"""
+
+
+def get_aggregation_js() -> str:
+    """
+    Генерирует JS код общего агрегатора (Aggregator, groupBy)
+
+    API:
+        groupBy(keys, measures, options)  - массив групп {ключи..., показатели...}
+            keys      - колонки группировки; '@month' - период '01.MM.YYYY',
+                        '@period' - порядковый номер месяца year * 12 + month
+                        (число, сортируется без разбора строки), '@year' - год (см. rowDate)
+            measures  - {имя: 'Колонка'} (сумма) или {имя: {column, op}},
+                        op: 'sum' | 'first' | 'min' | 'max' | 'count' | 'checks'
+                        ('checks' - getChecksValue(row, groupBy), по умолчанию по первому ключу)
+            options.source - 'auto' (куб, если не нужен разрез по товарам),
+                        'rows' (отфильтрованные строки), 'raw' (все данные без фильтров)
+        Aggregator.toNumber(value)        - parseFloat(value) || 0
+        rowDate(row)                      - {day, month, year, ordinal, monthKey, date} строки
+                                            (из 'Период_номер' без разбора строки, если данные помесячные)
+        dateParts(dateStr)                - то же для строки 'DD.MM.YYYY'
+        periodParts(period)               - то же для порядкового номера месяца ('@period')
+        Aggregator.STORE_TOTALS           - общий набор показателей по магазинам
+
+    Returns:
+        JS код
+    """
+    return '''
+        // ============================================================================
+        // ОБЩИЙ АГРЕГАТОР (groupBy с кэшем по состоянию фильтров)
+        // ============================================================================
+
+        /**
+         * Получение корректного значения чеков в зависимости от группировки.
+         *
+         * Проблема: В DataFrame один чек размножается на все товары типа.
+         * Решение: Используем разные колонки для разных группировок:
+         * - Группировка по Тип: 'Чеки_по_типу' (чеки данного типа)
+         * - Группировка по Магазин/Товар: 'Число чеков' (общее кол-во чеков)
+         *
+         * @param {Object} row - Строка данных
+         * @param {String} groupBy - Поле группировки ('Магазин', 'Тип', 'Товар')
+         * @returns {Number} Корректное значение чеков
+         */
+        function getChecksValue(row, groupBy) {
+            if (groupBy === 'Тип') {
+                // Группировка по типу - используем чеки по типу
+                return parseFloat(row['Чеки_по_типу']) || 0;
+            } else if (groupBy === 'Товар') {
+                // Группировка по товару - используем оригинальные чеки из основного файла
+                return parseFloat(row['Чеки_оригинал']) || 0;
+            }
+            // Группировка по магазину или другим полям
+            return parseFloat(row['Число чеков']) || 0;
+        }
+        window.getChecksValue = getChecksValue;
+
+        /**
+         * Компоненты даты (результаты кэшируются - различных дат немного).
+         * Общие объекты: не изменять, date - только для чтения.
+         *
+         * ordinal = year * 12 + month (как колонка 'Период_номер' из create_date_column)
+         * monthKey = '01.MM.YYYY'
+         */
+        const dateCache = new Map();
+        const periodCache = new Map();
+
+        function makeDateParts(day, month, year) {
+            return {
+                day, month, year,
+                ordinal: year * 12 + month,
+                monthKey: `01.${String(month).padStart(2, '0')}.${year}`,
+                date: new Date(year, month - 1, day)
+            };
+        }
+
+        function dateParts(dateStr) {
+            if (!dateStr) return null;
+            let parts = dateCache.get(dateStr);
+            if (parts === undefined) {
+                const p = String(dateStr).split('.');
+                parts = p.length === 3
+                    ? makeDateParts(parseInt(p[0]), parseInt(p[1]), parseInt(p[2]))
+                    : null;
+                dateCache.set(dateStr, parts);
+            }
+            return parts;
+        }
+
+        function periodParts(period) {
+            let parts = periodCache.get(period);
+            if (parts === undefined) {
+                const month = (period - 1) % 12 + 1;
+                parts = makeDateParts(1, month, (period - month) / 12);
+                periodCache.set(period, parts);
+            }
+            return parts;
+        }
+
+        /**
+         * Дата строки: для помесячных данных (нет уровня 'day') - из числового
+         * 'Период_номер', без разбора строки 'Дата'; иначе - dateParts(row['Дата'])
+         *
+         * @param {Object} row - Строка данных (или куба)
+         * @returns {Object|null} {day, month, year, ordinal, monthKey, date}
+         */
+        function rowDate(row) {
+            const period = row['Период_номер'];
+            if (typeof period === 'number' && period > 0 && window.availableDetailLevels &&
+                !window.availableDetailLevels.includes('day')) {
+                return periodParts(period);
+            }
+            return dateParts(row['Дата']);
+        }
+        window.dateParts = dateParts;
+        window.periodParts = periodParts;
+        window.rowDate = rowDate;
+
+        const Aggregator = (function () {
+
+            // Колонки уровня товара: если они нужны, куб не подходит
+            const PRODUCT_COLUMNS = ['Товар', 'Чеки_оригинал'];
+
+            // Общий набор показателей по магазинам: графики площади запрашивают его
+            // одинаково, поэтому считается один раз на состояние фильтров
+            const STORE_TOTALS = {
+                revenue: 'Сумма в чеке',
+                profit: 'Наценка продажи в чеке',
+                cost: 'Себестоимость продажи в чеке',
+                area: { column: 'Торговая площадь магазина', op: 'first' }
+            };
+
+            const cache = new Map();
+            let cacheVersion = null;
+            const stats = { hits: 0, misses: 0 };
+
+            // Все различные запросы графиков (для предрасчёта в Web Worker)
+            const requestLog = new Map();
+
+            function toNumber(value) {
+                return parseFloat(value) || 0;
+            }
+
+            const DERIVED_KEYS = {
+                '@month': row => {
+                    const d = rowDate(row);
+                    return d ? d.monthKey : null;
+                },
+                '@period': row => {
+                    const period = row['Период_номер'];
+                    if (typeof period === 'number' && period > 0) return period;
+                    const d = rowDate(row);
+                    return d ? d.ordinal : null;
+                },
+                '@year': row => {
+                    const d = rowDate(row);
+                    return d ? d.year : null;
+                }
+            };
+
+            function normalizeMeasures(measures, keys) {
+                return Object.keys(measures).map(name => {
+                    const spec = typeof measures[name] === 'string'
+                        ? { column: measures[name], op: 'sum' }
+                        : Object.assign({ op: 'sum' }, measures[name]);
+                    if (spec.op === 'checks' && !spec.groupBy) spec.groupBy = keys[0];
+                    spec.name = name;
+                    return spec;
+                });
+            }
+
+            function needsProducts(keys, specs) {
+                return keys.some(k => PRODUCT_COLUMNS.includes(k)) ||
+                    specs.some(s => PRODUCT_COLUMNS.includes(s.column) ||
+                        (s.op === 'checks' && s.groupBy === 'Товар'));
+            }
+
+            function resolveSource(source, byProduct) {
+                if (source === 'raw') {
+                    return { label: byProduct ? 'raw' : 'raw-store', data: byProduct ? window.rawData : getStoreLevelRawData() };
+                }
+                if (source === 'rows' || byProduct) {
+                    return { label: 'rows', data: window.filteredData || window.rawData };
+                }
+                const data = getStoreLevelData();
+                return { label: data === window.filteredCube ? 'cube' : 'rows', data: data };
+            }
+
+            /**
+             * Группировка с суммированием показателей
+             *
+             * Возвращает общий (кэшированный) массив - не изменять его элементы
+             */
+            function groupBy(keys, measures, options) {
+                options = options || {};
+                const specs = normalizeMeasures(measures || {}, keys);
+                const src = resolveSource(options.source || 'auto', needsProducts(keys, specs));
+
+                const version = window.filterVersion || 0;
+                if (version !== cacheVersion) {
+                    cache.clear();
+                    cacheVersion = version;
+                }
+
+                requestLog.set(JSON.stringify([keys, measures, options]), { keys, measures, options });
+
+                const cacheKey = JSON.stringify([src.label, keys, specs]);
+                const cached = cache.get(cacheKey);
+                if (cached) {
+                    stats.hits++;
+                    return cached;
+                }
+                stats.misses++;
+
+                const keyGetters = keys.map(k => DERIVED_KEYS[k] || (row => row[k]));
+                const groups = new Map();
+                const data = src.data || [];
+
+                for (let i = 0; i < data.length; i++) {
+                    const row = data[i];
+                    const keyValues = keyGetters.map(get => get(row));
+                    if (keyValues.some(v => v === null || v === undefined || v === '')) continue;
+
+                    const groupKey = keyValues.join('\\u0001');
+                    let group = groups.get(groupKey);
+                    if (!group) {
+                        group = {};
+                        keys.forEach((k, j) => { group[k] = keyValues[j]; });
+                        specs.forEach(s => {
+                            group[s.name] = s.op === 'first' ? toNumber(row[s.column])
+                                : s.op === 'min' ? Infinity
+                                : s.op === 'max' ? -Infinity
+                                : 0;
+                        });
+                        groups.set(groupKey, group);
+                    }
+
+                    for (let j = 0; j < specs.length; j++) {
+                        const s = specs[j];
+                        switch (s.op) {
+                            case 'sum': group[s.name] += toNumber(row[s.column]); break;
+                            case 'checks': group[s.name] += getChecksValue(row, s.groupBy); break;
+                            case 'count': group[s.name] += 1; break;
+                            case 'min': group[s.name] = Math.min(group[s.name], toNumber(row[s.column])); break;
+                            case 'max': group[s.name] = Math.max(group[s.name], toNumber(row[s.column])); break;
+                        }
+                    }
+                }
+
+                const result = Array.from(groups.values());
+                cache.set(cacheKey, result);
+                if (window.PerfProfiler) PerfProfiler.scanned(data.length);
+                return result;
+            }
+
+            /**
+             * Ключ кэша запроса при текущем состоянии фильтров
+             */
+            function cacheKeyOf(keys, measures, options) {
+                options = options || {};
+                const specs = normalizeMeasures(measures || {}, keys);
+                const src = resolveSource(options.source || 'auto', needsProducts(keys, specs));
+                return JSON.stringify([src.label, keys, specs]);
+            }
+
+            /**
+             * Запросы, которые графики делали с момента загрузки
+             */
+            function requests() {
+                return Array.from(requestLog.values());
+            }
+
+            /**
+             * Заполнить кэш готовыми результатами (из Web Worker) для версии фильтров
+             */
+            function prime(version, entries) {
+                cache.clear();
+                cacheVersion = version;
+                entries.forEach(([key, groups]) => cache.set(key, groups));
+            }
+
+            return { groupBy, toNumber, dateParts, rowDate, cacheKeyOf, requests, prime, STORE_TOTALS, stats };
+        })();
+        window.Aggregator = Aggregator;
+        window.groupBy = Aggregator.groupBy;
+'''
@@ -0,0 +1,80 @@
+# PROJECT_ROOT: engine/analytics/__init__.py
+"""
+Пакетная аналитика по магазинам на NumPy (без браузера)
+
+Расчёты графиков (DEA, регрессии, маржинальный анализ, кластеризация,
+декомпозиция рядов, медианы оптимальной площади) раньше существовали только
+как JS внутри классов графиков. Здесь те же формулы, векторизованные по всем
+магазинам сразу: отчёты, контекст LLM и проверки могут получить их за один
+проход по DataFrame.
+
+Результаты совпадают с JS при тех же входных данных: те же округления
+(js_round = Math.round), те же правила отбора магазинов и порядок строк.
+Имена полей - как в JS (store, area, revenuePerM2, ...).
+
+dea_lp - настоящий DEA (CCR / BCC) на линейном программировании; его
+результаты (dea_lp_payload) встраиваются в график DEA.
+
+kmeans_clusters - кластеры k-means++ по нескольким признакам с выбором k
+по силуэту (метод 'kmeans' графика кластеров).
+
+precompute_slice_results - результаты DEA, кластеров и регрессии для типовых
+срезов фильтров с ключами ResultCache (engine/result_cache.py).
+
+Пример:
+    from engine.analytics import store_totals, add_per_m2, dea_scores
+
+    stores = add_per_m2(store_totals(df), rounded=False)
+    dea = dea_scores(stores[stores['area'] > 0], output_metric='revenue')
+"""
+from .store_metrics import (
+    STORE_TOTALS,
+    js_round,
+    store_totals,
+    store_period_totals,
+    add_per_m2,
+)
+from .regression import linear_regression, quadratic_regression, top_n_optimum
+from .dea import dea_scores, find_benchmarks
+from .dea_lp import DEA_INPUTS, DEA_OUTPUTS, DEA_MODELS, dea_lp, dea_lp_payload
+from .marginal import marginal_analysis
+from .clustering import assign_clusters, cluster_stats
+from .kmeans import (
+    CLUSTER_FEATURES,
+    mulberry32,
+    standardize,
+    kmeans,
+    silhouette,
+    select_k,
+    cluster_features,
+    kmeans_clusters,
+    area_clusters,
+)
+from .decomposition import (
+    SEASONAL_PERIOD,
+    seasonal_decompose,
+    seasonal_decompose_batch,
+    decompose_store_series,
+)
+from .medians import (
+    MEDIAN_METRICS,
+    store_card_metrics,
+    metric_medians,
+    efficiency_status,
+    optimal_area_trend,
+)
+from .slices import DEFAULT_SLICE_PARAMS, build_calendar, filter_key, common_slices, precompute_slice_results
+
+__all__ = [
+    'STORE_TOTALS', 'js_round', 'store_totals', 'store_period_totals', 'add_per_m2',
+    'linear_regression', 'quadratic_regression', 'top_n_optimum',
+    'dea_scores', 'find_benchmarks',
+    'DEA_INPUTS', 'DEA_OUTPUTS', 'DEA_MODELS', 'dea_lp', 'dea_lp_payload',
+    'marginal_analysis',
+    'assign_clusters', 'cluster_stats',
+    'CLUSTER_FEATURES', 'mulberry32', 'standardize', 'kmeans', 'silhouette', 'select_k',
+    'cluster_features', 'kmeans_clusters', 'area_clusters',
+    'SEASONAL_PERIOD', 'seasonal_decompose', 'seasonal_decompose_batch', 'decompose_store_series',
+    'MEDIAN_METRICS', 'store_card_metrics', 'metric_medians', 'efficiency_status', 'optimal_area_trend',
+    'DEFAULT_SLICE_PARAMS', 'build_calendar', 'filter_key', 'common_slices', 'precompute_slice_results',
+]
@@ -0,0 +1,69 @@
+# PROJECT_ROOT: engine/analytics/clustering.py
+"""
+Кластеризация магазинов по площади (как assignClusters_ / calculateClusterStats_
+графика ChartClusterAnalysis)
+
+Магазины делятся на 2-4 группы равного размера по квантилям площади;
+по каждой группе - диапазон площади, средние показатели на м² и лидер.
+"""
+import numpy as np
+import pandas as pd
+
+from .store_metrics import js_round
+
+
+CLUSTER_NAMES = {
+    2: ['Малые', 'Крупные'],
+    3: ['Малые', 'Средние', 'Крупные'],
+    4: ['Малые', 'Средние', 'Крупные', 'Очень крупные'],
+}
+
+
+def assign_clusters(stores: pd.DataFrame, num_clusters: int = 3) -> pd.DataFrame:
+    """
+    Разбиение на кластеры по квантилям площади
+
+    Args:
+        stores: add_per_m2(store_totals(df)), только магазины с площадью > 0
+        num_clusters: число кластеров (2, 3 или 4)
+
+    Returns:
+        Копия stores по возрастанию площади с колонкой cluster
+    """
+    names = CLUSTER_NAMES.get(num_clusters, CLUSTER_NAMES[4])
+    result = stores.sort_values('area', kind='stable', ignore_index=True)
+    n = len(result)
+    cluster_size = max(1, -(-n // num_clusters))
+    index = np.minimum(np.arange(n) // cluster_size, num_clusters - 1)
+    result['cluster'] = np.asarray(names, dtype=object)[np.minimum(index, len(names) - 1)]
+    return result
+
+
+def cluster_stats(stores: pd.DataFrame, metric: str = 'revenuePerM2') -> pd.DataFrame:
+    """
+    Статистика по кластерам
+
+    Args:
+        stores: результат assign_clusters
+        metric: показатель, по которому выбирается лидер кластера
+
+    Returns:
+        DataFrame по возрастанию avgArea: cluster, count, minArea, maxArea, avgArea,
+        avgRevenuePerM2, avgProfitPerM2, leader (магазин с максимумом metric,
+        при равенстве - первый)
+    """
+    grouped = stores.groupby('cluster', sort=False)
+    stats = grouped.agg(
+        count=('store', 'size'),
+        minArea=('area', 'min'),
+        maxArea=('area', 'max'),
+        avgArea=('area', 'mean'),
+        avgRevenuePerM2=('revenuePerM2', 'mean'),
+        avgProfitPerM2=('profitPerM2', 'mean'),
+    )
+    for column in ('avgArea', 'avgRevenuePerM2', 'avgProfitPerM2'):
+        stats[column] = js_round(stats[column].to_numpy())
+
+    stats['leader'] = stores.loc[grouped[metric].idxmax(), 'store'].to_numpy()
+    stats = stats.reset_index()
+    return stats.sort_values('avgArea', kind='stable', ignore_index=True)
@@ -0,0 +1,79 @@
+# PROJECT_ROOT: engine/analytics/dea.py
+"""
+DEA-оценка эффективности магазинов (как calculateDEA_ графика ChartDEAAnalysis)
+
+Многокритериальный балл: выручка, прибыль и EBITDA на м² нормализуются
+min-max по всем магазинам и складываются с весами 40/35/25 %.
+Эффективные - балл >= 95 %.
+"""
+import numpy as np
+import pandas as pd
+
+from .store_metrics import js_round
+
+
+# Веса нормализованных показателей в композитном балле
+DEA_WEIGHTS = {'revenue': 0.40, 'profit': 0.35, 'ebitda': 0.25}
+
+# Порог эффективности, %
+EFFICIENT_SCORE = 95.0
+
+
+def dea_scores(stores: pd.DataFrame, output_metric: str = 'revenue') -> pd.DataFrame:
+    """
+    Балл эффективности по всем магазинам сразу
+
+    Args:
+        stores: add_per_m2(..., rounded=False), только магазины с площадью > 0
+        output_metric: 'revenue' | 'profit' | 'ebitda' - показатель для колонок output
+
+    Returns:
+        DataFrame по убыванию efficiencyScore: store, area, output, outputPerM2,
+        revenuePerM2, profitPerM2, ebitdaPerM2, revenueNorm, profitNorm, ebitdaNorm,
+        efficiencyScore, isEfficient, potentialImprovement, rank
+    """
+    result = pd.DataFrame({
+        'store': stores['store'].to_numpy(),
+        'area': stores['area'].to_numpy(dtype=float),
+        'output': stores[output_metric].to_numpy(dtype=float),
+        'outputPerM2': stores[output_metric + 'PerM2'].to_numpy(dtype=float),
+    })
+
+    score = np.zeros(len(stores))
+    for metric, weight in DEA_WEIGHTS.items():
+        values = stores[metric + 'PerM2'].to_numpy(dtype=float)
+        result[metric + 'PerM2'] = values
+        value_range = values.max() - values.min() if len(values) else 0.0
+        normalized = (values - values.min()) / value_range if value_range != 0 else np.ones(len(values))
+        result[metric + 'Norm'] = normalized * 100
+        score += normalized * weight
+    score *= 100
+
+    result['efficiencyScore'] = js_round(score * 10) / 10
+    result['isEfficient'] = score >= EFFICIENT_SCORE
+    result['potentialImprovement'] = js_round((100 - score) * 10) / 10
+
+    result = result.sort_values('efficiencyScore', ascending=False, kind='stable', ignore_index=True)
+    result['rank'] = np.arange(1, len(result) + 1)
+    return result
+
+
+def find_benchmarks(dea: pd.DataFrame) -> pd.Series:
+    """
+    Эталон для каждого магазина - эффективный магазин с ближайшей площадью
+
+    При равной разнице площадей - первый по порядку dea (как findBenchmark_).
+
+    Args:
+        dea: результат dea_scores
+
+    Returns:
+        Series (индекс dea): название эталонного магазина, None если эффективных нет
+    """
+    efficient = dea[dea['isEfficient']]
+    if efficient.empty:
+        return pd.Series([None] * len(dea), index=dea.index, dtype=object)
+
+    diff = np.abs(dea['area'].to_numpy(dtype=float)[:, None] - efficient['area'].to_numpy(dtype=float)[None, :])
+    nearest = diff.argmin(axis=1)
+    return pd.Series(efficient['store'].to_numpy()[nearest], index=dea.index, dtype=object)
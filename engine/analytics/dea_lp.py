@@ -0,0 +1,217 @@
+# PROJECT_ROOT: engine/analytics/dea_lp.py
+"""
+DEA на линейном программировании: модели CCR и BCC с ориентацией на входы
+
+Для каждого магазина o (DMU) решаются две задачи:
+
+1) min θ  при  Σ λj·xij <= θ·xio,  Σ λj·yrj >= yro,  λ >= 0
+   (BCC: дополнительно Σ λj = 1 - переменная отдача от масштаба)
+2) при найденном θ* - max Σ s⁻ + Σ s⁺ (невязки):
+   Σ λj·xij + s⁻i = θ*·xio,  Σ λj·yrj - s⁺r = yro
+
+Результат:
+- efficiency = θ* (1 - магазин на границе эффективности)
+- peers      - эталоны: магазины с λj > 0 и их веса
+- targets    - целевые входы θ*·xo - s⁻ и выходы yo + s⁺
+
+Входы - площадь (и при желании число чеков), выходы - выручка и наценка.
+Матрицы ограничений общие для всех магазинов, меняются только правые части
+и столбец θ. При большом числе магазинов задачи делятся на части и решаются
+в пуле процессов.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .lp import linprog_eq
+from .medians import store_card_metrics
+
+
+# Входы и выходы по умолчанию: колонки store_card_metrics
+DEA_INPUTS = ['area']
+DEA_OUTPUTS = ['revenue', 'profit']
+
+DEA_MODELS = ('ccr', 'bcc')
+
+# С какого числа магазинов задачи решаются в пуле процессов
+PARALLEL_MIN_DMUS = 300
+
+# Порог веса λ, с которого магазин считается эталоном
+PEER_THRESHOLD = 1e-6
+
+# Невязки меньше этой доли среднего значения колонки - численный шум
+SLACK_TOLERANCE = 1e-7
+
+
+def _solve_dmu(X, Y, o, model):
+    """
+    Две задачи DEA для магазина o
+
+    Args:
+        X: входы (m, n) - масштабированные
+        Y: выходы (s, n) - масштабированные
+        o: номер магазина
+        model: 'ccr' | 'bcc'
+
+    Returns:
+        (θ*, λ (n,), s⁻ (m,), s⁺ (s,))
+    """
+    m, n = X.shape
+    s = Y.shape[0]
+    convex = model == 'bcc'
+
+    # Переменные: θ, λ1..λn, s⁻1..s⁻m, s⁺1..s⁺s
+    n_vars = 1 + n + m + s
+    rows = m + s + (1 if convex else 0)
+    A = np.zeros((rows, n_vars))
+    b = np.zeros(rows)
+
+    A[:m, 0] = X[:, o]
+    A[:m, 1:1 + n] = -X
+    A[:m, 1 + n:1 + n + m] = -np.eye(m)
+    A[m:m + s, 1:1 + n] = Y
+    A[m:m + s, 1 + n + m:] = -np.eye(s)
+    b[m:m + s] = Y[:, o]
+    if convex:
+        A[-1, 1:1 + n] = 1.0
+        b[-1] = 1.0
+
+    # Фаза 1: минимальный θ
+    c = np.zeros(n_vars)
+    c[0] = 1.0
+    theta = float(linprog_eq(c, A, b)[0])
+
+    # Фаза 2: θ зафиксирован, максимизируем сумму невязок
+    A2 = A[:, 1:].copy()
+    b2 = b.copy()
+    b2[:m] = theta * X[:, o]
+    A2[:m] *= -1
+    c2 = np.zeros(n_vars - 1)
+    c2[n:] = -1.0
+    z = linprog_eq(c2, A2, b2)
+
+    return theta, z[:n], z[n:n + m], z[n + m:]
+
+
+def _solve_chunk(args):
+    """Решение задач для части магазинов (выполняется в пуле процессов)"""
+    X, Y, indices, model = args
+    return [_solve_dmu(X, Y, o, model) for o in indices]
+
+
+def dea_lp(stores: pd.DataFrame, inputs=None, outputs=None, model: str = 'ccr',
+           processes: int = None) -> pd.DataFrame:
+    """
+    DEA с ориентацией на входы по всем магазинам
+
+    Магазины без площади (входы <= 0) не оцениваются; отрицательные выходы
+    (убыточные магазины) приравниваются к нулю - DEA требует неотрицательных данных.
+
+    Args:
+        stores: таблица магазинов (store_card_metrics)
+        inputs: колонки входов (по умолчанию DEA_INPUTS, можно добавить 'checks')
+        outputs: колонки выходов (по умолчанию DEA_OUTPUTS)
+        model: 'ccr' (постоянная отдача от масштаба) | 'bcc' (переменная)
+        processes: число процессов; None - пул только от PARALLEL_MIN_DMUS магазинов,
+            1 - всегда в текущем процессе
+
+    Returns:
+        DataFrame по убыванию efficiency: store, efficiency, isEfficient, rank,
+        входы/выходы, slack_<колонка>, target_<колонка>, peers ([(магазин, λ)])
+    """
+    if model not in DEA_MODELS:
+        raise ValueError(f'Неизвестная модель DEA: {model} (ожидается {DEA_MODELS})')
+    inputs = list(inputs or DEA_INPUTS)
+    outputs = list(outputs or DEA_OUTPUTS)
+
+    data = stores[(stores[inputs] > 0).all(axis=1)].reset_index(drop=True)
+    X = data[inputs].to_numpy(dtype=float).T
+    Y = np.clip(data[outputs].to_numpy(dtype=float), 0.0, None).T
+    n = X.shape[1]
+
+    # Масштаб по средним: θ и λ не меняются, а LP лучше обусловлена
+    x_scale = X.mean(axis=1, keepdims=True) if n else np.ones((len(inputs), 1))
+    y_scale = Y.mean(axis=1, keepdims=True) if n else np.ones((len(outputs), 1))
+    y_scale[y_scale == 0] = 1.0
+    Xs = X / x_scale
+    Ys = Y / y_scale
+
+    if processes is None:
+        processes = (os.cpu_count() or 1) if n >= PARALLEL_MIN_DMUS else 1
+    if processes > 1 and n > 1:
+        chunks = [chunk for chunk in np.array_split(np.arange(n), processes * 4) if len(chunk)]
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parts = pool.map(_solve_chunk, [(Xs, Ys, chunk, model) for chunk in chunks])
+            solutions = [solution for part in parts for solution in part]
+    else:
+        solutions = _solve_chunk((Xs, Ys, range(n), model))
+
+    theta = np.array([sol[0] for sol in solutions]).reshape(n)
+    lambdas = np.array([sol[1] for sol in solutions]).reshape(n, n)
+    slack_in = np.array([sol[2] for sol in solutions]).reshape(n, len(inputs)) * x_scale.T
+    slack_out = np.array([sol[3] for sol in solutions]).reshape(n, len(outputs)) * y_scale.T
+
+    slack_in[slack_in < SLACK_TOLERANCE * x_scale.T] = 0.0
+    slack_out[slack_out < SLACK_TOLERANCE * y_scale.T] = 0.0
+    theta = np.minimum(theta, 1.0)
+
+    result = pd.DataFrame({'store': data['store'].to_numpy(), 'efficiency': theta})
+    result['isEfficient'] = (theta >= 1.0 - 1e-6) & (slack_in.sum(axis=1) == 0) & (slack_out.sum(axis=1) == 0)
+    for j, column in enumerate(inputs):
+        result[column] = X[j]
+        result['slack_' + column] = slack_in[:, j]
+        result['target_' + column] = theta * X[j] - slack_in[:, j]
+    for j, column in enumerate(outputs):
+        result[column] = Y[j]
+        result['slack_' + column] = slack_out[:, j]
+        result['target_' + column] = Y[j] + slack_out[:, j]
+
+    names = result['store'].to_numpy()
+    result['peers'] = [
+        [(names[j], float(lambdas[o, j])) for j in np.flatnonzero(lambdas[o] > PEER_THRESHOLD)]
+        for o in range(n)
+    ]
+
+    result = result.sort_values('efficiency', ascending=False, kind='stable', ignore_index=True)
+    result['rank'] = np.arange(1, len(result) + 1)
+    return result
+
+
+def dea_lp_payload(df: pd.DataFrame, inputs=None, outputs=None, processes: int = None) -> dict:
+    """
+    Результаты CCR и BCC для встраивания в график DEA (JSON-совместимые)
+
+    Args:
+        df: строки продаж (все данные, без фильтров)
+        inputs: колонки входов (см. dea_lp)
+        outputs: колонки выходов (см. dea_lp)
+        processes: см. dea_lp
+
+    Returns:
+        {
+            'inputs': [...], 'outputs': [...],
+            'ccr': {магазин: {efficiency, isEfficient, rank, peers, targets, slacks}},
+            'bcc': {...}
+        }
+    """
+    stores = store_card_metrics(df)
+    inputs = list(inputs or DEA_INPUTS)
+    outputs = list(outputs or DEA_OUTPUTS)
+    payload = {'inputs': inputs, 'outputs': outputs}
+
+    for model in DEA_MODELS:
+        result = dea_lp(stores, inputs, outputs, model=model, processes=processes)
+        payload[model] = {
+            row['store']: {
+                'efficiency': round(float(row['efficiency']), 6),
+                'isEfficient': bool(row['isEfficient']),
+                'rank': int(row['rank']),
+                'peers': [[peer, round(weight, 6)] for peer, weight in row['peers']],
+                'targets': {column: round(float(row['target_' + column]), 2) for column in inputs + outputs},
+                'slacks': {column: round(float(row['slack_' + column]), 2) for column in inputs + outputs},
+            }
+            for row in result.to_dict('records')
+        }
+    return payload
@@ -0,0 +1,191 @@
+# PROJECT_ROOT: engine/analytics/decomposition.py
+"""
+Классическая декомпозиция месячных рядов (как seasonalDecompose графика
+ChartTimeDecomposition)
+
+- Ряд выравнивается по порядковому номеру месяца (year * 12 + month,
+  см. 'Период_номер'): пропущенные месяцы остаются пустыми, а не сдвигают ряд
+- Тренд - центрированное скользящее среднее 2×12: 13 точек, крайние с весом
+  1/24, остальные 1/12 (для нечётного периода - простое среднее за период).
+  Если в окне есть пропуск, тренд в этой точке не определён
+- Сезонность - средние отклонения от тренда по календарному месяцу
+  (ordinal % period), центрированные к нулевому среднему
+- Остаток - значение - тренд - сезонность
+
+seasonal_decompose_batch раскладывает сразу матрицу рядов (все магазины × типы)
+одной серией операций NumPy; decompose_store_series готовит результат для
+встраивания в график.
+"""
+import numpy as np
+import pandas as pd
+
+
+# Длина сезонного цикла месячных данных
+SEASONAL_PERIOD = 12
+
+# Знаков после запятой в массивах, встраиваемых в график
+PAYLOAD_DECIMALS = 2
+
+
+def trend_weights(period: int = SEASONAL_PERIOD) -> np.ndarray:
+    """
+    Веса центрированного скользящего среднего
+
+    Args:
+        period: длина сезонного цикла
+
+    Returns:
+        Чётный период - 2×period (period + 1 весов), нечётный - period равных весов
+    """
+    if period % 2 == 0:
+        weights = np.ones(period + 1)
+        weights[[0, -1]] = 0.5
+    else:
+        weights = np.ones(period)
+    return weights / period
+
+
+def seasonal_decompose_batch(values, first_period: int, period: int = SEASONAL_PERIOD) -> dict:
+    """
+    Декомпозиция матрицы рядов на общей сетке месяцев
+
+    Args:
+        values: матрица (k, T) - k рядов по T подряд идущим месяцам, NaN - пропуск
+        first_period: порядковый номер первого месяца сетки (year * 12 + month)
+        period: длина сезонного цикла
+
+    Returns:
+        {'trend', 'seasonal', 'residual'} - матрицы (k, T); NaN там, где тренд
+        или значение не определены (сезонность определена везде)
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    k, T = values.shape
+    weights = trend_weights(period)
+    half = len(weights) // 2
+
+    trend = np.full((k, T), np.nan)
+    if T >= len(weights):
+        windows = np.lib.stride_tricks.sliding_window_view(values, len(weights), axis=1)
+        # Пропуск в окне -> NaN (NaN распространяется через сумму)
+        trend[:, half:T - half] = windows @ weights
+
+    detrended = values - trend
+    valid = ~np.isnan(detrended)
+    position = (first_period + np.arange(T)) % period
+    onehot = np.eye(period)[position]                              # (T, period)
+
+    sums = np.where(valid, detrended, 0.0) @ onehot                # (k, period)
+    counts = valid.astype(float) @ onehot
+    has_data = counts > 0
+    averages = np.divide(sums, counts, out=np.zeros_like(sums), where=has_data)
+
+    # Центрирование по месяцам, для которых есть оценка
+    n_months = has_data.sum(axis=1, keepdims=True)
+    mean = np.divide(averages.sum(axis=1, keepdims=True), n_months,
+                     out=np.zeros((k, 1)), where=n_months > 0)
+    index = np.where(has_data, averages - mean, 0.0)
+
+    seasonal = index[:, position]
+    residual = values - trend - seasonal
+    return {'trend': trend, 'seasonal': seasonal, 'residual': residual}
+
+
+def seasonal_decompose(values, periods, period: int = SEASONAL_PERIOD) -> dict:
+    """
+    Декомпозиция одного ряда
+
+    Args:
+        values: значения ряда
+        periods: порядковые номера месяцев значений (по возрастанию, возможны пропуски)
+        period: длина сезонного цикла
+
+    Returns:
+        {'periods', 'values', 'trend', 'seasonal', 'residual'} - на сплошной
+        сетке месяцев от первого до последнего (пропуски - NaN)
+    """
+    periods = np.asarray(periods, dtype=int)
+    first = int(periods[0])
+    grid = np.full(int(periods[-1]) - first + 1, np.nan)
+    grid[periods - first] = np.asarray(values, dtype=float)
+
+    result = seasonal_decompose_batch(grid[None, :], first, period)
+    return {
+        'periods': np.arange(first, first + len(grid)),
+        'values': grid,
+        **{name: matrix[0] for name, matrix in result.items()},
+    }
+
+
+def period_label(period: int) -> str:
+    """Порядковый номер месяца -> '01.MM.YYYY' (monthKey в JS)"""
+    year, month = divmod(int(period) - 1, 12)
+    return f'01.{month + 1:02d}.{year}'
+
+
+def _rounded(values) -> list:
+    """Массив -> список для JSON (NaN -> None)"""
+    rounded = np.round(values, PAYLOAD_DECIMALS)
+    return [None if np.isnan(v) else float(v) for v in rounded]
+
+
+def decompose_store_series(df: pd.DataFrame, metric: str = 'Сумма в чеке',
+                           period: int = SEASONAL_PERIOD) -> dict:
+    """
+    Декомпозиция всех рядов магазин × тип товара (и магазин целиком) за один проход
+
+    Args:
+        df: строки продаж или куб (Магазин, Тип, Период_номер или Дата, metric)
+        metric: суммируемая колонка
+        period: длина сезонного цикла
+
+    Returns:
+        {
+            'metric': metric,
+            'series': {магазин: {'all' | тип: {'start': ordinal, 'values', 'trend',
+                                               'seasonal', 'residual'}}}
+        }
+        Массивы - от первого до последнего месяца с данными ряда.
+    """
+    data = df.dropna(subset=['Магазин'])
+    if 'Период_номер' in data.columns:
+        ordinal = data['Период_номер']
+    else:
+        dates = pd.to_datetime(data['Дата'], format='%d.%m.%Y', errors='coerce')
+        ordinal = dates.dt.year * 12 + dates.dt.month
+    frame = pd.DataFrame({
+        'store': data['Магазин'].astype(object),
+        'type': data['Тип'].astype(object) if 'Тип' in data.columns else 'all',
+        'period': ordinal,
+        'value': pd.to_numeric(data[metric], errors='coerce').fillna(0.0),
+    }).dropna(subset=['period'])
+    frame['period'] = frame['period'].astype('int64')
+
+    by_type = frame.groupby(['store', 'type', 'period'], sort=False, observed=True)['value'].sum()
+    by_store = frame.groupby(['store', 'period'], sort=False, observed=True)['value'].sum()
+    by_store.index = pd.MultiIndex.from_arrays([
+        by_store.index.get_level_values(0),
+        np.full(len(by_store), 'all', dtype=object),
+        by_store.index.get_level_values(1),
+    ], names=['store', 'type', 'period'])
+    totals = pd.concat([by_store, by_type])
+
+    payload = {'metric': metric, 'series': {}}
+    if totals.empty:
+        return payload
+
+    first = int(frame['period'].min())
+    last = int(frame['period'].max())
+    matrix = totals.unstack('period').reindex(columns=range(first, last + 1))
+    result = seasonal_decompose_batch(matrix.to_numpy(dtype=float), first, period)
+
+    values = matrix.to_numpy(dtype=float)
+    present = ~np.isnan(values)
+    for row, (store, series_type) in enumerate(matrix.index):
+        columns = np.flatnonzero(present[row])
+        start, end = columns[0], columns[-1] + 1
+        payload['series'].setdefault(store, {})[series_type] = {
+            'start': first + int(start),
+            'values': _rounded(values[row, start:end]),
+            **{name: _rounded(result[name][row, start:end]) for name in ('trend', 'seasonal', 'residual')},
+        }
+    return payload
@@ -0,0 +1,334 @@
+# PROJECT_ROOT: engine/analytics/kmeans.py
+"""
+Кластеризация магазинов по нескольким признакам: k-means++ и выбор k по силуэту
+(как kmeans_ / selectK_ графика ChartClusterAnalysis, метод 'kmeans')
+
+Признаки (CLUSTER_FEATURES), стандартизованные (z-оценки):
+- revenuePerM2 - выручка на м²
+- margin       - наценка, % от выручки
+- avgCheck     - средний чек
+- growth       - рост выручки, %: последние h месяцев к предыдущим h
+                 (h = min(12, половина месяцев периода))
+
+Начальные центры - k-means++, затем итерации Ллойда до стабилизации меток.
+Случайные числа - mulberry32 с фиксированным seed (тот же генератор в JS),
+поэтому разбиение детерминировано и совпадает с браузерным. Из N_INIT
+запусков берётся разбиение с наименьшей инерцией.
+
+Число кластеров 'auto' - k из AUTO_K_RANGE с наибольшим средним силуэтом;
+по каждому k сохраняются инерция (для метода локтя) и силуэт.
+"""
+import numpy as np
+import pandas as pd
+
+from .store_metrics import store_totals, store_period_totals, add_per_m2
+from .clustering import assign_clusters
+
+
+CLUSTER_FEATURES = ['revenuePerM2', 'margin', 'avgCheck', 'growth']
+
+# Методы графика: квантили площади (исходный) и k-means по признакам
+CLUSTER_METHODS = ('area', 'kmeans')
+
+KMEANS_SEED = 42
+N_INIT = 4
+MAX_ITER = 100
+
+# Диапазон k для автоматического выбора (не больше числа магазинов - 1)
+AUTO_K_RANGE = (2, 6)
+# Для метода 'area' - сколько названий кластеров есть (CLUSTER_NAMES)
+AREA_K_RANGE = (2, 4)
+
+# Относительный порог: новый запуск / новый k лучше, только если выигрыш больше
+# ошибки округления (иначе JS и NumPy могли бы выбрать разные варианты)
+_TIE_TOLERANCE = 1e-12
+
+_UINT32 = 0xFFFFFFFF
+
+
+def _imul(a: int, b: int) -> int:
+    """Math.imul для беззнаковых 32-битных чисел"""
+    return (a * b) & _UINT32
+
+
+def mulberry32(seed: int):
+    """
+    Генератор псевдослучайных чисел mulberry32 (тот же, что в JS)
+
+    Args:
+        seed: целое 32-битное
+
+    Returns:
+        Функция без аргументов -> число в [0, 1)
+    """
+    state = seed & _UINT32
+
+    def random() -> float:
+        nonlocal state
+        state = (state + 0x6D2B79F5) & _UINT32
+        t = _imul(state ^ (state >> 15), state | 1)
+        t = ((t + _imul(t ^ (t >> 7), t | 61)) & _UINT32) ^ t
+        return ((t ^ (t >> 14)) & _UINT32) / 4294967296
+
+    return random
+
+
+def standardize(X) -> np.ndarray:
+    """
+    z-оценки по колонкам (колонка без разброса -> нули)
+
+    Args:
+        X: матрица (n, d)
+
+    Returns:
+        Матрица (n, d)
+    """
+    X = np.asarray(X, dtype=float)
+    mean = X.mean(axis=0)
+    std = np.sqrt(((X - mean) ** 2).mean(axis=0))
+    safe_std = np.where(std > 0, std, 1.0)
+    return np.where(std > 0, (X - mean) / safe_std, 0.0)
+
+
+def _sq_distances(X, centers):
+    """Квадраты расстояний (n, k) - одной операцией по всем парам"""
+    return ((X[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+
+
+def _init_centers(X, k, random):
+    """k-means++: следующий центр - с вероятностью, пропорциональной D²"""
+    n = len(X)
+    centers = [X[min(int(random() * n), n - 1)]]
+    closest = _sq_distances(X, np.array(centers))[:, 0]
+    for _ in range(1, k):
+        cumulative = np.cumsum(closest)
+        if cumulative[-1] <= 0:
+            index = min(int(random() * n), n - 1)
+        else:
+            threshold = random() * cumulative[-1]
+            index = min(int(np.searchsorted(cumulative, threshold)), n - 1)
+        centers.append(X[index])
+        closest = np.minimum(closest, _sq_distances(X, X[index][None, :])[:, 0])
+    return np.array(centers)
+
+
+def _lloyd(X, centers, max_iter):
+    """Итерации Ллойда; пустой кластер сохраняет прежний центр"""
+    labels = None
+    for _ in range(max_iter):
+        new_labels = _sq_distances(X, centers).argmin(axis=1)
+        if labels is not None and (new_labels == labels).all():
+            break
+        labels = new_labels
+        for j in range(len(centers)):
+            members = X[labels == j]
+            if len(members):
+                centers[j] = members.sum(axis=0) / len(members)
+    distances = _sq_distances(X, centers)
+    return labels, centers, float(distances[np.arange(len(X)), labels].sum())
+
+
+def kmeans(X, k: int, seed: int = KMEANS_SEED, n_init: int = N_INIT, max_iter: int = MAX_ITER):
+    """
+    k-means с инициализацией k-means++
+
+    Args:
+        X: матрица признаков (n, d), обычно standardize(...)
+        k: число кластеров (не больше n)
+        seed: seed генератора mulberry32
+        n_init: число запусков с разными начальными центрами
+        max_iter: максимум итераций Ллойда в запуске
+
+    Returns:
+        (labels (n,), centers (k, d), inertia)
+    """
+    X = np.asarray(X, dtype=float)
+    random = mulberry32(seed)
+    best = None
+    for _ in range(n_init):
+        labels, centers, inertia = _lloyd(X, _init_centers(X, k, random), max_iter)
+        if best is None or inertia < best[2] * (1 - _TIE_TOLERANCE):
+            best = (labels, centers, inertia)
+    return best
+
+
+def cluster_inertia(X, labels) -> float:
+    """Сумма квадратов расстояний до центров кластеров (для метода локтя)"""
+    X = np.asarray(X, dtype=float)
+    labels = np.asarray(labels)
+    total = 0.0
+    for label in np.unique(labels):
+        members = X[labels == label]
+        total += float(((members - members.sum(axis=0) / len(members)) ** 2).sum())
+    return total
+
+
+def silhouette(X, labels) -> float:
+    """
+    Средний силуэт разбиения (кластер из одного магазина - силуэт 0)
+
+    Args:
+        X: матрица признаков (n, d)
+        labels: номера кластеров (n,)
+
+    Returns:
+        Число от -1 до 1 (0 - если кластер один)
+    """
+    X = np.asarray(X, dtype=float)
+    labels = np.asarray(labels)
+    clusters = np.unique(labels)
+    if len(clusters) < 2:
+        return 0.0
+
+    distances = np.sqrt(_sq_distances(X, X))
+    member = labels[None, :] == clusters[:, None]             # (c, n)
+    sizes = member.sum(axis=1)
+    sums = distances @ member.T                                # (n, c)
+    own = np.searchsorted(clusters, labels)
+    own_size = sizes[own]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = sums[np.arange(len(X)), own] / (own_size - 1)
+        mean_other = sums / sizes[None, :]
+    mean_other[np.arange(len(X)), own] = np.inf
+    b = mean_other.min(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.where(own_size > 1, (b - a) / np.maximum(a, b), 0.0)
+    s = np.nan_to_num(s, nan=0.0)
+    return float(s.mean())
+
+
+def select_k(X, partition, k_values):
+    """
+    Выбор числа кластеров по наибольшему среднему силуэту
+
+    Args:
+        X: матрица признаков (n, d)
+        partition: функция k -> (labels, inertia)
+        k_values: кандидаты k по возрастанию
+
+    Returns:
+        (k, labels, quality) - quality: [{'k', 'inertia', 'silhouette'}] по всем k
+    """
+    best = None
+    quality = []
+    for k in k_values:
+        labels, inertia = partition(k)
+        score = silhouette(X, labels)
+        quality.append({'k': int(k), 'inertia': inertia, 'silhouette': score})
+        if best is None or score > best[2] + _TIE_TOLERANCE:
+            best = (int(k), labels, score)
+    return best[0], best[1], quality
+
+
+def _growth(periods: pd.DataFrame) -> pd.Series:
+    """Рост выручки по магазинам, %: последние h месяцев к предыдущим h"""
+    months = np.sort(periods['period'].unique())
+    h = min(12, len(months) // 2)
+    if h == 0:
+        return pd.Series(dtype=float)
+    recent = periods[periods['period'].isin(months[-h:])].groupby('store', sort=False)['revenue'].sum()
+    previous = periods[periods['period'].isin(months[-2 * h:-h])].groupby('store', sort=False)['revenue'].sum()
+    previous = previous.reindex(recent.index.union(previous.index), fill_value=0.0)
+    recent = recent.reindex(previous.index, fill_value=0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return pd.Series(np.where(previous > 0, (recent / previous - 1) * 100, 0.0), index=previous.index)
+
+
+def cluster_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Магазины с признаками кластеризации (как clusterFeatures_ в JS)
+
+    Args:
+        df: строки продаж или куб (после фильтров)
+
+    Returns:
+        add_per_m2(store_totals(df)) для магазинов с площадью > 0 и колонками
+        margin, avgCheck, growth
+    """
+    stores = add_per_m2(store_totals(df))
+    stores = stores[stores['area'] > 0].reset_index(drop=True)
+
+    data = df.dropna(subset=['Магазин'])
+    checks = pd.to_numeric(data['Число чеков'], errors='coerce').fillna(0.0) if 'Число чеков' in data.columns \
+        else pd.Series(0.0, index=data.index)
+    checks = checks.groupby(data['Магазин'], sort=False, observed=True).sum()
+    checks.index = checks.index.astype(object)
+    store_checks = stores['store'].map(checks).fillna(0.0).to_numpy()
+
+    revenue = stores['revenue'].to_numpy(dtype=float)
+    profit = stores['profit'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stores['margin'] = np.where(revenue > 0, profit / revenue * 100, 0.0)
+        stores['avgCheck'] = np.where(store_checks > 0, revenue / store_checks, 0.0)
+    stores['growth'] = stores['store'].map(_growth(store_period_totals(df))).fillna(0.0).to_numpy()
+    return stores
+
+
+def kmeans_clusters(stores: pd.DataFrame, num_clusters='auto', seed: int = KMEANS_SEED):
+    """
+    Разбиение магазинов k-means++ по CLUSTER_FEATURES
+
+    Кластеры называются 'Кластер 1..k' по возрастанию средней площади.
+
+    Args:
+        stores: результат cluster_features
+        num_clusters: число кластеров или 'auto' (по силуэту, AUTO_K_RANGE)
+        seed: seed генератора
+
+    Returns:
+        (копия stores по возрастанию площади с колонкой cluster, k,
+         quality - см. select_k, None при заданном k)
+    """
+    result = stores.sort_values('area', kind='stable', ignore_index=True)
+    X = standardize(result[CLUSTER_FEATURES].to_numpy(dtype=float))
+    n = len(result)
+
+    def partition(k):
+        labels, _, inertia = kmeans(X, k, seed=seed)
+        return labels, inertia
+
+    if num_clusters == 'auto':
+        k_values = range(AUTO_K_RANGE[0], max(AUTO_K_RANGE[0], min(AUTO_K_RANGE[1], n - 1)) + 1)
+        k, labels, quality = select_k(X, partition, k_values)
+    else:
+        k = max(1, min(int(num_clusters), n))
+        labels, _ = partition(k)
+        quality = None
+
+    # Номера кластеров - по возрастанию средней площади
+    area = result['area'].to_numpy(dtype=float)
+    present = np.unique(labels)
+    mean_area = [area[labels == j].mean() for j in present]
+    order = {label: i + 1 for i, label in enumerate(present[np.argsort(mean_area, kind='stable')])}
+    result['cluster'] = [f'Кластер {order[label]}' for label in labels]
+    return result, k, quality
+
+
+def area_clusters(stores: pd.DataFrame, num_clusters='auto'):
+    """
+    Разбиение по квантилям площади (метод 'area') с выбором k по силуэту
+
+    Args:
+        stores: add_per_m2(store_totals(df)), только магазины с площадью > 0
+        num_clusters: число кластеров (больше 4 - 4) или 'auto' (AREA_K_RANGE, силуэт по площади)
+
+    Returns:
+        (результат assign_clusters, k, quality - None при заданном k)
+    """
+    if num_clusters != 'auto':
+        k = min(int(num_clusters), AREA_K_RANGE[1])
+        return assign_clusters(stores, k), k, None
+
+    ordered = stores.sort_values('area', kind='stable', ignore_index=True)
+    X = standardize(ordered[['area']].to_numpy(dtype=float))
+    n = len(ordered)
+
+    def partition(k):
+        names = assign_clusters(ordered, k)['cluster'].to_numpy()
+        labels = np.unique(names, return_inverse=True)[1]
+        return labels, cluster_inertia(X, labels)
+
+    k_values = range(AREA_K_RANGE[0], max(AREA_K_RANGE[0], min(AREA_K_RANGE[1], n - 1)) + 1)
+    k, _, quality = select_k(X, partition, k_values)
+    return assign_clusters(stores, k), k, quality
@@ -0,0 +1,155 @@
+# PROJECT_ROOT: engine/analytics/lp.py
+"""
+Решатель задач линейного программирования в стандартной форме
+
+    min c·z  при  A z = b,  z >= 0
+
+Если установлен SciPy - scipy.optimize.linprog (HiGHS), импорт откладывается
+до первого вызова. Без SciPy - двухфазный симплекс-метод на NumPy
+(правило Бленда, без зацикливания на вырожденных задачах). Для задач DEA
+строк немного (входы + выходы + 1), поэтому плотная таблица достаточно быстра.
+"""
+import numpy as np
+
+
+# Точность сравнения с нулём в симплекс-таблице
+TOLERANCE = 1e-9
+
+_SCIPY_LINPROG = None
+
+
+def _scipy_linprog():
+    """scipy.optimize.linprog или None (SciPy не установлен)"""
+    global _SCIPY_LINPROG
+    if _SCIPY_LINPROG is None:
+        try:
+            from scipy.optimize import linprog
+            _SCIPY_LINPROG = linprog
+        except ImportError:
+            _SCIPY_LINPROG = False
+    return _SCIPY_LINPROG or None
+
+
+def _pivot(tableau, row, col):
+    tableau[row] /= tableau[row, col]
+    column = tableau[:, col].copy()
+    column[row] = 0.0
+    tableau -= column[:, None] * tableau[row]
+
+
+def _run_simplex(tableau, basis, n_cols, max_iter):
+    """
+    Итерации симплекс-метода по строке цели (последняя строка таблицы)
+
+    Returns:
+        True - оптимум найден, False - задача не ограничена
+    """
+    m = len(basis)
+    for _ in range(max_iter):
+        costs = tableau[-1, :n_cols]
+        entering = np.flatnonzero(costs < -TOLERANCE)
+        if len(entering) == 0:
+            return True
+        col = entering[0]
+
+        column = tableau[:m, col]
+        positive = column > TOLERANCE
+        if not positive.any():
+            return False
+        ratios = np.full(m, np.inf)
+        ratios[positive] = tableau[:m, -1][positive] / column[positive]
+        best = ratios.min()
+        # Бленд: при равных отношениях - строка с наименьшим номером базисной переменной
+        candidates = np.flatnonzero(ratios <= best + TOLERANCE * max(1.0, abs(best)))
+        row = candidates[np.argmin(basis[candidates])]
+
+        _pivot(tableau, row, col)
+        basis[row] = col
+    raise RuntimeError('Симплекс-метод: превышено число итераций')
+
+
+def _simplex(c, A, b, max_iter=None):
+    """
+    Двухфазный симплекс-метод
+
+    Returns:
+        (z, статус) - статус 'optimal' | 'infeasible' | 'unbounded'
+    """
+    A = np.array(A, dtype=float)
+    b = np.array(b, dtype=float)
+    c = np.asarray(c, dtype=float)
+    m, n = A.shape
+    max_iter = max_iter or 50 * (m + n)
+
+    negative = b < 0
+    A[negative] *= -1
+    b[negative] *= -1
+
+    # Фаза 1: искусственные переменные n..n+m-1, минимизируем их сумму
+    tableau = np.zeros((m + 1, n + m + 1))
+    tableau[:m, :n] = A
+    tableau[:m, n:n + m] = np.eye(m)
+    tableau[:m, -1] = b
+    tableau[-1, :n] = -A.sum(axis=0)
+    tableau[-1, -1] = -b.sum()
+    basis = np.arange(n, n + m)
+
+    _run_simplex(tableau, basis, n + m, max_iter)
+    if -tableau[-1, -1] > TOLERANCE * max(1.0, b.sum()):
+        return None, 'infeasible'
+
+    # Искусственные переменные, оставшиеся в базисе (на нуле), выводим;
+    # строка без ненулевых коэффициентов при исходных переменных избыточна
+    keep = np.ones(m, dtype=bool)
+    for row in range(m):
+        if basis[row] >= n:
+            nonzero = np.flatnonzero(np.abs(tableau[row, :n]) > TOLERANCE)
+            if len(nonzero):
+                _pivot(tableau, row, nonzero[0])
+                basis[row] = nonzero[0]
+            else:
+                keep[row] = False
+
+    # Фаза 2: исходная цель, приведённая к текущему базису
+    rows = np.append(np.flatnonzero(keep), m)
+    tableau = np.hstack([tableau[rows][:, :n], tableau[rows][:, -1:]])
+    basis = basis[keep]
+    tableau[-1] = 0.0
+    tableau[-1, :n] = c
+    for row, col in enumerate(basis):
+        tableau[-1] -= c[col] * tableau[row]
+
+    if not _run_simplex(tableau, basis, n, max_iter):
+        return None, 'unbounded'
+
+    z = np.zeros(n)
+    z[basis] = tableau[:-1, -1]
+    return z, 'optimal'
+
+
+def linprog_eq(c, A, b):
+    """
+    Решение min c·z при A z = b, z >= 0
+
+    Args:
+        c: коэффициенты цели (n,)
+        A: матрица ограничений (m, n)
+        b: правые части (m,)
+
+    Returns:
+        Оптимальный z (n,)
+
+    Raises:
+        ValueError: задача несовместна или не ограничена
+    """
+    linprog = _scipy_linprog()
+    if linprog is not None:
+        result = linprog(c, A_eq=A, b_eq=b, bounds=(0, None), method='highs')
+        if result.status != 0:
+            raise ValueError(f'LP не решена: {result.message}')
+        return result.x
+
+    z, status = _simplex(c, A, b)
+    if status != 'optimal':
+        raise ValueError(f'LP не решена: {status}')
+    return z
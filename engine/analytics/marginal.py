@@ -0,0 +1,36 @@
+# PROJECT_ROOT: engine/analytics/marginal.py
+"""
+Маржинальный анализ площади (как calculateMarginalData_ графика ChartMarginalAnalysis)
+
+Магазины упорядочены по площади; предельное значение - прирост показателя
+на прирост площади между соседними магазинами, сглаженное скользящим средним.
+"""
+import numpy as np
+import pandas as pd
+
+
+def marginal_analysis(stores: pd.DataFrame, metric: str, ma_window: int = 3) -> pd.DataFrame:
+    """
+    Предельные значения показателя и их скользящее среднее
+
+    Args:
+        stores: add_per_m2(store_totals(df)), любой порядок строк
+        metric: 'revenue' | 'profit' | 'revenuePerM2' | 'profitPerM2'
+        ma_window: окно скользящего среднего (магазинов)
+
+    Returns:
+        Копия stores по возрастанию площади с колонками deltaArea, deltaMetric,
+        marginal (NaN, где не определено) и marginalMA
+    """
+    result = stores.sort_values('area', kind='stable', ignore_index=True)
+    result['deltaArea'] = result['area'].diff()
+    result['deltaMetric'] = result[metric].diff()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        marginal = result['deltaMetric'] / result['deltaArea'].where(result['deltaArea'] != 0)
+    result['marginal'] = marginal
+
+    # Среднее по окну только из конечных значений (пропуски не считаются)
+    finite = marginal.where(np.isfinite(marginal))
+    result['marginalMA'] = finite.rolling(ma_window, min_periods=1).mean()
+    return result
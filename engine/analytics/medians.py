@@ -0,0 +1,179 @@
+# PROJECT_ROOT: engine/analytics/medians.py
+"""
+Медианы по сети магазинов
+
+- store_card_metrics / metric_medians / efficiency_status - показатели карточек
+  магазинов и статус эффективности относительно медианы сети
+  (как aggregateStoreData_ / calculateMedians_ графика ChartStoreCards)
+- optimal_area_trend - оптимальная площадь по медианной эффективности м²
+  в каждом месяце (как график ChartOptimalAreaTrend)
+"""
+import numpy as np
+import pandas as pd
+
+from .store_metrics import store_period_totals
+
+
+# Показатели, по которым считаются медианы карточек
+MEDIAN_METRICS = ['revenue', 'revenue_per_m2', 'checks', 'profit', 'profit_per_m2', 'margin']
+
+# Критерии эффективности, если ни один не выбран
+DEFAULT_CRITERIA = ['revenue_per_m2', 'checks']
+
+
+def store_card_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Показатели карточек магазинов
+
+    Чеки - 'Число чеков' (getChecksValue при группировке по магазину).
+
+    Args:
+        df: строки продаж (после фильтров)
+
+    Returns:
+        DataFrame: store, area, revenue, checks, profit, revenue_per_m2,
+        avg_check, profit_per_m2, margin
+    """
+    data = df.dropna(subset=['Магазин'])
+    columns = {
+        'revenue': 'Сумма в чеке',
+        'checks': 'Число чеков',
+        'profit': 'Наценка продажи в чеке',
+    }
+    values = pd.DataFrame({
+        name: pd.to_numeric(data[column], errors='coerce').fillna(0.0) if column in data.columns else 0.0
+        for name, column in columns.items()
+    }, index=data.index)
+    values['area'] = pd.to_numeric(data['Торговая площадь магазина'], errors='coerce')
+    grouped = values.groupby(data['Магазин'], sort=False, observed=True)
+
+    result = grouped[list(columns)].sum()
+    result.insert(0, 'area', grouped['area'].first().fillna(0.0))
+    result.index = result.index.astype(object)
+    result = result.rename_axis('store').reset_index()
+
+    area = result['area'].to_numpy(dtype=float)
+    revenue = result['revenue'].to_numpy(dtype=float)
+    checks = result['checks'].to_numpy(dtype=float)
+    profit = result['profit'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result['revenue_per_m2'] = np.where(area > 0, revenue / area, 0.0)
+        result['avg_check'] = np.where(checks > 0, revenue / checks, 0.0)
+        result['profit_per_m2'] = np.where(area > 0, profit / area, 0.0)
+        result['margin'] = np.where(revenue > 0, profit / revenue * 100, 0.0)
+    return result
+
+
+def metric_medians(stores: pd.DataFrame, metrics=None) -> dict:
+    """
+    Медианы показателей по магазинам (учитываются только значения > 0)
+
+    Args:
+        stores: результат store_card_metrics
+        metrics: показатели (по умолчанию MEDIAN_METRICS)
+
+    Returns:
+        {показатель: медиана}, NaN если положительных значений нет
+    """
+    medians = {}
+    for metric in metrics or MEDIAN_METRICS:
+        values = stores[metric].to_numpy(dtype=float)
+        values = values[values > 0]
+        medians[metric] = float(np.median(values)) if len(values) else float('nan')
+    return medians
+
+
+def efficiency_status(stores: pd.DataFrame, criteria, medians: dict = None) -> pd.DataFrame:
+    """
+    Статус эффективности: показатель не ниже медианы хотя бы по min(2, len(criteria)) критериям
+
+    Args:
+        stores: результат store_card_metrics
+        criteria: показатели-критерии из MEDIAN_METRICS (пусто - DEFAULT_CRITERIA)
+        medians: медианы (по умолчанию metric_medians(stores))
+
+    Returns:
+        Копия stores с колонками vsMedian (% к медиане выручки на м²),
+        efficiencyScore, efficiencyTotal, isEfficient
+    """
+    criteria = list(criteria) or DEFAULT_CRITERIA
+    if medians is None:
+        medians = metric_medians(stores)
+    result = stores.copy()
+
+    median_rpm = medians.get('revenue_per_m2', float('nan'))
+    result['vsMedian'] = ((result['revenue_per_m2'] - median_rpm) / median_rpm * 100) if median_rpm > 0 else 0.0
+
+    score = np.zeros(len(result), dtype=int)
+    for criterion in criteria:
+        score += result[criterion].to_numpy(dtype=float) >= medians.get(criterion, float('nan'))
+    result['efficiencyScore'] = score
+    result['efficiencyTotal'] = len(criteria)
+    result['isEfficient'] = score >= min(2, len(criteria))
+    return result
+
+
+def optimal_area_trend(df: pd.DataFrame, metric: str = 'revenue') -> dict:
+    """
+    Оптимальная площадь магазинов по месяцам
+
+    В каждом месяце: медиана эффективности (metric / площадь) по магазинам
+    с площадью > 0; оптимальная площадь магазина = его metric / медиана.
+    Месяцы без данных магазина дают 0 в обеих матрицах.
+
+    Args:
+        df: строки продаж или куб
+        metric: 'revenue' | 'profit'
+
+    Returns:
+        {
+            'periods': порядковые номера месяцев (year * 12 + month),
+            'stores': магазины,
+            'actual': фактическая площадь (магазины x месяцы),
+            'optimal': оптимальная площадь (магазины x месяцы),
+            'summary': DataFrame store, avgDiff, avgActual, avgOptimal
+                       (avgDiff > 0 - площадь больше оптимальной)
+        }
+    """
+    totals = store_period_totals(df)
+    periods = np.sort(totals['period'].unique())
+    stores = pd.unique(totals['store'])
+
+    shape = (len(stores), len(periods))
+    row = pd.Index(stores).get_indexer(totals['store'])
+    col = np.searchsorted(periods, totals['period'].to_numpy())
+    area = np.zeros(shape)
+    value = np.zeros(shape)
+    area[row, col] = totals['area'].to_numpy(dtype=float)
+    value[row, col] = totals[metric].to_numpy(dtype=float)
+
+    present = np.zeros(shape, dtype=bool)
+    present[row, col] = True
+    has_area = present & (area > 0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        efficiency = np.where(has_area, value / np.where(has_area, area, 1.0), np.nan)
+    period_has_data = has_area.any(axis=0)
+    median = np.zeros(len(periods))
+    if period_has_data.any():
+        median[period_has_data] = np.nanmedian(efficiency[:, period_has_data], axis=0)
+
+    active = has_area & period_has_data[None, :]
+    actual = np.where(active, area, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        optimal = np.where(active & (median > 0)[None, :], value / median[None, :], 0.0)
+
+    valid = (actual > 0) & (optimal > 0)
+    valid_count = valid.sum(axis=1)
+    avg_diff = np.divide(np.where(valid, actual - optimal, 0.0).sum(axis=1), valid_count,
+                         out=np.zeros(len(stores)), where=valid_count > 0)
+    actual_count = np.maximum((actual > 0).sum(axis=1), 1)
+    optimal_count = np.maximum((optimal > 0).sum(axis=1), 1)
+
+    summary = pd.DataFrame({
+        'store': stores,
+        'avgDiff': avg_diff,
+        'avgActual': np.where(actual > 0, actual, 0.0).sum(axis=1) / actual_count,
+        'avgOptimal': np.where(optimal > 0, optimal, 0.0).sum(axis=1) / optimal_count,
+    })
+    return {'periods': periods, 'stores': stores, 'actual': actual, 'optimal': optimal, 'summary': summary}
@@ -0,0 +1,128 @@
+# PROJECT_ROOT: engine/analytics/regression.py
+"""
+Регрессии площадь -> показатель (как linearRegression / quadraticRegression
+графика ChartRegressionAnalysis)
+
+y может быть матрицей (n, k): k показателей считаются одним вызовом, результат -
+массивы длины k. Формулы - те же суммы, что в JS (а не np.polyfit), чтобы
+коэффициенты совпадали до последнего знака.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _prepare(x, y):
+    """x -> (n, 1) при матричном y, суммы считаются по оси 0"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if y.ndim == 2:
+        x = x[:, None]
+    return x, y
+
+
+def _r2(y, y_pred, y_mean):
+    ss_res = ((y - y_pred) ** 2).sum(axis=0)
+    ss_tot = ((y - y_mean) ** 2).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 1 - ss_res / ss_tot
+
+
+def linear_regression(x, y) -> dict:
+    """
+    Линейная регрессия методом наименьших квадратов
+
+    Args:
+        x: значения X (n,)
+        y: значения Y (n,) или (n, k)
+
+    Returns:
+        {'slope', 'intercept', 'r2'}
+    """
+    x, y = _prepare(x, y)
+    n = len(y)
+    sum_x = x.sum(axis=0)
+    sum_y = y.sum(axis=0)
+    sum_xy = (x * y).sum(axis=0)
+    sum_x2 = (x * x).sum(axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
+        intercept = (sum_y - slope * sum_x) / n
+        r2 = _r2(y, slope * x + intercept, sum_y / n)
+
+    return {'slope': slope, 'intercept': intercept, 'r2': r2}
+
+
+def quadratic_regression(x, y) -> dict:
+    """
+    Квадратичная регрессия y = a + bx + cx² (решение системы 3x3 по Крамеру)
+
+    Оптимум - вершина параболы x = -b / (2c), только если c < 0.
+    При вырожденной системе (|det| < 1e-10) - нулевые коэффициенты.
+
+    Args:
+        x: значения X (n,)
+        y: значения Y (n,) или (n, k)
+
+    Returns:
+        {'a', 'b', 'c', 'r2', 'optimal'} (optimal - None / NaN, если вершины нет)
+    """
+    x, y = _prepare(x, y)
+    n = len(y)
+    x2 = x * x
+    sum_x = x.sum(axis=0)
+    sum_x2 = x2.sum(axis=0)
+    sum_x3 = (x2 * x).sum(axis=0)
+    sum_x4 = (x2 * x2).sum(axis=0)
+    sum_y = y.sum(axis=0)
+    sum_xy = (x * y).sum(axis=0)
+    sum_x2y = (x2 * y).sum(axis=0)
+
+    det = (n * (sum_x2 * sum_x4 - sum_x3 * sum_x3)
+           - sum_x * (sum_x * sum_x4 - sum_x3 * sum_x2)
+           + sum_x2 * (sum_x * sum_x3 - sum_x2 * sum_x2))
+    if y.ndim == 1 and abs(det) < 1e-10:
+        return {'a': 0.0, 'b': 0.0, 'c': 0.0, 'r2': 0.0, 'optimal': None}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = (sum_y * (sum_x2 * sum_x4 - sum_x3 * sum_x3)
+             - sum_x * (sum_xy * sum_x4 - sum_x2y * sum_x3)
+             + sum_x2 * (sum_xy * sum_x3 - sum_x2y * sum_x2)) / det
+        b = (n * (sum_xy * sum_x4 - sum_x2y * sum_x3)
+             - sum_y * (sum_x * sum_x4 - sum_x3 * sum_x2)
+             + sum_x2 * (sum_x * sum_x2y - sum_xy * sum_x2)) / det
+        c = (n * (sum_x2 * sum_x2y - sum_x3 * sum_xy)
+             - sum_x * (sum_x * sum_x2y - sum_xy * sum_x2)
+             + sum_y * (sum_x * sum_x3 - sum_x2 * sum_x2)) / det
+        r2 = _r2(y, a + b * x + c * x2, sum_y / n)
+        optimal = np.where(c < 0, -b / (2 * c), np.nan)
+
+    if y.ndim == 1:
+        return {'a': float(a), 'b': float(b), 'c': float(c), 'r2': float(r2),
+                'optimal': float(optimal) if c < 0 else None}
+
+    # Вырожденные столбцы - как в JS
+    degenerate = np.broadcast_to(np.abs(det) < 1e-10, a.shape)
+    for values in (a, b, c, r2):
+        values[degenerate] = 0.0
+    optimal[degenerate] = np.nan
+    return {'a': a, 'b': b, 'c': c, 'r2': r2, 'optimal': optimal}
+
+
+def top_n_optimum(stores: pd.DataFrame, x_metric: str, y_metric: str, top_n=5) -> float:
+    """
+    Оптимум по ТОП-N: среднее X у N магазинов с наибольшим Y
+
+    Args:
+        stores: таблица магазинов (add_per_m2)
+        x_metric: колонка X (обычно 'area')
+        y_metric: колонка Y
+        top_n: число магазинов или 'all'
+
+    Returns:
+        Среднее значение X
+    """
+    order = np.argsort(-stores[y_metric].to_numpy(dtype=float), kind='stable')
+    if top_n != 'all':
+        order = order[:int(top_n)]
+    return float(stores[x_metric].to_numpy(dtype=float)[order].mean())
@@ -0,0 +1,282 @@
+# PROJECT_ROOT: engine/analytics/slices.py
+"""
+Предрасчёт результатов графиков площади для типовых срезов фильтров
+
+Результаты DEA, кластеризации и регрессии зависят только от набора строк
+после фильтров. В браузере они кэшируются в ResultCache (engine/result_cache.py)
+по каноническому ключу состояния фильтров. Здесь те же ключи и те же
+результаты (в формате JS) считаются заранее для типовых срезов:
+- все данные (без фильтров)
+- каждый год
+- последние 365 дней (от максимальной даты, как filterLast365Days)
+- каждый тип товара
+
+Канонический ключ (см. ResultCache.filterKey):
+    магазины | типы | товары | площадь | периоды
+Годы, месяцы и диапазон дат сводятся к набору дат данных, которые они
+выбирают, записанному диапазонами 'YYYYMMDD-YYYYMMDD,...' ('' - все даты).
+Поэтому фильтр 'Год = 2024' и диапазон дат, покрывающий те же месяцы,
+дают один ключ.
+"""
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+from .store_metrics import store_totals, add_per_m2
+from .dea import dea_scores
+from .clustering import cluster_stats
+from .kmeans import area_clusters, cluster_features, kmeans_clusters
+from .regression import linear_regression, quadratic_regression
+
+
+# Параметры графиков по умолчанию: для них результаты считаются заранее
+# (порядок ключей - как в объектах params графиков)
+DEFAULT_SLICE_PARAMS = {
+    'dea': {'outputMetric': 'revenue'},
+    'cluster': {'metric': 'revenuePerM2', 'numClusters': 3, 'method': 'area'},
+    'regression': {'x': 'area', 'y': 'revenuePerM2'},
+}
+
+# Меньше магазинов - графики не строятся, предрасчёт не нужен
+MIN_STORES = 3
+
+
+def _day_numbers(dates: pd.Series) -> pd.Series:
+    """Даты -> целые YYYYMMDD (как FilterIndex.dayNumber)"""
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates, format='%d.%m.%Y', errors='coerce')
+    return dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day
+
+
+def build_calendar(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Различные даты данных по возрастанию (как календарь ResultCache)
+
+    Args:
+        df: строки продаж или куб (колонки Дата, Год, Месяц)
+
+    Returns:
+        DataFrame: day (YYYYMMDD), year, month
+    """
+    calendar = pd.DataFrame({
+        'day': _day_numbers(df['Дата']),
+        'year': pd.to_numeric(df['Год'], errors='coerce'),
+        'month': df['Месяц'].astype(str),
+    }).dropna(subset=['day'])
+    calendar = calendar.drop_duplicates('day').sort_values('day', ignore_index=True)
+    calendar['day'] = calendar['day'].astype('int64')
+    return calendar
+
+
+def _matched_days(calendar: pd.DataFrame, state: dict) -> np.ndarray:
+    """Маска дат календаря, выбранных годами, месяцами и диапазоном дат"""
+    matched = np.ones(len(calendar), dtype=bool)
+    if state.get('years'):
+        matched &= calendar['year'].isin(state['years']).to_numpy()
+    if state.get('months'):
+        matched &= calendar['month'].isin([str(m) for m in state['months']]).to_numpy()
+    day = calendar['day'].to_numpy()
+    matched &= day >= (state.get('startDay') or 0)
+    if state.get('endDay'):
+        matched &= day <= state['endDay']
+    return matched
+
+
+def period_key(calendar: pd.DataFrame, state: dict) -> str:
+    """
+    Ключ набора дат: диапазоны подряд идущих выбранных дат ('' - выбраны все)
+    """
+    matched = _matched_days(calendar, state)
+    if matched.all():
+        return ''
+    days = calendar['day'].to_numpy()
+    ranges = []
+    i = 0
+    while i < len(matched):
+        if matched[i]:
+            j = i
+            while j + 1 < len(matched) and matched[j + 1]:
+                j += 1
+            ranges.append(f'{days[i]}-{days[j]}')
+            i = j
+        i += 1
+    return ','.join(ranges) or 'none'
+
+
+def _list_key(values) -> str:
+    if not values:
+        return ''
+    return json.dumps(sorted(str(v) for v in values), ensure_ascii=False, separators=(',', ':'))
+
+
+def filter_key(calendar: pd.DataFrame, state: dict) -> str:
+    """
+    Канонический ключ состояния фильтров (как ResultCache.filterKey)
+
+    Args:
+        calendar: build_calendar(df)
+        state: состояние в формате readFilterState (отсутствующие поля - не заданы)
+
+    Returns:
+        Строка ключа
+    """
+    area = f"{state['minArea']}:{state['maxArea']}" if state.get('areaFilterActive') else ''
+    return '|'.join([
+        _list_key(state.get('magazines')),
+        _list_key(state.get('productTypes')),
+        _list_key(state.get('products')),
+        area,
+        period_key(calendar, state),
+    ])
+
+
+def result_key(filter_state_key: str, namespace: str, params: dict) -> str:
+    """Ключ результата: фильтры # график # параметры (как ResultCache.keyOf)"""
+    return f"{filter_state_key}#{namespace}#{json.dumps(params, ensure_ascii=False, separators=(',', ':'))}"
+
+
+def common_slices(df: pd.DataFrame) -> dict:
+    """
+    Типовые срезы фильтров
+
+    Args:
+        df: строки продаж или куб
+
+    Returns:
+        {название: состояние фильтров}
+    """
+    slices = {'Все данные': {}}
+    for year in sorted(pd.to_numeric(df['Год'], errors='coerce').dropna().unique()):
+        slices[f'{int(year)} год'] = {'years': [int(year)]}
+
+    days = _day_numbers(df['Дата']).dropna()
+    if len(days):
+        max_day = int(days.max())
+        max_date = pd.Timestamp(max_day // 10000, max_day // 100 % 100, max_day % 100)
+        start = max_date - pd.Timedelta(days=365)
+        slices['Последние 365 дней'] = {
+            'startDay': start.year * 10000 + start.month * 100 + start.day,
+            'endDay': max_day,
+        }
+
+    for product_type in sorted(df['Тип'].dropna().astype(str).unique()):
+        slices[f'Тип: {product_type}'] = {'productTypes': [product_type]}
+    return slices
+
+
+def _slice_rows(df: pd.DataFrame, calendar: pd.DataFrame, state: dict) -> pd.DataFrame:
+    """Строки среза (годы, месяцы, даты и типы товаров)"""
+    mask = pd.Series(True, index=df.index)
+    matched = _matched_days(calendar, state)
+    if not matched.all():
+        mask &= _day_numbers(df['Дата']).isin(calendar['day'].to_numpy()[matched])
+    if state.get('productTypes'):
+        mask &= df['Тип'].astype(str).isin(state['productTypes'])
+    return df[mask]
+
+
+def _records(frame: pd.DataFrame) -> list:
+    """DataFrame -> список объектов JSON (NaN -> null)"""
+    return json.loads(frame.to_json(orient='records', force_ascii=False))
+
+
+def _finite(value) -> bool:
+    return all(v is None or math.isfinite(v) for v in value.values())
+
+
+def cluster_result(rows: pd.DataFrame, stores: pd.DataFrame, metric: str, numClusters, method: str) -> dict:
+    """
+    Результат графика кластеров в формате ResultCache ({k, quality, clusters})
+
+    Args:
+        rows: строки среза (нужны для признаков k-means)
+        stores: магазины с площадью > 0 (add_per_m2, колонки графика)
+        metric, numClusters, method: параметры графика
+
+    Returns:
+        {'k', 'quality', 'clusters': [{cluster, count, ..., leader, stores, metrics}]}
+    """
+    if method == 'kmeans':
+        features = cluster_features(rows).drop(columns='cost')
+        clustered, k, quality = kmeans_clusters(features, numClusters)
+    else:
+        clustered, k, quality = area_clusters(stores, numClusters)
+
+    clusters = []
+    for row in cluster_stats(clustered, metric).to_dict('records'):
+        members = clustered[clustered['cluster'] == row['cluster']]
+        members_json = _records(members)
+        clusters.append({
+            'cluster': row['cluster'],
+            'count': int(row['count']),
+            'minArea': float(row['minArea']),
+            'maxArea': float(row['maxArea']),
+            'avgArea': float(row['avgArea']),
+            'avgRevenuePerM2': float(row['avgRevenuePerM2']),
+            'avgProfitPerM2': float(row['avgProfitPerM2']),
+            'leader': next(s for s in members_json if s['store'] == row['leader']),
+            'stores': members_json,
+            'metrics': members[metric].tolist(),
+        })
+    return {'k': k, 'quality': quality, 'clusters': clusters}
+
+
+def slice_results(rows: pd.DataFrame) -> dict:
+    """
+    Результаты графиков площади для одного среза (формат JS, параметры по умолчанию)
+
+    Args:
+        rows: строки среза
+
+    Returns:
+        {'dea': [...], 'cluster': [...], 'regression': {...}} - только те
+        результаты, которые график построил бы (>= MIN_STORES магазинов)
+    """
+    totals = store_totals(rows)
+    results = {}
+
+    # DEA: показатели на м² без округления, только магазины с площадью
+    raw = add_per_m2(totals, rounded=False)
+    raw = raw[raw['area'] > 0]
+    if len(raw) >= MIN_STORES:
+        dea = dea_scores(raw, DEFAULT_SLICE_PARAMS['dea']['outputMetric'])
+        results['dea'] = _records(dea)
+
+    rounded = add_per_m2(totals)[['store', 'area', 'revenue', 'profit', 'revenuePerM2', 'profitPerM2']]
+
+    with_area = rounded[rounded['area'] > 0]
+    if len(with_area) >= MIN_STORES:
+        results['cluster'] = cluster_result(rows, with_area, **DEFAULT_SLICE_PARAMS['cluster'])
+
+    # Регрессия: все магазины по возрастанию площади
+    if len(rounded) >= MIN_STORES:
+        params = DEFAULT_SLICE_PARAMS['regression']
+        ordered = rounded.sort_values('area', kind='stable')
+        linear = {k: float(v) for k, v in linear_regression(ordered[params['x']], ordered[params['y']]).items()}
+        quadratic = quadratic_regression(ordered[params['x']], ordered[params['y']])
+        if _finite(linear) and _finite(quadratic):
+            results['regression'] = {'linear': linear, 'quadratic': quadratic}
+
+    return results
+
+
+def precompute_slice_results(df: pd.DataFrame, slices: dict = None) -> dict:
+    """
+    Результаты DEA, кластеризации и регрессии для типовых срезов
+
+    Args:
+        df: строки продаж или куб (суммы по магазинам совпадают)
+        slices: {название: состояние фильтров} (по умолчанию common_slices(df))
+
+    Returns:
+        {ключ ResultCache: результат} - для ResultCache.seed
+    """
+    calendar = build_calendar(df)
+    entries = {}
+    for state in (slices or common_slices(df)).values():
+        state_key = filter_key(calendar, state)
+        for namespace, value in slice_results(_slice_rows(df, calendar, state)).items():
+            entries[result_key(state_key, namespace, DEFAULT_SLICE_PARAMS[namespace])] = value
+    return entries
@@ -0,0 +1,123 @@
+# PROJECT_ROOT: engine/analytics/store_metrics.py
+"""
+Суммы по магазинам - аналог groupBy(['Магазин'], Aggregator.STORE_TOTALS)
+
+Все расчёты пакета начинаются с таблицы магазинов:
+    store | area | revenue | profit | cost
+Порядок магазинов - порядок первого появления в данных (как у JS groupBy).
+Пропуски в суммируемых колонках считаются нулём (Aggregator.toNumber).
+"""
+import numpy as np
+import pandas as pd
+
+
+# Показатели по магазинам: имя поля -> (колонка, операция), как Aggregator.STORE_TOTALS
+STORE_TOTALS = {
+    'revenue': ('Сумма в чеке', 'sum'),
+    'profit': ('Наценка продажи в чеке', 'sum'),
+    'cost': ('Себестоимость продажи в чеке', 'sum'),
+    'area': ('Торговая площадь магазина', 'first'),
+}
+
+
+def js_round(values):
+    """
+    Округление как Math.round в JS (половина - вверх, а не к чётному)
+
+    Args:
+        values: число или массив
+
+    Returns:
+        Округлённое значение того же вида
+    """
+    return np.floor(np.asarray(values, dtype=float) + 0.5)
+
+
+def _group_totals(df: pd.DataFrame, keys: list) -> pd.DataFrame:
+    """Суммы STORE_TOTALS по ключам (строки с пустым ключом не учитываются)"""
+    data = df.dropna(subset=keys)
+    columns = {}
+    for name, (column, op) in STORE_TOTALS.items():
+        if column in data.columns:
+            columns[name] = pd.to_numeric(data[column], errors='coerce')
+        else:
+            columns[name] = pd.Series(0.0, index=data.index)
+    values = pd.DataFrame(columns, index=data.index)
+    grouped = values.groupby([data[k] for k in keys], sort=False, observed=True)
+
+    result = grouped[[n for n, (_, op) in STORE_TOTALS.items() if op == 'sum']].sum()
+    result['area'] = grouped['area'].first().fillna(0.0)
+    return result.fillna(0.0)
+
+
+def store_totals(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Суммы по магазинам за весь период данных
+
+    Args:
+        df: строки продаж или куб (build_sales_cube) - суммы совпадают
+
+    Returns:
+        DataFrame: store, area, revenue, profit, cost
+    """
+    totals = _group_totals(df, ['Магазин'])
+    totals.index = totals.index.astype(object)
+    return totals.rename_axis('store').reset_index()[['store', 'area', 'revenue', 'profit', 'cost']]
+
+
+def store_period_totals(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Суммы по магазинам в каждом месяце - аналог groupBy(['@month', 'Магазин'], STORE_TOTALS)
+
+    Месяц берётся из 'Период_номер' (year * 12 + month, см. create_date_column),
+    без него - из 'Дата'.
+
+    Args:
+        df: строки продаж или куб
+
+    Returns:
+        DataFrame: period (порядковый номер месяца), store, area, revenue, profit, cost,
+        отсортированный по period
+    """
+    data = df
+    if 'Период_номер' not in data.columns:
+        dates = pd.to_datetime(data['Дата'], format='%d.%m.%Y', errors='coerce')
+        data = data.assign(Период_номер=dates.dt.year * 12 + dates.dt.month)
+
+    totals = _group_totals(data, ['Период_номер', 'Магазин'])
+    totals.index = totals.index.set_names(['period', 'store'])
+    totals = totals.reset_index()
+    totals['period'] = totals['period'].astype('int64')
+    totals['store'] = totals['store'].astype(object)
+    totals = totals.sort_values('period', kind='stable', ignore_index=True)
+    return totals[['period', 'store', 'area', 'revenue', 'profit', 'cost']]
+
+
+def add_per_m2(stores: pd.DataFrame, rounded: bool = True) -> pd.DataFrame:
+    """
+    Показатели на м² (магазины без площади получают 0)
+
+    rounded=True - как в регрессии, маржинальном анализе и кластеризации
+    (Math.round); rounded=False - как в DEA (без округления, плюс ebitda).
+
+    Args:
+        stores: результат store_totals
+        rounded: округлять показатели на м² до целых
+
+    Returns:
+        Копия stores с колонками revenuePerM2, profitPerM2 (и ebitda, ebitdaPerM2
+        при rounded=False)
+    """
+    result = stores.copy()
+    area = result['area'].to_numpy(dtype=float)
+    has_area = area > 0
+    safe_area = np.where(has_area, area, 1.0)
+
+    if not rounded:
+        # EBITDA = Прибыль (данных по амортизации нет)
+        result['ebitda'] = result['profit']
+
+    for metric in ('revenue', 'profit') if rounded else ('revenue', 'profit', 'ebitda'):
+        per_m2 = np.where(has_area, result[metric].to_numpy(dtype=float) / safe_area, 0.0)
+        result[metric + 'PerM2'] = js_round(per_m2) if rounded else per_m2
+    return result
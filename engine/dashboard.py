@@ -5,10 +5,82 @@
 import pandas as pd
 import json
 import os
+import re
 from typing import Optional, Dict, Any
 from datetime import datetime
 from .grid_manager import GridLayout
 from .filters import GlobalFilters
+from .data_store import (
+    iter_columnar_json, iter_records_json, get_data_store_js, summarize_binary_stats, EXPORT_CHUNK_ROWS
+)
+from .aggregation import get_aggregation_js
+from .virtual_table import get_virtual_table_js
+from .table_export import get_table_export_js
+from .result_cache import get_result_cache_js
+from .profiler import get_profiler_js
+from .plot_renderer import get_plot_renderer_js
+from .worker import get_worker_js
+
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), '..', 'templates', 'dashboard_template.html')
+
+# Плейсхолдер шаблона: {{ИМЯ}}
+PLACEHOLDER_PATTERN = re.compile(r'\{\{([A-Z_]+)\}\}')
+
+def _load_template(template_path: str = TEMPLATE_PATH) -> str:
+    """Текст HTML шаблона дашборда"""
+    with open(template_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def split_template(template: str) -> list:
+    """
+    Разбивка шаблона на части по плейсхолдерам {{ИМЯ}}
+
+    Args:
+        template: текст шаблона
+
+    Returns:
+        список [текст, имя, текст, имя, ..., текст] (чётные - текст, нечётные - имена)
+    """
+    return PLACEHOLDER_PATTERN.split(template)
+
+
+def render_template(template: str, sections: Dict[str, Any], out) -> Dict[str, int]:
+    """
+    Потоковая подстановка секций в шаблон с записью в файл
+
+    Шаблон разбивается на части один раз; каждая секция пишется в out сразу,
+    без сборки итогового документа в памяти. Подставленный текст повторно
+    не просматривается: плейсхолдеры внутри данных и JS не заменяются.
+
+    Args:
+        template: текст шаблона
+        sections: {имя плейсхолдера: строка или итератор фрагментов строки}.
+            Плейсхолдеры без секции остаются в тексте как есть
+        out: файл (объект с методом write)
+
+    Returns:
+        {имя плейсхолдера: число записанных символов}
+    """
+    written = {}
+    parts = split_template(template)
+    for i, part in enumerate(parts):
+        if i % 2 == 0:
+            out.write(part)
+            continue
+        if part not in sections:
+            out.write('{{' + part + '}}')
+            continue
+
+        value = sections[part]
+        chunks = [value] if isinstance(value, str) else value
+        size = 0
+        for chunk in chunks:
+            out.write(chunk)
+            size += len(chunk)
+        written[part] = written.get(part, 0) + size
+    return written
 
 
 class DashboardEngine:
@@ -18,7 +90,10 @@ class DashboardEngine:
 
     def __init__(self, df: pd.DataFrame, tabs: dict = None, layout: GridLayout = None,
                  enable_context: bool = True, context_config: Optional[Dict[str, bool]] = None,
-                 filter_config: dict = None):
+                 filter_config: dict = None, data_format: str = 'records',
+                 cube: Optional[pd.DataFrame] = None, use_worker: bool = False,
+                 lazy_tabs: bool = False, precomputed_results: Optional[Dict[str, Any]] = None,
+                 profile: bool = False):
         """
         Args:
             df: DataFrame с данными
@@ -27,9 +102,35 @@ class DashboardEngine:
             enable_context: Включить AI-контекст для анализа
             context_config: Глобальная конфигурация контекста (можно переопределить в конкретных графиках)
             filter_config: Конфиг фильтров {'column': {'type': 'multiselect', 'label': 'Label'}}
+            data_format: Формат выгрузки данных в HTML:
+                'records' - массив записей (по умолчанию)
+                'columnar' - по колонкам, строки закодированы словарём (см. engine/data_store.py)
+            cube: Предагрегированный куб Магазин×Год×Месяц×Тип (build_sales_cube).
+                Выгружается рядом с данными, графики без разреза по товарам
+                считают по нему (window.getStoreLevelData)
+            use_worker: Фильтрация и агрегации groupBy в Web Worker (см. engine/worker.py)
+            lazy_tabs: JS графиков каждой вкладки - в инертном блоке
+                <script type="text/x-lazy-tab">, выполняется при первом открытии
+                вкладки (activateTab в шаблоне)
+            precomputed_results: Результаты графиков для типовых срезов фильтров
+                (precompute_slice_results) - начальное содержимое ResultCache
+            profile: Профилирование в браузере (engine/profiler.py): время update
+                графиков, getTableData, проходов фильтров и отрисовки Plotly в панели
+                на странице с выгрузкой в JSON
         """
+        if data_format not in ('records', 'columnar'):
+            raise ValueError(f"Неизвестный формат данных: {data_format}")
+
         self.df = df
         self.enable_context = enable_context
+        self.data_format = data_format
+        self.cube = cube
+        self.use_worker = use_worker
+        self.lazy_tabs = lazy_tabs
+        self.precomputed_results = precomputed_results
+        self.profile = profile
+        # Символов по секциям шаблона (DATA_JSON, CUBE_JSON, ...) последней generate_html
+        self.section_sizes = {}
 
         if tabs:
             self.tabs = tabs
@@ -67,42 +168,35 @@ class DashboardEngine:
         if self.analysis_context:
             self.analysis_context.set_dashboard_metrics(metrics)
 
-    def generate_html(self, output_file: str = 'dashboard.html') -> str:
+    def generate_html(self, output_file: str = 'dashboard.html', binary_numeric: bool = False) -> str:
         """
         Генерирует HTML файл дашборда
 
         Args:
             output_file: Путь к выходному файлу
+            binary_numeric: Встраивать числовые колонки как base64 буферы
+                (Float64/Float32/Int32). Требует data_format='columnar'
 
         Returns:
             Путь к созданному файлу
         """
-        # Подготовка данных
-        data_json = self._prepare_data_json()
+        if binary_numeric and self.data_format != 'columnar':
+            raise ValueError("binary_numeric=True требует data_format='columnar'")
 
         # Сборка HTML компонентов для всех вкладок
         tabs_html = {}
-        all_js = []
+        tabs_js = {}
         all_css = []
         
         for tab_id, tab_data in self.tabs.items():
             layout = tab_data['layout']
             tabs_html[tab_id] = layout.get_html()
-            all_js.append(layout.get_all_js_code())
+            tabs_js[tab_id] = layout.get_all_js_code()
             all_css.append(layout.get_all_css_styles())
         
-        charts_js = '\n'.join(all_js)
+        charts_js = '' if self.lazy_tabs else '\n'.join(tabs_js.values())
         charts_css = '\n'.join(all_css)
 
-        # Загрузка шаблона
-        template_path = os.path.join(
-            os.path.dirname(__file__),
-            '..', 'templates', 'dashboard_template.html'
-        )
-
-        with open(template_path, 'r', encoding='utf-8') as f:
-            html_template = f.read()
-
         from prompt_loader import get_prompts_js
         prompts_js = get_prompts_js()
         
@@ -123,24 +217,43 @@ class DashboardEngine:
             )
             tabs_content.append(f'    {tabs_html[tab_id]}\n</div>')
 
-        # Замена плейсхолдеров
-        html_content = html_template.replace('{{DATA_JSON}}', data_json)
-        available_levels_json = json.dumps(self.filters.available_detail_levels)
-        html_content = html_content.replace('{{AVAILABLE_DETAIL_LEVELS}}', available_levels_json)
-        html_content = html_content.replace('{{PROMPTS_JSON}}', prompts_js)
-        html_content = html_content.replace('{{CONTEXT_DATA_JS}}', context_data_js)
-        html_content = html_content.replace('{{CHARTS_JS}}', charts_js)
-        html_content = html_content.replace('{{CHARTS_CSS}}', charts_css)
-        html_content = html_content.replace('{{FILTERS_HTML}}', self._get_filters_html())
-        html_content = html_content.replace('{{FILTERS_JS}}', self._get_filters_js())
-
-        # Генерация динамических вкладок
-        html_content = html_content.replace('{{TABS_BUTTONS}}', '\n            '.join(tabs_buttons))
-        html_content = html_content.replace('{{TABS_CONTENT}}', '\n        '.join(tabs_content))
-
-        # Запись файла
+        # Содержимое плейсхолдеров: строка или итератор фрагментов (данные
+        # сериализуются по частям прямо в файл)
+        # Статистика числовых колонок заполняется при потоковой записи DATA_JSON
+        binary_stats = {}
+        sections = {
+            'DATA_STORE_JS': get_data_store_js(),
+            'WORKER_JS': get_worker_js() if self.use_worker else '',
+            'DATA_JSON': self._iter_data_json(binary_numeric=binary_numeric, stats=binary_stats),
+            'CUBE_JSON': self._iter_cube_json(binary_numeric=binary_numeric),
+            'AGGREGATION_JS': get_aggregation_js(),
+            'VIRTUAL_TABLE_JS': get_virtual_table_js(),
+            'TABLE_EXPORT_JS': get_table_export_js(),
+            'RESULT_CACHE_JS': get_result_cache_js(self.precomputed_results),
+            'PLOT_RENDERER_JS': get_plot_renderer_js(),
+            'PROFILER_JS': get_profiler_js(self._chart_ids()) if self.profile else '',
+            'AVAILABLE_DETAIL_LEVELS': json.dumps(self.filters.available_detail_levels),
+            'PROMPTS_JSON': prompts_js,
+            'CONTEXT_DATA_JS': context_data_js,
+            'CHARTS_JS': charts_js,
+            'LAZY_TABS_JS': self._get_lazy_tabs_html(tabs_js) if self.lazy_tabs else '',
+            'CHARTS_CSS': charts_css,
+            'FILTERS_HTML': self._get_filters_html(),
+            'FILTERS_JS': self._get_filters_js(),
+            # Генерация динамических вкладок
+            'TABS_BUTTONS': '\n            '.join(tabs_buttons),
+            'TABS_CONTENT': '\n        '.join(tabs_content),
+        }
+
+        # Потоковая запись: шаблон разбивается на части один раз, каждая
+        # секция пишется в файл сразу (без копий всего документа на replace)
         with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+            written = render_template(_load_template(), sections, f)
+        self.section_sizes = written
+
+        print(f"Размер JSON: {written.get('DATA_JSON', 0) / 1024:.1f} KB")
+        if self.cube is not None:
+            print(f"Размер JSON куба: {written.get('CUBE_JSON', 0) / 1024:.1f} KB")
 
         file_size = os.path.getsize(output_file)
         total_charts = sum(len(tab['layout'].get_all_charts()) for tab in self.tabs.values())
@@ -149,59 +262,149 @@ class DashboardEngine:
         print(f"HTML создан: {output_file}")
         print(f"Размер: {file_size / 1024 / 1024:.2f} МБ")
         print(f"Записей: {len(self.df)}")
+        if self.cube is not None:
+            print(f"Строк куба: {len(self.cube)} (в {len(self.df) / max(len(self.cube), 1):.0f} раз меньше)")
+        print(f"Формат данных: {self.data_format}{' + base64' if binary_numeric else ''}")
+        if binary_numeric:
+            stats = summarize_binary_stats(binary_stats)
+            print(f"Числовые колонки: base64 {stats['base64_columns']} ({stats['base64_bytes'] / 1024:.1f} KB), "
+                  f"текстом {stats['text_columns']} ({stats['text_bytes'] / 1024:.1f} KB)")
+            if stats['change_percent'] is not None:
+                print(f"Размер base64 относительно текста (первые {EXPORT_CHUNK_ROWS} строк колонок): "
+                      f"{stats['change_percent']:+.0f}%")
+            print("Время разбора колонок в браузере: консоль '📦 DataStore' (window.dataStore.decodeStats)")
+        if self.use_worker:
+            print("Фильтрация и агрегации: Web Worker")
+        if self.profile:
+            print("Профилирование обновлений графиков: включено (панель на странице)")
+        if self.lazy_tabs:
+            lazy_size = sum(len(js) for js in tabs_js.values())
+            print(f"Ленивая загрузка вкладок: {lazy_size / 1024:.1f} KB JS графиков при первом открытии")
         print(f"Вкладок: {len(self.tabs)}")
         print(f"Графиков: {total_charts}")
         print(f"{'=' * 80}\n")
 
         return os.path.abspath(output_file)
 
-    def _prepare_data_json(self) -> str:
+    def _chart_ids(self) -> list:
+        """ID всех графиков дашборда (по вкладкам)"""
+        return [chart.chart_id for tab in self.tabs.values() for chart in tab['layout'].get_all_charts()]
+
+    def _iter_data_json(self, binary_numeric: bool = False, stats: Optional[dict] = None):
+        """
+        Потоковая подготовка данных в JSON формат
+
+        Args:
+            binary_numeric: Числовые колонки как base64 буферы (только columnar)
+            stats: dict для статистики числовых колонок (см. iter_columnar_json)
+
+        Yields:
+            фрагменты JSON (массив записей или колоночный payload, см. data_format)
+        """
+        yield from self._iter_serialized_frame(self._prepare_export_frame(), binary_numeric, stats)
+
+    def _iter_cube_json(self, binary_numeric: bool = False):
+        """
+        Потоковая подготовка куба в JSON (в том же формате, что и данные)
+
+        Args:
+            binary_numeric: Числовые колонки как base64 буферы (только columnar)
+
+        Yields:
+            фрагменты JSON ('null', если куб не задан)
         """
-        Подготовка данных в JSON формат
+        if self.cube is None:
+            yield 'null'
+            return
+
+        yield from self._iter_serialized_frame(self._prepare_export_frame(self.cube), binary_numeric)
+
+    def _iter_serialized_frame(self, df_export: pd.DataFrame, binary_numeric: bool = False,
+                               stats: Optional[dict] = None):
+        """
+        Потоковая сериализация подготовленного DataFrame в формате data_format
+
+        Args:
+            df_export: DataFrame после _prepare_export_frame
+            binary_numeric: Числовые колонки как base64 буферы (только columnar)
+            stats: dict для статистики числовых колонок (см. iter_columnar_json)
+
+        Yields:
+            фрагменты JSON строки
+        """
+        if self.data_format == 'columnar':
+            return iter_columnar_json(df_export, binary_numeric=binary_numeric, stats=stats)
+        return iter_records_json(df_export)
+
+    def _prepare_export_frame(self, df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Подготовка DataFrame к выгрузке: производные колонки
+
+        Кадр не копируется: производные колонки добавляются через assign
+        (данные остальных колонок общие с исходным кадром), даты остаются
+        datetime - в строки их переводят сериализаторы data_store по фрагментам.
+
+        Args:
+            df: DataFrame для выгрузки (по умолчанию self.df)
 
         Returns:
-            JSON строка
+            DataFrame для сериализации
         """
-        df_export = self.df.copy()
+        df = self.df if df is None else df
+        if 'Дата рождения' not in df.columns and 'Дата приема' not in df.columns:
+            return df
 
-        # Расчёт возрастных групп
-        if 'Дата рождения' in df_export.columns:
-            df_export['Возраст'] = df_export.apply(
-                lambda row: calculate_age(
-                    row['Дата рождения'],
-                    row['Дата увольнения'] if pd.notnull(row.get('Дата увольнения')) else datetime.now()
-                ),
-                axis=1
-            )
-            df_export['Возрастная группа'] = df_export['Возраст'].apply(get_age_group)
+        starts = range(0, len(df), EXPORT_CHUNK_ROWS) or [0]
+        derived = pd.concat([self._derive_columns(df.iloc[start:start + EXPORT_CHUNK_ROWS]) for start in starts])
+        return df.assign(**{col: derived[col] for col in derived.columns})
 
-        # Расчёт стажа
-        if 'Дата приема' in df_export.columns:
-            df_export['Стаж (месяцы)'] = df_export.apply(
-                lambda row: calculate_tenure_months(
-                    row['Дата приема'],
-                    row['Дата увольнения'] if pd.notnull(row.get('Дата увольнения')) else datetime.now()
-                ),
-                axis=1
-            )
-            df_export['Диапазон стажа'] = df_export['Стаж (месяцы)'].apply(get_tenure_range)
+    @staticmethod
+    def _derive_columns(chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Производные колонки фрагмента строк: возраст и стаж
 
-        # Конвертация дат
-        for col in df_export.columns:
-            if pd.api.types.is_datetime64_any_dtype(df_export[col]):
-                df_export[col] = df_export[col].apply(
-                    lambda x: x.strftime('%Y-%m-%d') if pd.notnull(x) else None
-                )
+        Args:
+            chunk: фрагмент DataFrame (EXPORT_CHUNK_ROWS строк)
+
+        Returns:
+            DataFrame только с производными колонками
+        """
+        derived = pd.DataFrame(index=chunk.index)
+        end_dates = chunk['Дата увольнения'] if 'Дата увольнения' in chunk.columns else None
+
+        def end_date(i):
+            value = end_dates.iloc[i] if end_dates is not None else None
+            return value if pd.notnull(value) else datetime.now()
+
+        # Расчёт возрастных групп
+        if 'Дата рождения' in chunk.columns:
+            derived['Возраст'] = [calculate_age(value, end_date(i))
+                                  for i, value in enumerate(chunk['Дата рождения'])]
+            derived['Возрастная группа'] = derived['Возраст'].apply(get_age_group)
 
-        # Замена NaN на None
-        df_export = df_export.where(pd.notnull(df_export), None)
+        # Расчёт стажа
+        if 'Дата приема' in chunk.columns:
+            derived['Стаж (месяцы)'] = [calculate_tenure_months(value, end_date(i))
+                                        for i, value in enumerate(chunk['Дата приема'])]
+            derived['Диапазон стажа'] = derived['Стаж (месяцы)'].apply(get_tenure_range)
+        return derived
 
-        # Конвертация в JSON
-        data_json = df_export.to_json(orient='records', force_ascii=False)
+    def _get_lazy_tabs_html(self, tabs_js: Dict[str, str]) -> str:
+        """
+        Инертные блоки JS графиков по вкладкам (браузер их не разбирает и не выполняет)
 
-        print(f"Размер JSON: {len(data_json) / 1024:.1f} KB")
+        Args:
+            tabs_js: {id вкладки: JS код графиков вкладки}
 
-        return data_json
+        Returns:
+            HTML строка
+        """
+        blocks = []
+        for tab_id, js_code in tabs_js.items():
+            blocks.append(
+                f'<script type="text/x-lazy-tab" data-tab="{tab_id}">\n{js_code}\n    </script>'
+            )
+        return '\n    '.join(blocks)
 
     def _get_filters_html(self) -> str:
         """
@@ -1,11 +1,173 @@
 # PROJECT_ROOT: engine/data_processor.py
+import functools
+import hashlib
+import json
+import os
+import re
 import pandas as pd
 import numpy as np
 
+try:
+    import pyarrow  # noqa: F401 - нужен pandas для Parquet
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
+
+# Каталог кэша исходных Excel файлов (Parquet, без pyarrow - pickle)
+CACHE_DIR = '.data_cache'
+
+# Явные типы колонок исходных файлов: кэш всегда пишется с одной схемой
+SALES_DTYPES = {
+    'Магазин': 'str', 'Товар': 'str', 'Тип': 'str', 'Месяц': 'str',
+    'Год': 'int64',
+    'Сумма в чеке': 'float64', 'Наценка продажи в чеке': 'float64',
+    'Себестоимость продажи в чеке': 'float64', 'Количество в чеке': 'float64',
+    'Число чеков': 'float64',
+}
+STORE_AREA_DTYPES = {'Магазин': 'str', 'Торговая площадь магазина': 'float64'}
+CHECKS_DTYPES = {
+    'Магазин': 'str', 'Тип': 'str', 'Месяц': 'str',
+    'Год': 'int64', 'Чеки_по_типу': 'float64',
+}
+WRITEOFFS_DTYPES = {'Магазин': 'str', 'Товар': 'str', 'Тип': 'str', 'Месяц': 'str', 'Год': 'int64'}
+
+# Колоночные форматы входных файлов: читаются напрямую, без кэша Excel
+COLUMNAR_READERS = {'.parquet': pd.read_parquet, '.feather': pd.read_feather}
+
+# Версий файла чеков в памяти процесса (load_checks_by_type)
+CHECKS_CACHE_SIZE = 2
+
+
+def _apply_dtypes(df, dtypes):
+    """
+    Приведение колонок к явным типам (только присутствующие колонки).
+    Строковые колонки сохраняют пропуски как NaN.
+    """
+    for col, dtype in (dtypes or {}).items():
+        if col not in df.columns:
+            continue
+        if dtype == 'str':
+            if isinstance(df[col].dtype, pd.CategoricalDtype) and \
+                    pd.api.types.is_string_dtype(df[col].cat.categories):
+                # Parquet / Feather: категории уже строки, построчная замена не нужна
+                continue
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        elif dtype.startswith('int') and df[col].isna().any():
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def _file_sha1(file_path):
+    """SHA-1 содержимого файла (читается блоками)"""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_key(file_path):
+    """
+    Имя файлов кэша: stem и хэш абсолютного пути
+
+    Одноимённые файлы из разных каталогов не делят кэш, а очистка старых
+    версий 'sales' не задевает кэш 'sales-2024.xlsx'.
+    """
+    abs_path = os.path.abspath(file_path)
+    stem = os.path.splitext(os.path.basename(abs_path))[0]
+    path_hash = hashlib.sha1(abs_path.encode('utf-8')).hexdigest()[:8]
+    return f'{stem}-{path_hash}'
+
+
+def read_excel_cached(file_path, dtypes=None, cache_dir=CACHE_DIR):
+    """
+    Чтение Excel через кэш.
+
+    Файл конвертируется один раз в Parquet (или pickle без pyarrow) с явными типами.
+    Ключ кэша - mtime, размер и SHA-1 исходного файла: хэш пересчитывается только
+    при изменении mtime/размера, поэтому повторный запуск не читает Excel вовсе.
+    Файлы кэша именуются по _cache_key (stem + хэш абсолютного пути).
+
+    Args:
+        file_path: путь к Excel файлу
+        dtypes: dict {колонка: тип} ('str', 'int64', 'float64', ...)
+        cache_dir: каталог кэша (None - без дискового кэша)
+
+    Returns:
+        DataFrame
+    """
+    if not cache_dir:
+        return _apply_dtypes(pd.read_excel(file_path), dtypes)
+
+    stat = os.stat(file_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    key = _cache_key(file_path)
+    meta_path = os.path.join(cache_dir, f'{key}.meta.json')
+    ext = 'parquet' if _HAS_PYARROW else 'pkl'
+
+    meta = {}
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+    if meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size:
+        sha1 = meta['sha1']
+    else:
+        sha1 = _file_sha1(file_path)
+
+    cache_path = os.path.join(cache_dir, f'{key}-{sha1[:16]}.{ext}')
+    if os.path.exists(cache_path) and meta.get('dtypes') == dtypes:
+        df = pd.read_parquet(cache_path) if ext == 'parquet' else pd.read_pickle(cache_path)
+    else:
+        df = _apply_dtypes(pd.read_excel(file_path), dtypes)
+        if ext == 'parquet':
+            df.to_parquet(cache_path, index=False)
+        else:
+            df.to_pickle(cache_path)
+        # Старые версии кэша этого файла больше не нужны
+        for name in os.listdir(cache_dir):
+            old_path = os.path.join(cache_dir, name)
+            if name.startswith(f'{key}-') and old_path != cache_path:
+                os.remove(old_path)
+
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha1': sha1,
+                   'dtypes': dtypes}, f, ensure_ascii=False)
+    return df
+
+
+def read_input(file_path, dtypes=None, cache_dir=CACHE_DIR):
+    """
+    Чтение входного файла по расширению.
+
+    .parquet / .feather читаются напрямую (это уже колоночный формат, кэш не
+    нужен), остальное - как Excel через read_excel_cached.
+
+    Args:
+        file_path: путь к файлу
+        dtypes: dict {колонка: тип} ('str', 'int64', 'float64', ...)
+        cache_dir: каталог кэша Excel (None - без дискового кэша)
+
+    Returns:
+        DataFrame
+    """
+    reader = COLUMNAR_READERS.get(os.path.splitext(file_path)[1].lower())
+    if reader is not None:
+        return _apply_dtypes(reader(file_path), dtypes)
+    return read_excel_cached(file_path, dtypes, cache_dir)
+
 
 def create_date_column(df, year_col='Год', month_col='Месяц', date_col=None):
     """
-    Create formatted Дата column from year+month OR existing date column
+    Create Дата (datetime64) and Период_номер (month ordinal) columns
+    from year+month OR existing date column
+
+    Дата is kept as a real datetime: the 'DD.MM.YYYY' string is produced only
+    on export (see engine.data_store.EXPORT_DATE_FORMATS), once per unique date.
+    Период_номер = year * 12 + month lets JS get year/month without parsing strings.
 
     Args:
         df: DataFrame
@@ -14,7 +176,7 @@ def create_date_column(df, year_col='Год', month_col='Месяц', date_col=N
         date_col: Optional single date column name
 
     Returns:
-        DataFrame with Дата column in format DD.MM.YYYY or 01.MM.YYYY
+        DataFrame with Дата (datetime64) and Период_номер (int32) columns
     """
     MONTH_MAP = {
         'Январь': 1, 'Февраль': 2, 'Март': 3, 'Апрель': 4,
@@ -24,32 +186,33 @@ def create_date_column(df, year_col='Год', month_col='Месяц', date_col=N
 
     if date_col and date_col in df.columns:
         # Single date column scenario
-        df['Дата'] = pd.to_datetime(df[date_col]).dt.strftime('%d.%m.%Y')
+        df['Дата'] = pd.to_datetime(df[date_col])
+        years = df['Дата'].dt.year
+        months = df['Дата'].dt.month
     elif year_col in df.columns and month_col in df.columns:
         # Year + Month scenario
-        df['Месяц_num'] = df[month_col].map(MONTH_MAP)
-        # Создаем временный DataFrame с нужными названиями столбцов для pd.to_datetime
-        date_df = pd.DataFrame({
-            'year': df[year_col],
-            'month': df['Месяц_num'],
-            'day': 1
-        })
-        df['Дата'] = pd.to_datetime(date_df).dt.strftime('01.%m.%Y')
-        df.drop('Месяц_num', axis=1, inplace=True)
+        years = pd.to_numeric(df[year_col], errors='coerce')
+        months = df[month_col].astype(object).map(MONTH_MAP)
+        df['Дата'] = pd.to_datetime(pd.DataFrame({'year': years, 'month': months, 'day': 1}))
+    else:
+        return df
+
+    period = years * 12 + months
+    df['Период_номер'] = period.astype('int32') if period.notna().all() else period
 
     return df
 
 
 def load_sales_data(file_path='final_flat_clean.xlsx', column_mapping=None):
     """
-    Загружает данные из Excel как есть.
+    Загружает данные из Excel (или Parquet / Feather) как есть.
 
     Args:
-        file_path: путь к файлу
+        file_path: путь к файлу (.xlsx, .parquet, .feather)
         column_mapping: dict для переименования колонок, например:
                        {'Сумма в чеках продажи': 'Выручка'}
     """
-    df = pd.read_excel(file_path)
+    df = read_input(file_path, SALES_DTYPES)
 
     # Применяем маппинг колонок если задан
     if column_mapping:
@@ -63,6 +226,83 @@ def load_sales_data(file_path='final_flat_clean.xlsx', column_mapping=None):
     return df
 
 
+# Колонки-измерения продаж (Categorical) и порядок месяцев
+CATEGORY_COLUMNS = ['Магазин', 'Товар', 'Тип', 'Месяц']
+MONTH_ORDER = [
+    'Январь', 'Февраль', 'Март', 'Апрель', 'Май', 'Июнь',
+    'Июль', 'Август', 'Сентябрь', 'Октябрь', 'Ноябрь', 'Декабрь'
+]
+
+# Целочисленные колонки: понижаются до наименьшего целого типа
+INTEGER_COLUMNS = ['Год', 'Число чеков', 'Чеки_по_типу', 'Чеки_всего', 'Чеки_оригинал']
+
+
+def _natural_key(value):
+    """Ключ натуральной сортировки: 'Магазин 2' < 'Магазин 10'"""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', str(value))]
+
+
+def _category_order(column, values):
+    """Порядок категорий колонки: месяцы по календарю, остальное - натуральная сортировка"""
+    values = pd.Series(values).dropna().unique().tolist()
+    if column == 'Месяц':
+        known = [m for m in MONTH_ORDER if m in values]
+        return known + sorted((v for v in values if v not in MONTH_ORDER), key=_natural_key)
+    return sorted(values, key=_natural_key)
+
+
+def _downcast_numeric(series):
+    """
+    Понижение разрядности без потерь: целые - до int8/16/32, дробные - до float32,
+    только если значения восстанавливаются точно (денежные суммы обычно остаются float64)
+    """
+    if series.name in INTEGER_COLUMNS and series.notna().all() and (series % 1 == 0).all():
+        return pd.to_numeric(series, downcast='integer')
+    if pd.api.types.is_float_dtype(series) and series.dtype != np.float32:
+        as_float32 = series.astype(np.float32)
+        if np.array_equal(as_float32.to_numpy(dtype=np.float64), series.to_numpy(), equal_nan=True):
+            return as_float32
+    return series
+
+
+def normalize_sales_schema(df):
+    """
+    Схема основного DataFrame продаж: измерения - Categorical, числа - минимальных типов.
+
+    Магазин, Товар, Тип, Месяц приводятся к pandas Categorical с общим порядком категорий
+    (натуральная сортировка 'Магазин N', месяцы по календарю). Справочники, которые
+    присоединяются позже (площадь, чеки, списания), приводятся к тем же категориям
+    при merge (_align_categories), поэтому колонки остаются Categorical.
+
+    Args:
+        df: DataFrame после load_sales_data
+
+    Returns:
+        DataFrame с нормализованными типами
+    """
+    df = df.copy()
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.Categorical(df[col], categories=_category_order(col, df[col]))
+
+    for col in df.select_dtypes(include='number').columns:
+        df[col] = _downcast_numeric(df[col])
+
+    return df
+
+
+def _align_categories(df, other, keys):
+    """
+    Приводит ключи справочника other к Categorical-типам df (для merge без потери категорий).
+    Значения, которых нет в категориях df, становятся NaN: в left merge они всё равно не совпадут.
+    """
+    other = other.copy()
+    for key in keys:
+        if key in df.columns and key in other.columns and isinstance(df[key].dtype, pd.CategoricalDtype):
+            other[key] = other[key].astype(df[key].dtype)
+    return other
+
+
 def get_unique_values(df: pd.DataFrame, column: str) -> list:
     """Get unique values from column, sorted"""
     if column not in df.columns:
@@ -72,7 +312,7 @@ def get_unique_values(df: pd.DataFrame, column: str) -> list:
 
 
 def merge_store_area(df, area_file_path='store.xlsx'):
-    df_area = pd.read_excel(area_file_path)
+    df_area = _align_categories(df, read_input(area_file_path, STORE_AREA_DTYPES), ['Магазин'])
     df_merged = df.merge(df_area, on='Магазин', how='left')
     return df_merged
 
@@ -85,9 +325,28 @@ def load_checks_by_type(file_path='final_flat_clean_chek_type.xlsx'):
     | Тип   | Год  | Месяц   | Магазин  | Чеки_по_типу |
 
     Типы: сп, непрод, скоропорт, товар, всего
+
+    Повторные вызовы в одном запуске (merge_checks_by_type, get_total_checks)
+    берут файл из памяти (_read_checks, до CHECKS_CACHE_SIZE версий файла).
     """
-    df = pd.read_excel(file_path)
-    return df
+    stat = os.stat(file_path)
+    return _read_checks(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size).copy()
+
+
+@functools.lru_cache(maxsize=CHECKS_CACHE_SIZE)
+def _read_checks(abs_path, mtime_ns, size):
+    """Чтение файла чеков; mtime и размер - часть ключа lru_cache"""
+    return read_input(abs_path, CHECKS_DTYPES)
+
+
+def _first_row_mask(df, keys):
+    """
+    Маска первой строки каждой группы keys (в порядке строк df).
+
+    Один проход groupby().cumcount() вместо duplicated(subset=...) по всем строкам.
+    Пропуски в ключах считаются отдельной группой, как в duplicated.
+    """
+    return df.groupby(keys, sort=False, dropna=False, observed=True).cumcount().to_numpy() == 0
 
 
 def merge_checks_by_type(df, checks_file_path='final_flat_clean_chek_type.xlsx'):
@@ -97,7 +356,7 @@ def merge_checks_by_type(df, checks_file_path='final_flat_clean_chek_type.xlsx')
     Добавляет колонку 'Чеки_по_типу' - число чеков данного типа за месяц по магазину.
     ВАЖНО: Значение только в первой строке группы Магазин+Год+Месяц+Тип, остальные = 0.
     """
-    df_checks = load_checks_by_type(checks_file_path)
+    df_checks = _align_categories(df, load_checks_by_type(checks_file_path), ['Тип', 'Месяц', 'Магазин'])
 
     # Джойним по Тип, Год, Месяц, Магазин
     df_merged = df.merge(
@@ -108,7 +367,7 @@ def merge_checks_by_type(df, checks_file_path='final_flat_clean_chek_type.xlsx')
 
     # Значение только в первой строке группы, остальные = 0
     if 'Чеки_по_типу' in df_merged.columns:
-        first_row_mask = ~df_merged.duplicated(subset=['Магазин', 'Год', 'Месяц', 'Тип'], keep='first')
+        first_row_mask = _first_row_mask(df_merged, ['Магазин', 'Год', 'Месяц', 'Тип'])
         original_values = df_merged['Чеки_по_типу'].copy()
         df_merged['Чеки_по_типу'] = original_values.where(first_row_mask, 0)
         df_merged['Чеки_по_типу'] = df_merged['Чеки_по_типу'].fillna(0)
@@ -142,7 +401,7 @@ def merge_total_checks(df, checks_file_path='final_flat_clean_chek_type.xlsx'):
     для каждой комбинации Магазин+Год+Месяц. Это гарантирует правильную сумму
     при группировке (не будет дублирования).
     """
-    df_total = get_total_checks(checks_file_path)
+    df_total = _align_categories(df, get_total_checks(checks_file_path), ['Месяц', 'Магазин'])
 
     df_merged = df.merge(
         df_total,
@@ -159,7 +418,7 @@ def merge_total_checks(df, checks_file_path='final_flat_clean_chek_type.xlsx'):
     # Это гарантирует что сумма чеков при группировке будет правильной
     if 'Чеки_всего' in df_merged.columns and 'Число чеков' in df_merged.columns:
         # Создаём маску: True только для первой строки в каждой группе
-        first_row_mask = ~df_merged.duplicated(subset=['Магазин', 'Год', 'Месяц'], keep='first')
+        first_row_mask = _first_row_mask(df_merged, ['Магазин', 'Год', 'Месяц'])
         # В первой строке группы - корректное значение, в остальных - 0
         df_merged['Число чеков'] = df_merged['Чеки_всего'].where(first_row_mask, 0)
         df_merged['Число чеков'] = df_merged['Число чеков'].fillna(0)
@@ -167,8 +426,54 @@ def merge_total_checks(df, checks_file_path='final_flat_clean_chek_type.xlsx'):
     return df_merged
 
 
+def enrich_with_checks(df, checks_file_path='final_flat_clean_chek_type.xlsx'):
+    """
+    Присоединяет чеки по типам и 'всего' за одно чтение и один merge.
+
+    Результат совпадает с последовательным merge_checks_by_type + merge_total_checks:
+    - 'Чеки_по_типу' - только в первой строке группы Магазин+Год+Месяц+Тип, остальные = 0
+    - 'Чеки_всего' - общее число чеков за месяц по магазину
+    - 'Чеки_оригинал' - исходное 'Число чеков' (для группировки по товару)
+    - 'Число чеков' - 'Чеки_всего' только в первой строке группы Магазин+Год+Месяц
+
+    Обе таблицы чеков сначала сводятся к уникальным ключам Магазин+Год+Месяц+Тип
+    продаж (небольшая таблица), затем к продажам делается один left merge.
+    """
+    type_keys = ['Тип', 'Год', 'Месяц', 'Магазин']
+    store_keys = ['Год', 'Месяц', 'Магазин']
+
+    df_checks = load_checks_by_type(checks_file_path)
+    is_total = df_checks['Тип'].str.lower() == 'всего'
+    checks_by_type = df_checks.loc[~is_total, type_keys + ['Чеки_по_типу']]
+    checks_total = df_checks.loc[is_total, store_keys + ['Чеки_по_типу']].rename(
+        columns={'Чеки_по_типу': 'Чеки_всего'}
+    )
+
+    checks_by_type = _align_categories(df, checks_by_type, type_keys)
+    checks_total = _align_categories(df, checks_total, store_keys)
+
+    lookup = (
+        df[type_keys].drop_duplicates()
+        .merge(checks_by_type, on=type_keys, how='left')
+        .merge(checks_total, on=store_keys, how='left')
+    )
+    df_merged = df.merge(lookup, on=type_keys, how='left')
+
+    first_in_type = _first_row_mask(df_merged, ['Магазин', 'Год', 'Месяц', 'Тип'])
+    df_merged['Чеки_по_типу'] = df_merged['Чеки_по_типу'].where(first_in_type, 0).fillna(0)
+
+    if 'Число чеков' in df_merged.columns:
+        df_merged['Чеки_оригинал'] = df_merged['Число чеков'].copy()
+        first_in_month = _first_row_mask(df_merged, ['Магазин', 'Год', 'Месяц'])
+        df_merged['Число чеков'] = df_merged['Чеки_всего'].where(first_in_month, 0).fillna(0)
+
+    return df_merged
+
+
 def merge_writeoffs(df, writeoffs_file_path):
-    df_writeoffs = pd.read_excel(writeoffs_file_path)
+    df_writeoffs = _align_categories(
+        df, read_input(writeoffs_file_path, WRITEOFFS_DTYPES), ['Месяц', 'Товар', 'Тип', 'Магазин']
+    )
     df_merged = df.merge(
         df_writeoffs,
         on=['Год', 'Месяц', 'Товар', 'Тип', 'Магазин'],
@@ -190,15 +495,15 @@ def aggregate_by_store(df):
     if 'Чеки_всего' in df.columns:
         # Суммируем уникальные значения чеков по месяцам (не дублируем)
         # Группируем сначала по Магазин+Год+Месяц, берём first, потом суммируем
-        checks_by_month = df.groupby(['Магазин', 'Год', 'Месяц'])['Чеки_всего'].first().reset_index()
-        total_checks = checks_by_month.groupby('Магазин')['Чеки_всего'].sum().reset_index()
+        checks_by_month = df.groupby(['Магазин', 'Год', 'Месяц'], observed=True)['Чеки_всего'].first().reset_index()
+        total_checks = checks_by_month.groupby('Магазин', observed=True)['Чеки_всего'].sum().reset_index()
         total_checks.columns = ['Магазин', 'Число_чеков_корр']
         use_corrected = True
     else:
         agg_dict['Число чеков'] = 'sum'
         use_corrected = False
 
-    store_agg = df.groupby('Магазин').agg(agg_dict).reset_index()
+    store_agg = df.groupby('Магазин', observed=True).agg(agg_dict).reset_index()
 
     if use_corrected:
         store_agg = store_agg.merge(total_checks, on='Магазин', how='left')
@@ -222,15 +527,15 @@ def aggregate_by_month(df):
 
     if 'Чеки_всего' in df.columns:
         # Суммируем уникальные чеки по магазинам за каждый месяц
-        checks_by_month = df.groupby(['Дата', 'Магазин'])['Чеки_всего'].first().reset_index()
-        total_checks = checks_by_month.groupby('Дата')['Чеки_всего'].sum().reset_index()
+        checks_by_month = df.groupby(['Дата', 'Магазин'], observed=True)['Чеки_всего'].first().reset_index()
+        total_checks = checks_by_month.groupby('Дата', observed=True)['Чеки_всего'].sum().reset_index()
         total_checks.columns = ['Дата', 'Число_чеков_корр']
         use_corrected = True
     else:
         agg_dict['Число чеков'] = 'sum'
         use_corrected = False
 
-    monthly_agg = df.groupby('Дата').agg(agg_dict).reset_index()
+    monthly_agg = df.groupby('Дата', observed=True).agg(agg_dict).reset_index()
 
     if use_corrected:
         monthly_agg = monthly_agg.merge(total_checks, on='Дата', how='left')
@@ -242,7 +547,7 @@ def aggregate_by_month(df):
 
 
 def aggregate_by_product(df):
-    product_agg = df.groupby('Товар').agg({
+    product_agg = df.groupby('Товар', observed=True).agg({
         'Выручка': 'sum',
         'Валовая_прибыль': 'sum',
         'Число чеков': 'sum'
@@ -267,15 +572,15 @@ def aggregate_by_type(df):
 
     if 'Чеки_по_типу' in df.columns:
         # Суммируем уникальные чеки по типам (по магазинам и месяцам)
-        checks_by_type = df.groupby(['Тип', 'Год', 'Месяц', 'Магазин'])['Чеки_по_типу'].first().reset_index()
-        total_checks = checks_by_type.groupby('Тип')['Чеки_по_типу'].sum().reset_index()
+        checks_by_type = df.groupby(['Тип', 'Год', 'Месяц', 'Магазин'], observed=True)['Чеки_по_типу'].first().reset_index()
+        total_checks = checks_by_type.groupby('Тип', observed=True)['Чеки_по_типу'].sum().reset_index()
         total_checks.columns = ['Тип', 'Число_чеков_корр']
         use_corrected = True
     else:
         agg_dict['Число чеков'] = 'sum'
         use_corrected = False
 
-    type_agg = df.groupby('Тип').agg(agg_dict).reset_index()
+    type_agg = df.groupby('Тип', observed=True).agg(agg_dict).reset_index()
 
     if use_corrected:
         type_agg = type_agg.merge(total_checks, on='Тип', how='left')
@@ -305,7 +610,7 @@ def aggregate_store_performance(df):
         - Выручка, Прибыль, Выручка_на_м2, Прибыль_на_м2
     """
     # Агрегируем по магазинам
-    store_agg = df.groupby('Магазин').agg({
+    store_agg = df.groupby('Магазин', observed=True).agg({
         'Выручка': 'sum',
         'Валовая_прибыль': 'sum',
         'Торговая площадь магазина': 'first'  # площадь одинаковая для магазина
@@ -321,3 +626,43 @@ def aggregate_store_performance(df):
     store_agg['Store_ID'] = store_agg['Магазин'].str.extract(r'(\d+)').astype(int)
 
     return store_agg
+
+
+# Ключи куба: уровень, на котором работают графики без разреза по товарам
+CUBE_KEYS = ['Магазин', 'Год', 'Месяц', 'Тип']
+
+# Колонки, одинаковые внутри группы куба (берём первое значение)
+CUBE_FIRST_COLUMNS = ['Дата', 'Период_номер', 'Торговая площадь магазина', 'Чеки_всего']
+
+# Колонки уровня товара, которые в куб не попадают
+CUBE_PRODUCT_COLUMNS = ['Товар', 'Чеки_оригинал']
+
+
+def build_sales_cube(df):
+    """
+    Предагрегация продаж до уровня Магазин×Год×Месяц×Тип.
+
+    Числовые показатели суммируются. 'Число чеков' и 'Чеки_по_типу' заполнены
+    только в первой строке своей группы (см. merge_total_checks, merge_checks_by_type),
+    поэтому их сумма по кубу совпадает с суммой по исходным строкам.
+    Колонки уровня товара (Товар, Чеки_оригинал) отбрасываются.
+
+    Args:
+        df: DataFrame продаж после всех мерджей
+
+    Returns:
+        DataFrame куба: ключи, колонки CUBE_FIRST_COLUMNS и суммы показателей
+    """
+    keys = [col for col in CUBE_KEYS if col in df.columns]
+    first_cols = [col for col in CUBE_FIRST_COLUMNS if col in df.columns]
+    sum_cols = [
+        col for col in df.select_dtypes(include='number').columns
+        if col not in keys and col not in first_cols and col not in CUBE_PRODUCT_COLUMNS
+    ]
+
+    agg_dict = {col: 'sum' for col in sum_cols}
+    agg_dict.update({col: 'first' for col in first_cols})
+
+    cube = df.groupby(keys, sort=False, dropna=False, observed=True).agg(agg_dict).reset_index()
+
+    return cube[keys + first_cols + sum_cols]
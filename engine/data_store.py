@@ -0,0 +1,547 @@
+# PROJECT_ROOT: engine/data_store.py
+"""
+Колоночное (columnar) представление данных дашборда
+
+Вместо массива записей [{'Магазин': ..., 'Сумма в чеке': ...}, ...], где в каждой
+строке повторяются длинные названия колонок и строковые значения, данные
+выгружаются по колонкам:
+- числовые колонки - один массив значений на колонку (в браузере -> Float64Array)
+- строковые колонки (Магазин, Товар, Тип, Месяц, Дата ...) - словарь уникальных
+  значений + массив целочисленных кодов (в браузере -> Int32Array)
+
+Формат payload:
+    {
+        "format": "columnar",
+        "length": N,
+        "columns": {
+            "Сумма в чеке": {"type": "number", "values": [...]},
+            "Магазин": {"type": "dict", "dictionary": ["Магазин 1", ...], "codes": [0, 0, 1, ...]}
+        }
+    }
+
+В бинарном режиме (binary_numeric=True) числовые колонки пишутся как base64
+little-endian буферы:
+    "Сумма в чеке": {"type": "number", "encoding": "base64", "dtype": "float64", "data": "..."}
+и в браузере оборачиваются в типизированный массив без копирования
+(new Float64Array(buffer)). Колонка, у которой base64 длиннее текста (целые,
+короткие денежные значения), остаётся текстовой. Время разбора колонок
+браузер пишет в консоль и в store.decodeStats.
+
+На стороне браузера payload разбирает DataStore (см. get_data_store_js).
+"""
+import base64
+import json
+import numpy as np
+import pandas as pd
+
+
+# Колонки, которые всегда кодируются словарём (даже если тип числовой)
+DICTIONARY_COLUMNS = ['Магазин', 'Товар', 'Тип', 'Месяц']
+
+# Тип буфера для числовых колонок в бинарном режиме.
+# Остальные числовые колонки: int32 если значения целые без пропусков, иначе float64.
+BINARY_COLUMN_DTYPES = {
+    'Сумма в чеке': 'float64',
+    'Наценка продажи в чеке': 'float64',
+    'Себестоимость продажи в чеке': 'float64',
+    'Число чеков': 'int32',
+    'Чеки_по_типу': 'int32',
+    'Торговая площадь магазина': 'float32',
+}
+
+# Строк в одном фрагменте потоковой выгрузки. Кратно 3: base64 фрагментов
+# буфера склеивается в base64 всего буфера (без '=' внутри)
+EXPORT_CHUNK_ROWS = 3 * 2 ** 14
+
+_NUMPY_DTYPES = {'float64': '<f8', 'float32': '<f4', 'int32': '<i4'}
+
+# Формат выгрузки дат по колонкам (остальные даты - ISO)
+EXPORT_DATE_FORMATS = {'Дата': '%d.%m.%Y'}
+DEFAULT_DATE_FORMAT = '%Y-%m-%d'
+
+
+def _is_number_column(series: pd.Series) -> bool:
+    """Колонка выгружается как числовой массив"""
+    if series.name in DICTIONARY_COLUMNS:
+        return False
+    return pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series)
+
+
+def _text_values(series: pd.Series, start: int) -> str:
+    """Значения фрагмента числовой колонки через запятую (NaN -> null)"""
+    values_json = series.iloc[start:start + EXPORT_CHUNK_ROWS].to_json(orient='values', double_precision=10)
+    return values_json[1:-1]
+
+
+def _base64_values(values: np.ndarray, start: int, dtype: str) -> str:
+    """base64 фрагмента буфера числовой колонки"""
+    chunk = values[start:start + EXPORT_CHUNK_ROWS].astype(_NUMPY_DTYPES[dtype])
+    return base64.b64encode(np.ascontiguousarray(chunk).tobytes()).decode('ascii')
+
+
+def _iter_number_column(series: pd.Series, first: str = None):
+    """Фрагменты JSON числовой колонки (NaN -> null); first - готовый первый фрагмент"""
+    yield '{"type":"number","values":['
+    for start in range(0, len(series), EXPORT_CHUNK_ROWS):
+        values_json = first if start == 0 and first is not None else _text_values(series, start)
+        yield (',' if start else '') + values_json
+    yield ']}'
+
+
+def _encode_number_column(series: pd.Series) -> str:
+    """JSON числовой колонки (NaN -> null)"""
+    return ''.join(_iter_number_column(series))
+
+
+def _binary_dtype(series: pd.Series) -> str:
+    """Тип буфера для числовой колонки (int32 откатывается на float64, если есть NaN/дроби)"""
+    values = series.to_numpy(dtype='float64', na_value=np.nan)
+    is_integral = (
+        not np.isnan(values).any()
+        and np.array_equal(values, np.round(values))
+        and (len(values) == 0 or (values.min() >= -2 ** 31 and values.max() < 2 ** 31))
+    )
+
+    dtype = BINARY_COLUMN_DTYPES.get(series.name)
+    if dtype is None:
+        dtype = 'int32' if is_integral else 'float64'
+    elif dtype == 'int32' and not is_integral:
+        dtype = 'float64'
+    return dtype
+
+
+def _iter_base64_column(values: np.ndarray, dtype: str, first: str = None):
+    """Фрагменты JSON числовой колонки как base64 буфера; first - готовый первый фрагмент"""
+    yield '{"type":"number","encoding":"base64","dtype":"' + dtype + '","data":"'
+    for start in range(0, len(values), EXPORT_CHUNK_ROWS):
+        yield first if start == 0 and first is not None else _base64_values(values, start, dtype)
+    yield '"}'
+
+
+def _iter_binary_number_column(series: pd.Series, stats: dict = None):
+    """
+    Фрагменты JSON числовой колонки в бинарном режиме (NaN сохраняется для float)
+
+    Первый фрагмент (EXPORT_CHUNK_ROWS строк) кодируется обоими способами.
+    base64 пишется, если на нём он не длиннее текста; иначе (целые и короткие
+    денежные значения в тексте короче 8 байт float64) колонка остаётся текстом.
+
+    Args:
+        series: числовая колонка
+        stats: dict для статистики колонки (см. iter_columnar_json)
+
+    Yields:
+        фрагменты JSON строки
+    """
+    dtype = _binary_dtype(series)
+    values = series.to_numpy(dtype='float64', na_value=np.nan)
+    sample_text = _text_values(series, 0)
+    sample_binary = _base64_values(values, 0, dtype)
+
+    if len(sample_binary) <= len(sample_text):
+        encoding, fragments = 'base64', _iter_base64_column(values, dtype, first=sample_binary)
+    else:
+        encoding, fragments = 'text', _iter_number_column(series, first=sample_text)
+
+    written = 0
+    for fragment in fragments:
+        written += len(fragment)
+        yield fragment
+
+    if stats is not None:
+        stats[series.name] = {
+            'encoding': encoding,
+            'bytes': written,
+            'sample_text_bytes': len(sample_text),
+            'sample_binary_bytes': len(sample_binary),
+        }
+
+
+def _encode_binary_number_column(series: pd.Series) -> str:
+    """JSON числовой колонки в бинарном режиме (base64 буфер или текст, что короче)"""
+    return ''.join(_iter_binary_number_column(series))
+
+
+def _is_date_column(series: pd.Series) -> bool:
+    """Колонка datetime64 (выгружается строками EXPORT_DATE_FORMATS)"""
+    return pd.api.types.is_datetime64_any_dtype(series)
+
+
+def _date_format(series: pd.Series) -> str:
+    """Формат strftime колонки дат"""
+    return EXPORT_DATE_FORMATS.get(series.name, DEFAULT_DATE_FORMAT)
+
+
+def _format_dates(series: pd.Series) -> pd.Series:
+    """
+    Форматирование колонки дат в строки: strftime только для уникальных значений
+
+    Args:
+        series: колонка datetime64
+
+    Returns:
+        колонка строк (None для пропусков)
+    """
+    codes, uniques = pd.factorize(series)
+    labels = np.append(np.asarray(uniques.strftime(_date_format(series)), dtype=object), None)
+    return pd.Series(labels[codes], index=series.index, name=series.name, dtype=object)
+
+
+def _iter_dict_column(series: pd.Series):
+    """
+    Фрагменты JSON колонки со словарным кодированием (NaN/NaT -> код -1)
+
+    Даты кодируются по значениям datetime: в строку переводятся только
+    значения словаря (порядок словаря - хронологический).
+    """
+    try:
+        codes, uniques = pd.factorize(series, sort=True)
+    except TypeError:
+        # Смешанные типы не сортируются - оставляем порядок появления
+        codes, uniques = pd.factorize(series, sort=False)
+
+    if _is_date_column(series):
+        uniques = uniques.strftime(_date_format(series))
+    dictionary_json = json.dumps(list(uniques), ensure_ascii=False, default=str)
+    yield '{"type":"dict","dictionary":' + dictionary_json + ',"codes":['
+    for start in range(0, len(codes), EXPORT_CHUNK_ROWS):
+        yield (',' if start else '') + ','.join(map(str, codes[start:start + EXPORT_CHUNK_ROWS].tolist()))
+    yield ']}'
+
+
+def iter_columnar_json(df: pd.DataFrame, binary_numeric: bool = False, stats: dict = None):
+    """
+    Потоковая сериализация DataFrame в колоночный JSON payload
+
+    Колонки пишутся фрагментами по EXPORT_CHUNK_ROWS строк: строка всего
+    payload целиком в памяти не собирается.
+
+    Args:
+        df: DataFrame для выгрузки (колонки datetime64 - словарём строк EXPORT_DATE_FORMATS)
+        binary_numeric: Писать числовые колонки как base64 типизированные буферы
+            (колонка остаётся текстом, если base64 на первом фрагменте длиннее)
+        stats: dict, заполняемый по ходу записи в бинарном режиме:
+            {колонка: {'encoding': 'base64' | 'text', 'bytes': записано,
+                       'sample_text_bytes', 'sample_binary_bytes': первый фрагмент
+                       в обоих кодированиях}}
+
+    Yields:
+        фрагменты JSON строки payload
+    """
+    yield '{"format":"columnar","length":' + str(len(df)) + ',"columns":{'
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        yield (',' if i else '') + json.dumps(str(col), ensure_ascii=False) + ':'
+        if not _is_number_column(series):
+            yield from _iter_dict_column(series)
+        elif binary_numeric:
+            yield from _iter_binary_number_column(series, stats)
+        else:
+            yield from _iter_number_column(series)
+    yield '}}'
+
+
+def build_columnar_json(df: pd.DataFrame, binary_numeric: bool = False) -> str:
+    """
+    Сериализует DataFrame в колоночный JSON payload
+
+    Args:
+        df: DataFrame для выгрузки (колонки datetime64 - словарём строк EXPORT_DATE_FORMATS)
+        binary_numeric: Писать числовые колонки как base64 типизированные буферы
+
+    Returns:
+        JSON строка payload
+    """
+    return ''.join(iter_columnar_json(df, binary_numeric=binary_numeric))
+
+
+def iter_records_json(df: pd.DataFrame):
+    """
+    Потоковая сериализация DataFrame в JSON массив записей (NaN -> null)
+
+    Даты переводятся в строки (EXPORT_DATE_FORMATS) по фрагментам
+    EXPORT_CHUNK_ROWS строк, без строковой копии всей колонки.
+
+    Args:
+        df: DataFrame для выгрузки
+
+    Yields:
+        фрагменты JSON строки
+    """
+    date_columns = [col for col in df.columns if _is_date_column(df[col])]
+    yield '['
+    for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXPORT_CHUNK_ROWS]
+        if date_columns:
+            chunk = chunk.assign(**{col: _format_dates(chunk[col]) for col in date_columns})
+        chunk = chunk.where(pd.notnull(chunk), None)
+        yield (',' if start else '') + chunk.to_json(orient='records', force_ascii=False)[1:-1]
+    yield ']'
+
+
+def summarize_binary_stats(stats: dict) -> dict:
+    """
+    Итоги бинарной выгрузки числовых колонок (stats из iter_columnar_json)
+
+    Args:
+        stats: статистика колонок, собранная при записи
+
+    Returns:
+        dict: base64_columns, text_columns, base64_bytes, text_bytes (записано),
+        change_percent - изменение размера base64 против текста на первых
+        фрагментах колонок (None, если числовых колонок нет)
+    """
+    summary = {'base64_columns': 0, 'text_columns': 0, 'base64_bytes': 0, 'text_bytes': 0,
+               'change_percent': None}
+    sample_text = sample_binary = 0
+    for column in stats.values():
+        summary[column['encoding'] + '_columns'] += 1
+        summary[column['encoding'] + '_bytes'] += column['bytes']
+        sample_text += column['sample_text_bytes']
+        sample_binary += column['sample_binary_bytes']
+    if sample_text:
+        summary['change_percent'] = (sample_binary / sample_text - 1) * 100
+    return summary
+
+
+def get_data_store_js() -> str:
+    """
+    Генерирует JS код слоя доступа к данным (DataStore)
+
+    DataStore.load(payload) принимает как колоночный payload, так и обычный
+    массив записей, и возвращает объект с единым API:
+        store.length                 - число строк
+        store.columnNames            - список колонок
+        store.decodeStats            - время разбора колонок payload (колоночный формат; иначе null)
+        store.hasColumn(name)
+        store.kind(name)             - 'number' | 'dict'
+        store.column(name)           - типизированный массив (число) или массив значений
+        store.codes(name)            - Int32Array кодов словаря
+        store.dictionary(name)       - массив уникальных значений словаря
+        store.codeOf(name, value)    - код значения (или -1)
+        store.get(i, name)           - значение ячейки (замена rawData[i][name])
+        store.rows()                 - массив записей (для графиков на старом API)
+
+    Returns:
+        JS код
+    """
+    return '''
+        // ============================================================================
+        // СЛОЙ ДОСТУПА К ДАННЫМ (DataStore)
+        // ============================================================================
+        const DataStore = (function () {
+
+            const TYPED_ARRAYS = {
+                float64: Float64Array,
+                float32: Float32Array,
+                int32: Int32Array
+            };
+
+            /**
+             * base64 -> типизированный массив. Буфер декодируется один раз,
+             * массив - представление поверх него без копирования.
+             */
+            function decodeBase64Column(col) {
+                const binary = atob(col.data);
+                const bytes = new Uint8Array(binary.length);
+                for (let i = 0; i < binary.length; i++) {
+                    bytes[i] = binary.charCodeAt(i);
+                }
+                const TypedArray = TYPED_ARRAYS[col.dtype] || Float64Array;
+                return new TypedArray(bytes.buffer);
+            }
+
+            /**
+             * Хранилище поверх колоночного payload
+             */
+            function fromColumnar(payload) {
+                const length = payload.length;
+                const columnNames = Object.keys(payload.columns);
+                const numbers = {};
+                const codes = {};
+                const dictionaries = {};
+                const decoded = {};
+                const codeIndex = {};
+
+                // Время разбора по способу кодирования колонок, мс
+                const decodeStats = {
+                    base64: { columns: 0, ms: 0 },
+                    text: { columns: 0, ms: 0 },
+                    dict: { columns: 0, ms: 0 },
+                    totalMs: 0
+                };
+                const decodeStart = performance.now();
+                columnNames.forEach(name => {
+                    const col = payload.columns[name];
+                    const start = performance.now();
+                    let kind;
+                    if (col.type === 'number' && col.encoding === 'base64') {
+                        numbers[name] = decodeBase64Column(col);
+                        kind = 'base64';
+                    } else if (col.type === 'number') {
+                        numbers[name] = Float64Array.from(col.values, v => v === null ? NaN : v);
+                        kind = 'text';
+                    } else {
+                        codes[name] = Int32Array.from(col.codes);
+                        dictionaries[name] = col.dictionary;
+                        kind = 'dict';
+                    }
+                    decodeStats[kind].columns++;
+                    decodeStats[kind].ms += performance.now() - start;
+                });
+                decodeStats.totalMs = performance.now() - decodeStart;
+                console.log('📦 DataStore: декодировано колонок', columnNames.length,
+                    'строк', length, 'за', decodeStats.totalMs.toFixed(1), 'мс',
+                    '(числовые base64', decodeStats.base64.columns, '-', decodeStats.base64.ms.toFixed(1),
+                    'мс, текстом', decodeStats.text.columns, '-', decodeStats.text.ms.toFixed(1),
+                    'мс; словари', decodeStats.dict.columns, '-', decodeStats.dict.ms.toFixed(1), 'мс)');
+
+                const store = {
+                    length,
+                    columnNames,
+                    decodeStats,
+                    hasColumn: name => name in numbers || name in codes,
+                    kind: name => name in numbers ? 'number' : 'dict',
+                    codes: name => codes[name] || null,
+                    dictionary: name => dictionaries[name] || [],
+                    codeOf(name, value) {
+                        if (!codeIndex[name]) {
+                            codeIndex[name] = new Map();
+                            (dictionaries[name] || []).forEach((v, i) => codeIndex[name].set(String(v), i));
+                        }
+                        const code = codeIndex[name].get(String(value));
+                        return code === undefined ? -1 : code;
+                    },
+                    column(name) {
+                        if (name in numbers) return numbers[name];
+                        if (!(name in codes)) return null;
+                        if (!decoded[name]) {
+                            const c = codes[name];
+                            const dict = dictionaries[name];
+                            const out = new Array(length);
+                            for (let i = 0; i < length; i++) {
+                                out[i] = c[i] < 0 ? null : dict[c[i]];
+                            }
+                            decoded[name] = out;
+                        }
+                        return decoded[name];
+                    },
+                    get(i, name) {
+                        if (name in numbers) {
+                            const v = numbers[name][i];
+                            return Number.isNaN(v) ? null : v;
+                        }
+                        const c = codes[name];
+                        if (!c || c[i] < 0) return null;
+                        return dictionaries[name][c[i]];
+                    },
+                    rows() {
+                        if (store._rows) return store._rows;
+                        const numberCols = columnNames.filter(n => n in numbers);
+                        const dictCols = columnNames.filter(n => n in codes);
+                        const rows = new Array(length);
+                        for (let i = 0; i < length; i++) {
+                            const row = {};
+                            for (let j = 0; j < columnNames.length; j++) {
+                                const name = columnNames[j];
+                                if (name in numbers) {
+                                    const v = numbers[name][i];
+                                    row[name] = Number.isNaN(v) ? null : v;
+                                } else {
+                                    const c = codes[name][i];
+                                    row[name] = c < 0 ? null : dictionaries[name][c];
+                                }
+                            }
+                            rows[i] = row;
+                        }
+                        store._rows = rows;
+                        return rows;
+                    }
+                };
+                return store;
+            }
+
+            /**
+             * Хранилище поверх массива записей (режим records).
+             * Колонки строятся лениво при первом обращении.
+             */
+            function fromRows(rows) {
+                const length = rows.length;
+                const columnNames = length > 0 ? Object.keys(rows[0]) : [];
+                const numbers = {};
+                const codes = {};
+                const dictionaries = {};
+                const codeIndex = {};
+
+                function build(name) {
+                    if (name in numbers || name in codes) return;
+                    if (!columnNames.includes(name)) return;
+
+                    let sample = null;
+                    for (let i = 0; i < length && sample === null; i++) {
+                        if (rows[i][name] !== null && rows[i][name] !== undefined) sample = rows[i][name];
+                    }
+
+                    if (typeof sample === 'number' || typeof sample === 'boolean') {
+                        const arr = new Float64Array(length);
+                        for (let i = 0; i < length; i++) {
+                            const v = rows[i][name];
+                            arr[i] = v === null || v === undefined ? NaN : +v;
+                        }
+                        numbers[name] = arr;
+                    } else {
+                        const index = new Map();
+                        const dict = [];
+                        const c = new Int32Array(length);
+                        for (let i = 0; i < length; i++) {
+                            const v = rows[i][name];
+                            if (v === null || v === undefined) { c[i] = -1; continue; }
+                            let code = index.get(v);
+                            if (code === undefined) {
+                                code = dict.length;
+                                dict.push(v);
+                                index.set(v, code);
+                            }
+                            c[i] = code;
+                        }
+                        codes[name] = c;
+                        dictionaries[name] = dict;
+                        codeIndex[name] = new Map(dict.map((v, i) => [String(v), i]));
+                    }
+                }
+
+                const store = {
+                    length,
+                    columnNames,
+                    decodeStats: null,
+                    hasColumn: name => columnNames.includes(name),
+                    kind(name) { build(name); return name in numbers ? 'number' : 'dict'; },
+                    codes(name) { build(name); return codes[name] || null; },
+                    dictionary(name) { build(name); return dictionaries[name] || []; },
+                    codeOf(name, value) {
+                        build(name);
+                        const code = codeIndex[name] ? codeIndex[name].get(String(value)) : undefined;
+                        return code === undefined ? -1 : code;
+                    },
+                    column(name) {
+                        build(name);
+                        if (name in numbers) return numbers[name];
+                        if (!(name in codes)) return null;
+                        return rows.map(r => r[name] === undefined ? null : r[name]);
+                    },
+                    get: (i, name) => rows[i][name] === undefined ? null : rows[i][name],
+                    rows: () => rows
+                };
+                return store;
+            }
+
+            function load(payload) {
+                if (Array.isArray(payload)) return fromRows(payload);
+                if (payload && payload.format === 'columnar') return fromColumnar(payload);
+                throw new Error('DataStore: неизвестный формат данных');
+            }
+
+            return { load, fromRows, fromColumnar };
+        })();
+        window.DataStore = DataStore;
+        '''
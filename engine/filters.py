@@ -43,7 +43,9 @@ class GlobalFilters:
             return ['year', 'month']
 
         # Проверить, все ли даты имеют день = 01
-        dates = pd.to_datetime(self.df['Дата'], format='%d.%m.%Y', errors='coerce')
+        dates = self.df['Дата']
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, format='%d.%m.%Y', errors='coerce')
         days = dates.dt.day.dropna()
 
         if len(days) == 0:
@@ -539,108 +541,106 @@ class GlobalFilters:
         }
 
         /**
-         * Парсинг даты из формата DD.MM.YYYY
+         * Считать текущее состояние фильтров из DOM
          */
-        function parseDate(dateStr) {
-            if (!dateStr) return null;
-            const parts = dateStr.split('.');
-            if (parts.length === 3) {
-                return new Date(parts[2], parts[1] - 1, parts[0]);
-            }
-            return null;
-        }
-
-        /**
-         * Применить глобальные фильтры
-         */
-        function applyFilters() {
-            const selectedMagazines = getSelectedValues('filterMagazine');
-            const selectedYears = getSelectedValues('filterYear').map(y => parseInt(y));
-            const selectedMonths = getSelectedValues('filterMonth');
-            const selectedProductTypes = getSelectedValues('filterProductType');
-            const selectedProducts = getSelectedValues('filterProduct');
-
+        function readFilterState() {
             const startDateStr = document.getElementById('startDate')?.value || '';
             const endDateStr = document.getElementById('endDate')?.value || '';
 
-            const startDate = startDateStr ? new Date(startDateStr + 'T00:00:00') : null;
-            const endDate = endDateStr ? new Date(endDateStr + 'T23:59:59') : null;
-
             // Фильтр по площади
             const minAreaEl = document.getElementById('minArea');
             const maxAreaEl = document.getElementById('maxArea');
-            const minArea = minAreaEl ? parseFloat(minAreaEl.value) : 0;
-            const maxArea = maxAreaEl ? parseFloat(maxAreaEl.value) : Infinity;
-            const areaFilterActive = minAreaEl && maxAreaEl &&
-                (minAreaEl.value !== minAreaEl.min || maxAreaEl.value !== maxAreaEl.max);
-
-            // Фильтрация данных
-            window.filteredData = window.rawData.filter(row => {
-                // Фильтр по площади магазина
-                if (areaFilterActive) {
-                    const area = parseFloat(row['Торговая площадь магазина']);
-                    if (isNaN(area) || area < minArea || area > maxArea) {
-                        return false;
-                    }
-                }
-
-                // Фильтр по магазину
-                if (selectedMagazines.length > 0) {
-                    const magazineStr = String(row['Магазин']);
-                    if (!selectedMagazines.includes(magazineStr)) {
-                        return false;
-                    }
-                }
 
-                // Фильтр по году
-                if (selectedYears.length > 0) {
-                    const year = parseInt(row['Год']);
-                    if (!selectedYears.includes(year)) {
-                        return false;
-                    }
-                }
-
-                // Фильтр по месяцу
-                if (selectedMonths.length > 0) {
-                    if (!selectedMonths.includes(row['Месяц'])) {
-                        return false;
-                    }
-                }
-
-                // Фильтр по типу товара
-                if (selectedProductTypes.length > 0) {
-                    if (!selectedProductTypes.includes(row['Тип'])) {
-                        return false;
-                    }
-                }
+            return {
+                magazines: getSelectedValues('filterMagazine'),
+                years: getSelectedValues('filterYear').map(y => parseInt(y)),
+                months: getSelectedValues('filterMonth'),
+                productTypes: getSelectedValues('filterProductType'),
+                products: getSelectedValues('filterProduct'),
+                // Границы периода как целые YYYYMMDD (см. FilterIndex, колонка периода)
+                startDay: startDateStr ? parseInt(startDateStr.replace(/-/g, '')) : null,
+                endDay: endDateStr ? parseInt(endDateStr.replace(/-/g, '')) : null,
+                minArea: minAreaEl ? parseFloat(minAreaEl.value) : 0,
+                maxArea: maxAreaEl ? parseFloat(maxAreaEl.value) : Infinity,
+                areaFilterActive: Boolean(minAreaEl && maxAreaEl &&
+                    (minAreaEl.value !== minAreaEl.min || maxAreaEl.value !== maxAreaEl.max))
+            };
+        }
 
-                // Фильтр по товару
-                if (selectedProducts.length > 0) {
-                    if (!selectedProducts.includes(row['Товар'])) {
-                        return false;
-                    }
-                }
+''' + get_filter_index_js() + '''
+        /**
+         * Индекс строк данных (и куба) строится один раз при первом применении фильтров
+         */
+        function getFilterIndex(kind) {
+            window.filterIndexes = window.filterIndexes || {};
+            if (!window.filterIndexes[kind]) {
+                const store = kind === 'cube' ? window.cubeStore : window.dataStore;
+                if (!store) return null;
+                const buildStart = performance.now();
+                window.filterIndexes[kind] = FilterIndex.create(store);
+                console.log('🗂️ FilterIndex (' + kind + '): ' + store.length + ' строк, ' +
+                    (performance.now() - buildStart).toFixed(1) + ' мс');
+            }
+            return window.filterIndexes[kind];
+        }
 
-                // Фильтр по датам (используем столбец Дата)
-                if (startDate || endDate) {
-                    const rowDate = parseDate(row['Дата']);
-                    if (!rowDate) return false;
+        /**
+         * Применить глобальные фильтры
+         */
+        function applyFilters() {
+            const state = readFilterState();
 
-                    if (startDate && rowDate < startDate) {
-                        return false;
-                    }
-                    if (endDate && rowDate > endDate) {
-                        return false;
-                    }
-                }
+            // Режим Web Worker: фильтрация и агрегации выполняются в воркере,
+            // графики перерисуются в onFiltersApplied по приходу результата
+            if (window.DashboardWorker && DashboardWorker.isActive()) {
+                DashboardWorker.applyFilters(state);
+                return;
+            }
+            applyFilterState(state);
+        }
 
-                return true;
-            });
+        /**
+         * Применить состояние фильтров в основном потоке
+         * (также запасной путь, если Web Worker упал с запросом в работе)
+         *
+         * @param {Object} state - состояние фильтров (readFilterState)
+         */
+        function applyFilterState(state) {
+            // Фильтрация данных по битсетам индекса: пересчитываются только изменённые измерения
+            const dataIndex = getFilterIndex('data');
+            const result = dataIndex.update(state);
+            window.lastAppliedFilterState = state;
+            if (result.changed.length === 0) {
+                console.log('🔍 Фильтры не изменились');
+                updateApplyButtonText();
+                return;
+            }
+            window.filteredData = dataIndex.select(result.bits, window.rawData);
+
+            // Куб Магазин×Год×Месяц×Тип фильтруется теми же условиями,
+            // кроме фильтра по товару - его куб выразить не может
+            window.productFilterActive = state.products.length > 0;
+            const cubeIndex = window.cubeData && !window.productFilterActive ? getFilterIndex('cube') : null;
+            window.filteredCube = cubeIndex
+                ? cubeIndex.select(cubeIndex.update(state).bits, window.cubeData)
+                : null;
+            window.filterVersion = (window.filterVersion || 0) + 1;
+
+            onFiltersApplied(result.changed);
+        }
 
-            console.log('🔍 Отфильтровано записей:', window.filteredData.length);
+        /**
+         * Обновление графиков, KPI и таблиц после применения фильтров
+         *
+         * @param {Array} changed - изменившиеся измерения фильтра
+         */
+        function onFiltersApplied(changed) {
+            window.lastFilterChange = changed;
+            console.log('🔍 Отфильтровано записей:', window.filteredData.length,
+                'изменены измерения:', changed.join(', '));
 
             updateApplyButtonText();
-            updateAllCharts();
+            updateAllCharts(changed);
 
             // Обновить KPI метрики
             if (typeof updateMetricsUI === 'function') {
@@ -901,85 +901,23 @@ class GlobalFilters:
          * Предварительный расчет для кнопки "Применить"
          */
         function updateApplyButtonPreview() {
-            const selectedMagazines = getSelectedValues('filterMagazine');
-            const selectedYears = getSelectedValues('filterYear').map(y => parseInt(y));
-            const selectedMonths = getSelectedValues('filterMonth');
-            const selectedProductTypes = getSelectedValues('filterProductType');
-            const selectedProducts = getSelectedValues('filterProduct');
-
-            const startDateStr = document.getElementById('startDate')?.value || '';
-            const endDateStr = document.getElementById('endDate')?.value || '';
-
-            const startDate = startDateStr ? new Date(startDateStr + 'T00:00:00') : null;
-            const endDate = endDateStr ? new Date(endDateStr + 'T23:59:59') : null;
-
-            // Фильтр по площади
-            const minAreaEl = document.getElementById('minArea');
-            const maxAreaEl = document.getElementById('maxArea');
-            const minArea = minAreaEl ? parseFloat(minAreaEl.value) : 0;
-            const maxArea = maxAreaEl ? parseFloat(maxAreaEl.value) : Infinity;
-            const areaFilterActive = minAreaEl && maxAreaEl &&
-                (minAreaEl.value !== minAreaEl.min || maxAreaEl.value !== maxAreaEl.max);
-
-            const previewData = window.rawData.filter(row => {
-                // Фильтр по площади магазина
-                if (areaFilterActive) {
-                    const area = parseFloat(row['Торговая площадь магазина']);
-                    if (isNaN(area) || area < minArea || area > maxArea) {
-                        return false;
-                    }
-                }
-
-                if (selectedMagazines.length > 0) {
-                    const magazineStr = String(row['Магазин']);
-                    if (!selectedMagazines.includes(magazineStr)) {
-                        return false;
-                    }
-                }
-
-                if (selectedYears.length > 0) {
-                    const year = parseInt(row['Год']);
-                    if (!selectedYears.includes(year)) {
-                        return false;
-                    }
-                }
-
-                if (selectedMonths.length > 0) {
-                    if (!selectedMonths.includes(row['Месяц'])) {
-                        return false;
-                    }
-                }
-
-                if (selectedProductTypes.length > 0) {
-                    if (!selectedProductTypes.includes(row['Тип'])) {
-                        return false;
-                    }
-                }
-
-                if (selectedProducts.length > 0) {
-                    if (!selectedProducts.includes(row['Товар'])) {
-                        return false;
+            if (window.DashboardWorker && DashboardWorker.isActive()) {
+                DashboardWorker.count(readFilterState()).then(previewCount => {
+                    const btnText = document.getElementById('apply-button-text');
+                    if (btnText && previewCount !== null) {
+                        btnText.textContent = `Применить (${previewCount})`;
                     }
-                }
-
-                if (startDate || endDate) {
-                    const rowDate = parseDate(row['Дата']);
-                    if (!rowDate) return false;
-
-                    if (startDate && rowDate < startDate) {
-                        return false;
-                    }
-                    if (endDate && rowDate > endDate) {
-                        return false;
-                    }
-                }
+                }, () => updateApplyButtonPreview());
+                return;
+            }
 
-                return true;
-            });
+            // Только подсчёт битов, без материализации строк
+            const dataIndex = getFilterIndex('data');
+            const previewCount = dataIndex.count(dataIndex.match(readFilterState()));
 
             const btnText = document.getElementById('apply-button-text');
             if (btnText) {
-                btnText.textContent = `Применить (${previewData.length})`;
+                btnText.textContent = `Применить (${previewCount})`;
             }
         }
 
@@ -990,16 +928,10 @@ class GlobalFilters:
             const grouped = {};
 
             data.forEach(row => {
-                const dateStr = row['Дата'];
-                if (!dateStr) return;
+                const d = rowDate(row);
+                if (!d) return;
 
-                const parts = dateStr.split('.');
-                if (parts.length !== 3) return;
-
-                const day = parseInt(parts[0]);
-                const month = parseInt(parts[1]);
-                const year = parseInt(parts[2]);
-                const date = new Date(year, month - 1, day);
+                const { month, year, date } = d;
 
                 let key;
                 switch(level) {
@@ -1014,10 +946,10 @@ class GlobalFilters:
                         key = `Н${weekNum} ${year}`;
                         break;
                     case 'day':
-                        key = dateStr;
+                        key = row['Дата'];
                         break;
                     default:
-                        key = dateStr;
+                        key = row['Дата'];
                 }
 
                 if (!grouped[key]) {
@@ -1046,3 +978,272 @@ class GlobalFilters:
         window.globalDetailLevel = window.globalDetailLevel || 'month';
         window.availableDetailLevels = window.availableDetailLevels || ['year', 'month'];
         '''
+
+
+def get_filter_index_js() -> str:
+    """
+    Генерирует JS код FilterIndex (битсетовые индексы глобальных фильтров)
+
+    Не зависит от DOM: используется и в основном потоке (GlobalFilters.get_js_code),
+    и в Web Worker (engine/worker.py).
+
+    Returns:
+        JS код
+    """
+    return '''
+        /**
+         * Инвертированные индексы для глобальных фильтров.
+         *
+         * Для каждого измерения (Магазин, Год, Месяц, Тип, Товар) один раз строится
+         * индекс значение -> битсет строк (Uint32Array, 1 бит на строку).
+         * Дата один раз разбирается в целочисленную колонку периода YYYYMMDD.
+         * Фильтрация: OR битсетов выбранных значений внутри измерения,
+         * AND между измерениями; строки материализуются только в конце.
+         *
+         * update(state) хранит маску каждого измерения и пересчитывает только
+         * измерения, выбор в которых изменился с прошлого вызова.
+         */
+        const FilterIndex = (function () {
+
+            // Измерение фильтра -> колонка данных
+            const DIMENSION_COLUMNS = {
+                magazines: 'Магазин',
+                years: 'Год',
+                months: 'Месяц',
+                productTypes: 'Тип',
+                products: 'Товар'
+            };
+
+            // Все измерения фильтра (ключи состояния readFilterState и FILTER_DIMENSIONS графиков)
+            const DIMENSIONS = Object.keys(DIMENSION_COLUMNS).concat(['area', 'date']);
+
+            /**
+             * Каноническое значение измерения в состоянии ('' - фильтр не задан)
+             */
+            function dimensionKey(dim, state) {
+                if (dim === 'area') {
+                    return state.areaFilterActive ? state.minArea + ':' + state.maxArea : '';
+                }
+                if (dim === 'date') {
+                    return state.startDay || state.endDay ? (state.startDay || '') + ':' + (state.endDay || '') : '';
+                }
+                return state[dim].length > 0 ? JSON.stringify(state[dim].map(String).sort()) : '';
+            }
+
+            function popcount(word) {
+                word = word - ((word >>> 1) & 0x55555555);
+                word = (word & 0x33333333) + ((word >>> 2) & 0x33333333);
+                return (((word + (word >>> 4)) & 0x0F0F0F0F) * 0x01010101) >>> 24;
+            }
+
+            /**
+             * Разбор 'DD.MM.YYYY' в целое YYYYMMDD (0 - нет даты)
+             */
+            function dayNumber(dateStr) {
+                if (!dateStr) return 0;
+                const parts = String(dateStr).split('.');
+                if (parts.length !== 3) return 0;
+                return parseInt(parts[2]) * 10000 + parseInt(parts[1]) * 100 + parseInt(parts[0]);
+            }
+
+            function create(store) {
+                const length = store.length;
+                const words = (length + 31) >>> 5;
+                const valueIndexes = {};
+                let periodColumn = null;
+
+                function emptyBits() {
+                    return new Uint32Array(words);
+                }
+
+                /**
+                 * Индекс колонки: String(значение) -> битсет (строится при первом обращении)
+                 */
+                function valueIndex(name) {
+                    if (valueIndexes[name]) return valueIndexes[name];
+                    const index = new Map();
+                    if (store.hasColumn(name)) {
+                        const isNumber = store.kind(name) === 'number';
+                        const values = isNumber ? store.column(name) : store.codes(name);
+                        const dict = isNumber ? null : store.dictionary(name);
+                        const byCode = [];
+                        for (let i = 0; i < length; i++) {
+                            const v = values[i];
+                            let bits;
+                            if (isNumber) {
+                                if (Number.isNaN(v)) continue;
+                                const key = String(v);
+                                bits = index.get(key);
+                                if (!bits) {
+                                    bits = emptyBits();
+                                    index.set(key, bits);
+                                }
+                            } else {
+                                if (v < 0) continue;
+                                bits = byCode[v];
+                                if (!bits) {
+                                    bits = byCode[v] = emptyBits();
+                                    index.set(String(dict[v]), bits);
+                                }
+                            }
+                            bits[i >>> 5] |= 1 << (i & 31);
+                        }
+                    }
+                    valueIndexes[name] = index;
+                    return index;
+                }
+
+                /**
+                 * Колонка периода YYYYMMDD: каждая уникальная дата разбирается один раз
+                 */
+                function periods() {
+                    if (periodColumn) return periodColumn;
+                    periodColumn = new Int32Array(length);
+                    if (store.hasColumn('Дата') && store.kind('Дата') === 'dict') {
+                        const codes = store.codes('Дата');
+                        const byCode = store.dictionary('Дата').map(dayNumber);
+                        for (let i = 0; i < length; i++) {
+                            periodColumn[i] = codes[i] < 0 ? 0 : byCode[codes[i]];
+                        }
+                    }
+                    return periodColumn;
+                }
+
+                /**
+                 * OR битсетов выбранных значений измерения
+                 */
+                function unionOf(name, selected) {
+                    const index = valueIndex(name);
+                    const result = emptyBits();
+                    selected.forEach(value => {
+                        const bits = index.get(String(value));
+                        if (!bits) return;
+                        for (let w = 0; w < words; w++) result[w] |= bits[w];
+                    });
+                    return result;
+                }
+
+                function rangeOf(values, test) {
+                    const result = emptyBits();
+                    for (let i = 0; i < length; i++) {
+                        if (test(values[i])) result[i >>> 5] |= 1 << (i & 31);
+                    }
+                    return result;
+                }
+
+                /**
+                 * Маска одного измерения (null - измерение не ограничено)
+                 */
+                function dimensionMask(dim, state) {
+                    if (dimensionKey(dim, state) === '') return null;
+
+                    if (dim === 'area') {
+                        const area = store.hasColumn('Торговая площадь магазина') &&
+                            store.kind('Торговая площадь магазина') === 'number'
+                            ? store.column('Торговая площадь магазина') : new Float64Array(length).fill(NaN);
+                        return rangeOf(area, v => !Number.isNaN(v) && v >= state.minArea && v <= state.maxArea);
+                    }
+
+                    if (dim === 'date') {
+                        const start = state.startDay || 0;
+                        const end = state.endDay || Infinity;
+                        return rangeOf(periods(), v => v > 0 && v >= start && v <= end);
+                    }
+
+                    return unionOf(DIMENSION_COLUMNS[dim], state[dim]);
+                }
+
+                /**
+                 * AND масок (null - фильтры не заданы). Маски не изменяются
+                 */
+                function intersect(masks) {
+                    masks = masks.filter(m => m);
+                    if (masks.length === 0) return null;
+                    const result = masks[0].slice();
+                    for (let m = 1; m < masks.length; m++) {
+                        const mask = masks[m];
+                        for (let w = 0; w < words; w++) result[w] &= mask[w];
+                    }
+                    return result;
+                }
+
+                /**
+                 * Битсет строк, прошедших фильтры (null - фильтры не заданы).
+                 * Без сохранения масок - для предпросмотра
+                 */
+                function match(state) {
+                    return intersect(DIMENSIONS.map(dim => dimensionMask(dim, state)));
+                }
+
+                // Маски и ключи измерений с прошлого update (изначально фильтров нет)
+                const masks = {};
+                const keys = {};
+                DIMENSIONS.forEach(dim => { masks[dim] = null; keys[dim] = ''; });
+
+                /**
+                 * Инкрементальное применение: пересчитываются только изменившиеся измерения
+                 *
+                 * Returns:
+                 *     {bits, changed} - итоговый битсет и список изменившихся измерений
+                 */
+                function update(state) {
+                    const changed = [];
+                    DIMENSIONS.forEach(dim => {
+                        const key = dimensionKey(dim, state);
+                        if (key === keys[dim]) return;
+                        keys[dim] = key;
+                        masks[dim] = dimensionMask(dim, state);
+                        changed.push(dim);
+                    });
+                    return { bits: intersect(DIMENSIONS.map(dim => masks[dim])), changed };
+                }
+
+                function count(bits) {
+                    if (!bits) return length;
+                    let total = 0;
+                    for (let w = 0; w < words; w++) total += popcount(bits[w]);
+                    return total;
+                }
+
+                /**
+                 * Строки rows, отмеченные в битсете (порядок сохраняется)
+                 */
+                function select(bits, rows) {
+                    if (!bits) return rows;
+                    const out = [];
+                    for (let w = 0; w < words; w++) {
+                        let word = bits[w];
+                        while (word !== 0) {
+                            const low = word & -word;
+                            out.push(rows[(w << 5) + 31 - Math.clz32(low)]);
+                            word ^= low;
+                        }
+                    }
+                    return out;
+                }
+
+                /**
+                 * Номера строк, отмеченных в битсете (null - все строки)
+                 */
+                function indices(bits) {
+                    if (!bits) return null;
+                    const out = new Uint32Array(count(bits));
+                    let k = 0;
+                    for (let w = 0; w < words; w++) {
+                        let word = bits[w];
+                        while (word !== 0) {
+                            const low = word & -word;
+                            out[k++] = (w << 5) + 31 - Math.clz32(low);
+                            word ^= low;
+                        }
+                    }
+                    return out;
+                }
+
+                return { length, match, update, count, select, indices, periods };
+            }
+
+            return { create, dayNumber, DIMENSIONS };
+        })();
+        window.FilterIndex = FilterIndex;
+        '''
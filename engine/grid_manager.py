@@ -103,10 +103,16 @@ class GridLayout:
                 js_code += detail_js
                 js_code += "\n"
 
+            # Отрисовка через PlotRenderer (renderPlot_<chart_id>)
+            js_code += chart._generate_render_js()
+
             # Основной код графика
             js_code += chart.get_js_code()
             js_code += "\n"
 
+            # Измерения глобальных фильтров, от которых зависит график
+            js_code += chart._generate_filter_dimensions_js()
+
             # Добавляем JS локальных фильтров
             local_filters_js = chart._generate_local_filters_js()
             if local_filters_js:
@@ -0,0 +1,214 @@
+# PROJECT_ROOT: engine/plot_renderer.py
+"""
+Инкрементальная перерисовка графиков Plotly (JS, выгружается в шаблон один раз)
+
+update<chartId>() графиков строят все трассы заново и раньше вызывали
+Plotly.newPlot: при каждом изменении фильтра или переключателя SVG графика
+удалялся и создавался заново.
+
+PlotRenderer.render(chartId, traces, layout, config) (через renderPlot_<chartId>
+BaseChart) сравнивает новые трассы и layout с прошлой отрисовкой:
+- у трасс стабильные uid (chartId + имя трассы или номер)
+- тот же набор трасс (uid и type), тот же config - Plotly.update только с
+  изменившимися свойствами трасс (restyle) и ключами layout (relayout).
+  Подписи, режим процентов, цвета - дешёвые restyle/relayout без пересоздания
+- иначе (первая отрисовка, другой набор трасс, график очищен Plotly.purge) -
+  Plotly.react с увеличенным layout.datarevision
+- ничего не изменилось - Plotly не вызывается
+
+Сравнение - по сериализованному значению каждого верхнеуровневого свойства,
+снятому до вызова Plotly (Plotly дописывает в переданные объекты, например
+диапазоны осей).
+
+Способ отрисовки (options.backend, см. BaseChart.RENDER_BACKEND): 'webgl' или
+'auto' при числе точек scatter-трасс от options.threshold - трассы 'scatter'
+рисуются как 'scattergl' (WebGL). Подсказки, hovertemplate и подписи
+(mode 'markers+text') scattergl поддерживает так же. Остаются SVG трассы
+со сглаженной линией (line.shape 'spline' - в WebGL её нет) и весь график,
+если браузер не даёт контекст WebGL. Смена способа меняет тип трасс -
+график перестраивается через Plotly.react.
+"""
+
+
+def get_plot_renderer_js() -> str:
+    """
+    Генерирует JS код инкрементальной отрисовки (PlotRenderer)
+
+    API:
+        PlotRenderer.render(chartId, traces, layout, config, options) - отрисовка;
+            options - {backend: 'svg' | 'webgl' | 'auto', threshold: число точек};
+            возвращает способ: 'react' | 'update' | 'restyle' | 'relayout' | 'none'
+        PlotRenderer.reset(chartId) - забыть прошлую отрисовку (следующая - react)
+        PlotRenderer.stats()        - число отрисовок каждым способом
+
+    Returns:
+        JS код
+    """
+    return '''
+        // ============================================================================
+        // ИНКРЕМЕНТАЛЬНАЯ ОТРИСОВКА PLOTLY (react / restyle / relayout по разнице)
+        // ============================================================================
+        const PlotRenderer = (function () {
+
+            // chartId -> {uids, types, traceKeys: [{ключ: подпись}], layoutKeys, config, revision}
+            const states = new Map();
+            const counters = { react: 0, update: 0, restyle: 0, relayout: 0, none: 0 };
+
+            function signature(value) {
+                return value === undefined ? undefined : JSON.stringify(value);
+            }
+
+            function signatures(object) {
+                const result = {};
+                Object.keys(object || {}).forEach(key => {
+                    if (key !== 'datarevision') result[key] = signature(object[key]);
+                });
+                return result;
+            }
+
+            /**
+             * Стабильные uid: имя трассы (повторы - с номером) или позиция
+             */
+            function assignUids(chartId, traces) {
+                const seen = {};
+                traces.forEach((trace, i) => {
+                    if (trace.uid) return;
+                    const base = trace.name !== undefined && trace.name !== '' ? 'n:' + trace.name : 'i:' + i;
+                    seen[base] = (seen[base] || 0) + 1;
+                    trace.uid = chartId + '/' + base + (seen[base] > 1 ? '#' + seen[base] : '');
+                });
+            }
+
+            let webglSupported = null;
+
+            function hasWebGL() {
+                if (webglSupported === null) {
+                    try {
+                        const canvas = document.createElement('canvas');
+                        webglSupported = Boolean(window.WebGLRenderingContext &&
+                            (canvas.getContext('webgl') || canvas.getContext('experimental-webgl')));
+                    } catch (e) {
+                        webglSupported = false;
+                    }
+                }
+                return webglSupported;
+            }
+
+            function pointCount(trace) {
+                const values = trace && (trace.x || trace.y || trace.values || trace.z);
+                return values && values.length ? values.length : 0;
+            }
+
+            /**
+             * scatter -> scattergl по способу отрисовки графика
+             */
+            function applyBackend(traces, options) {
+                const backend = options && options.backend;
+                if (!backend || backend === 'svg') return;
+
+                const convertible = traces.filter(t =>
+                    (t.type === undefined || t.type === 'scatter') && !(t.line && t.line.shape === 'spline'));
+                if (convertible.length === 0 || !hasWebGL()) return;
+
+                const points = convertible.reduce((sum, t) => sum + pointCount(t), 0);
+                if (backend === 'auto' && points < options.threshold) return;
+                convertible.forEach(t => { t.type = 'scattergl'; });
+            }
+
+            function changedKeys(previous, current) {
+                const keys = new Set(Object.keys(previous).concat(Object.keys(current)));
+                return Array.from(keys).filter(key => previous[key] !== current[key]);
+            }
+
+            function sameStructure(state, uids, types, configKey) {
+                return state.config === configKey &&
+                    state.uids.length === uids.length &&
+                    state.uids.every((uid, i) => uid === uids[i] && state.types[i] === types[i]);
+            }
+
+            function render(chartId, traces, layout, config, options) {
+                const gd = document.getElementById(chartId);
+                if (!gd) return 'none';
+                traces = traces || [];
+                layout = layout || {};
+
+                applyBackend(traces, options);
+                assignUids(chartId, traces);
+                // Точки графика для профилировщика - при любом способе отрисовки ниже
+                if (window.PerfProfiler) {
+                    PerfProfiler.emitted(traces.reduce((sum, t) => sum + pointCount(t), 0));
+                }
+                const uids = traces.map(t => t.uid);
+                const types = traces.map(t => t.type || 'scatter');
+                const traceKeys = traces.map(signatures);
+                const layoutKeys = signatures(layout);
+                const configKey = signature(config || {});
+
+                const state = states.get(chartId);
+                // Plotly.purge удаляет _fullLayout: график нужно построить заново
+                const drawn = state && gd._fullLayout && gd.data;
+
+                if (!drawn || !sameStructure(state, uids, types, configKey)) {
+                    const revision = (state ? state.revision : 0) + 1;
+                    if (!drawn) {
+                        // Сообщение 'нет данных', оставленное в контейнере после purge
+                        Plotly.purge(gd);
+                        gd.innerHTML = '';
+                    }
+                    if (layout.datarevision === undefined) layout.datarevision = revision;
+                    Plotly.react(gd, traces, layout, config);
+                    states.set(chartId, { uids, types, traceKeys, layoutKeys, config: configKey, revision });
+                    counters.react++;
+                    return 'react';
+                }
+
+                // Изменившиеся свойства трасс: {свойство: [значение по каждой трассе indices]}
+                const traceUpdate = {};
+                const indices = [];
+                traces.forEach((trace, i) => {
+                    const keys = changedKeys(state.traceKeys[i], traceKeys[i]);
+                    if (keys.length === 0) return;
+                    indices.push(i);
+                    keys.forEach(key => { traceUpdate[key] = traceUpdate[key] || []; });
+                });
+                Object.keys(traceUpdate).forEach(key => {
+                    traceUpdate[key] = indices.map(i => traces[i][key] === undefined ? null : traces[i][key]);
+                });
+
+                const layoutUpdate = {};
+                changedKeys(state.layoutKeys, layoutKeys).forEach(key => {
+                    layoutUpdate[key] = layout[key] === undefined ? null : layout[key];
+                });
+
+                state.traceKeys = traceKeys;
+                state.layoutKeys = layoutKeys;
+
+                const hasTraces = indices.length > 0;
+                const hasLayout = Object.keys(layoutUpdate).length > 0;
+                let method = 'none';
+                if (hasTraces && hasLayout) {
+                    Plotly.update(gd, traceUpdate, layoutUpdate, indices);
+                    method = 'update';
+                } else if (hasTraces) {
+                    Plotly.restyle(gd, traceUpdate, indices);
+                    method = 'restyle';
+                } else if (hasLayout) {
+                    Plotly.relayout(gd, layoutUpdate);
+                    method = 'relayout';
+                }
+                counters[method]++;
+                return method;
+            }
+
+            function reset(chartId) {
+                states.delete(chartId);
+            }
+
+            function stats() {
+                return Object.assign({}, counters);
+            }
+
+            return { render, reset, stats };
+        })();
+        window.PlotRenderer = PlotRenderer;
+'''
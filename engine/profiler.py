@@ -0,0 +1,340 @@
+# PROJECT_ROOT: engine/profiler.py
+"""
+Профилирование обновлений графиков в браузере (JS, DashboardEngine(profile=True))
+
+После applyFilters() или switchTab не видно, какой update<chartId>() медленный.
+PerfProfiler оборачивает функции дашборда и замеряет каждый вызов через
+performance.mark / performance.measure (замеры видны и в DevTools Performance):
+- фильтры: applyFilters, onFiltersApplied, switchTab
+- графики: update<chartId>, getTableData_<chartId>
+- отрисовка: Plotly.newPlot / react / restyle / relayout / update - время
+  приписывается графику, внутри update которого вызвана отрисовка
+
+Вызовы вложены (applyFilters -> onFiltersApplied -> update<chartId>), поэтому
+у каждого замера есть полное время и собственное (без вложенных замеров):
+собственное время applyFilters - это проход фильтрации.
+
+По каждому вызову графика считаются строки:
+- rowsIn - отфильтрованных строк на входе (window.filteredData)
+- rowsScanned - строк, прочитанных агрегациями (groupBy при промахе кэша)
+- rowsOut - точек в трассах, переданных PlotRenderer.render (update; при любом
+  способе отрисовки, в т.ч. restyle или без вызова Plotly), или строк таблицы
+  (getTableData)
+
+Функции графиков ленивых вкладок появляются после activateTab - они
+оборачиваются сразу после загрузки вкладки.
+
+Итоги - в небольшой панели в углу страницы, выгрузка - JSON (кнопка панели
+или PerfProfiler.exportJSON()).
+"""
+import json
+
+
+def get_profiler_js(chart_ids: list) -> str:
+    """
+    Генерирует JS код профилировщика (PerfProfiler) и панели результатов
+
+    API:
+        PerfProfiler.entries()     - все замеры [{kind, name, chartId, start, duration,
+                                     self, render, rowsIn, rowsScanned, rowsOut}]
+        PerfProfiler.summary()     - итоги по функциям (вызовы, среднее, максимум, ...)
+        PerfProfiler.exportJSON()  - скачать замеры и итоги JSON файлом
+        PerfProfiler.clear()
+        PerfProfiler.scanned(n)    - учесть n прочитанных строк (вызывает groupBy)
+        PerfProfiler.emitted(n)    - учесть n точек в трассах (вызывает PlotRenderer.render)
+
+    Args:
+        chart_ids: ID графиков дашборда (функции update<id> и getTableData_<id>)
+
+    Returns:
+        JS код
+    """
+    return '''
+        // ============================================================================
+        // ПРОФИЛИРОВАНИЕ ОБНОВЛЕНИЙ ГРАФИКОВ (performance.mark / measure)
+        // ============================================================================
+        const PerfProfiler = (function () {
+
+            const CHART_IDS = ''' + json.dumps(chart_ids) + ''';
+
+            // Замеров в журнале (старые вытесняются)
+            const MAX_ENTRIES = 5000;
+
+            const PLOTLY_METHODS = ['newPlot', 'react', 'restyle', 'relayout', 'update'];
+
+            const log = [];
+            const stack = [];
+            const wrapped = new Set();
+            let panel = null;
+            let renderScheduled = false;
+
+            function now() {
+                return performance.now();
+            }
+
+            function filteredRows() {
+                const rows = window.filteredData || window.rawData;
+                return rows ? rows.length : 0;
+            }
+
+            /**
+             * Выполнить fn как замер: метки performance, вложенность, строки
+             */
+            function measure(kind, name, chartId, fn, self, args) {
+                const frame = {
+                    kind, name, chartId,
+                    start: now(), duration: 0, self: 0, render: 0, children: 0,
+                    rowsIn: chartId ? filteredRows() : null, rowsScanned: 0, rowsOut: null
+                };
+                const markName = 'perf:' + name + ':' + log.length;
+                performance.mark(markName);
+                stack.push(frame);
+                try {
+                    const result = fn.apply(self, args);
+                    if (kind === 'table' && Array.isArray(result)) frame.rowsOut = result.length;
+                    return result;
+                } finally {
+                    stack.pop();
+                    frame.duration = now() - frame.start;
+                    frame.self = frame.duration - frame.children;
+                    try {
+                        performance.measure('perf:' + name, markName);
+                    } catch (e) { /* метка очищена извне */ }
+                    performance.clearMarks(markName);
+
+                    const parent = stack[stack.length - 1];
+                    if (parent) {
+                        parent.children += frame.duration;
+                        parent.rowsScanned += frame.rowsScanned;
+                    }
+                    delete frame.children;
+                    record(frame);
+                }
+            }
+
+            function record(frame) {
+                log.push(frame);
+                if (log.length > MAX_ENTRIES) log.splice(0, log.length - MAX_ENTRIES);
+                scheduleRender();
+            }
+
+            /**
+             * Заменить window[name] обёрткой (глобальные функции скриптов - свойства window)
+             */
+            function wrapGlobal(name, kind, chartId) {
+                const original = window[name];
+                if (typeof original !== 'function' || wrapped.has(name)) return;
+                wrapped.add(name);
+                window[name] = function () {
+                    return measure(kind, name, chartId, original, this, arguments);
+                };
+            }
+
+            function wrapCharts() {
+                CHART_IDS.forEach(chartId => {
+                    wrapGlobal('update' + chartId, 'chart', chartId);
+                    wrapGlobal('getTableData_' + chartId, 'table', chartId);
+                });
+            }
+
+            /**
+             * Время отрисовки Plotly (синхронная часть) - графику текущего замера
+             */
+            function wrapPlotly() {
+                if (!window.Plotly) return;
+                PLOTLY_METHODS.forEach(method => {
+                    const original = Plotly[method];
+                    if (typeof original !== 'function') return;
+                    Plotly[method] = function (gd) {
+                        const start = now();
+                        const result = original.apply(this, arguments);
+                        const elapsed = now() - start;
+                        const frame = stack[stack.length - 1];
+                        if (frame) {
+                            frame.render += elapsed;
+                        } else {
+                            const id = typeof gd === 'string' ? gd : (gd && gd.id) || '';
+                            record({
+                                kind: 'render', name: 'Plotly.' + method, chartId: id || null,
+                                start, duration: elapsed, self: elapsed, render: elapsed,
+                                rowsIn: null, rowsScanned: 0, rowsOut: null
+                            });
+                        }
+                        return result;
+                    };
+                });
+            }
+
+            /**
+             * Строки, прочитанные агрегацией (вызывается из groupBy)
+             */
+            function scanned(count) {
+                const frame = stack[stack.length - 1];
+                if (frame) frame.rowsScanned += count;
+            }
+
+            /**
+             * Точки в трассах отрисовки (вызывается из PlotRenderer.render
+             * при любом способе: react, update, restyle, relayout или без Plotly)
+             */
+            function emitted(count) {
+                const frame = stack[stack.length - 1];
+                if (frame) frame.rowsOut = (frame.rowsOut || 0) + count;
+            }
+
+            function summary() {
+                const groups = new Map();
+                log.forEach(entry => {
+                    let group = groups.get(entry.name);
+                    if (!group) {
+                        group = {
+                            name: entry.name, kind: entry.kind, chartId: entry.chartId,
+                            calls: 0, total: 0, self: 0, max: 0, last: 0, render: 0,
+                            rowsIn: null, rowsScanned: 0, rowsOut: null
+                        };
+                        groups.set(entry.name, group);
+                    }
+                    group.calls++;
+                    group.total += entry.duration;
+                    group.self += entry.self;
+                    group.render += entry.render;
+                    group.max = Math.max(group.max, entry.duration);
+                    group.last = entry.duration;
+                    group.rowsIn = entry.rowsIn;
+                    group.rowsScanned = entry.rowsScanned;
+                    group.rowsOut = entry.rowsOut;
+                });
+                return Array.from(groups.values())
+                    .map(group => Object.assign(group, { avg: group.total / group.calls }))
+                    .sort((a, b) => b.total - a.total);
+            }
+
+            function entries() {
+                return log.slice();
+            }
+
+            function clear() {
+                log.length = 0;
+                performance.clearMeasures();
+                scheduleRender();
+            }
+
+            function exportJSON() {
+                const payload = {
+                    created: new Date().toISOString(),
+                    userAgent: navigator.userAgent,
+                    rawRows: window.rawData ? window.rawData.length : 0,
+                    filteredRows: filteredRows(),
+                    summary: summary(),
+                    entries: entries()
+                };
+                const blob = new Blob([JSON.stringify(payload, null, 2)], { type: 'application/json' });
+                const link = document.createElement('a');
+                link.href = URL.createObjectURL(blob);
+                link.download = 'dashboard_profile_' + Date.now() + '.json';
+                document.body.appendChild(link);
+                link.click();
+                document.body.removeChild(link);
+                setTimeout(() => URL.revokeObjectURL(link.href), 1000);
+            }
+
+            // ---------------------------------------------------------------- панель
+
+            function ms(value) {
+                return value.toFixed(1);
+            }
+
+            function rows(value) {
+                return value === null || value === undefined ? '-' : value.toLocaleString('ru-RU');
+            }
+
+            function createPanel() {
+                const style = document.createElement('style');
+                style.textContent = `
+                    .perf-overlay { position: fixed; right: 12px; bottom: 12px; z-index: 10000;
+                        max-width: 760px; max-height: 45vh; overflow: auto; background: rgba(33, 37, 41, 0.92);
+                        color: #f8f9fa; font: 11px/1.4 monospace; border-radius: 6px; box-shadow: 0 2px 10px rgba(0,0,0,0.3); }
+                    .perf-overlay-header { display: flex; gap: 6px; align-items: center; padding: 6px 8px;
+                        position: sticky; top: 0; background: #212529; }
+                    .perf-overlay-header strong { flex: 1; }
+                    .perf-overlay button { background: #495057; color: #f8f9fa; border: none; border-radius: 3px;
+                        padding: 2px 6px; cursor: pointer; font: inherit; }
+                    .perf-overlay table { border-collapse: collapse; width: 100%; }
+                    .perf-overlay th, .perf-overlay td { padding: 2px 6px; text-align: right; white-space: nowrap; }
+                    .perf-overlay th:first-child, .perf-overlay td:first-child { text-align: left; }
+                    .perf-overlay.collapsed table { display: none; }
+                `;
+                document.head.appendChild(style);
+
+                panel = document.createElement('div');
+                panel.className = 'perf-overlay';
+                panel.innerHTML = `
+                    <div class="perf-overlay-header">
+                        <strong>⏱ Профилирование</strong>
+                        <button data-perf="json" title="Скачать замеры JSON">JSON</button>
+                        <button data-perf="clear" title="Очистить замеры">Очистить</button>
+                        <button data-perf="toggle" title="Свернуть">–</button>
+                    </div>
+                    <table>
+                        <thead><tr>
+                            <th>Функция</th><th>Вызовов</th><th>Посл., мс</th><th>Ср., мс</th>
+                            <th>Макс., мс</th><th>Своё, мс</th><th>Plotly, мс</th>
+                            <th>Строк: вход / скан / выход</th>
+                        </tr></thead>
+                        <tbody></tbody>
+                    </table>`;
+                panel.addEventListener('click', e => {
+                    const action = e.target.dataset && e.target.dataset.perf;
+                    if (action === 'json') exportJSON();
+                    if (action === 'clear') clear();
+                    if (action === 'toggle') panel.classList.toggle('collapsed');
+                });
+                document.body.appendChild(panel);
+            }
+
+            function scheduleRender() {
+                if (renderScheduled) return;
+                renderScheduled = true;
+                requestAnimationFrame(renderPanel);
+            }
+
+            function renderPanel() {
+                renderScheduled = false;
+                if (!document.body) return;
+                if (!panel) createPanel();
+                panel.querySelector('tbody').innerHTML = summary().map(group => `
+                    <tr>
+                        <td>${group.name}</td><td>${group.calls}</td><td>${ms(group.last)}</td>
+                        <td>${ms(group.avg)}</td><td>${ms(group.max)}</td>
+                        <td>${ms(group.self / group.calls)}</td><td>${ms(group.render / group.calls)}</td>
+                        <td>${rows(group.rowsIn)} / ${rows(group.rowsScanned)} / ${rows(group.rowsOut)}</td>
+                    </tr>`).join('');
+            }
+
+            // ---------------------------------------------------------------- установка
+
+            function install() {
+                wrapGlobal('applyFilters', 'filters', null);
+                wrapGlobal('onFiltersApplied', 'filters', null);
+                wrapGlobal('switchTab', 'tab', null);
+                wrapCharts();
+                wrapPlotly();
+
+                // Функции графиков ленивой вкладки определяются при её загрузке
+                const activateTab = window.activateTab;
+                if (typeof activateTab === 'function') {
+                    window.activateTab = function () {
+                        const result = activateTab.apply(this, arguments);
+                        wrapCharts();
+                        return result;
+                    };
+                }
+                scheduleRender();
+            }
+
+            install();
+
+            return { entries, summary, exportJSON, clear, scanned, emitted, wrapCharts };
+        })();
+        window.PerfProfiler = PerfProfiler;
+'''
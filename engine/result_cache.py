@@ -0,0 +1,185 @@
+# PROJECT_ROOT: engine/result_cache.py
+"""
+Общий кэш результатов тяжёлых расчётов графиков (JS, выгружается в шаблон один раз)
+
+DEA, кластеризация и регрессия пересчитывались при каждом update графика,
+хотя их результат зависит только от набора строк после фильтров и параметров
+графика. ResultCache хранит результаты по ключу
+
+    <канонический ключ фильтров>#<график>#<JSON параметров>
+
+с вытеснением давно не использованных записей (LRU, MAX_ENTRIES).
+Записи предрасчёта (seed) хранятся отдельно и не вытесняются: их число
+задаёт число срезов и графиков, а не MAX_ENTRIES.
+
+Канонический ключ фильтров (filterKey): магазины, типы и товары - отсортированные
+списки, площадь - границы (если фильтр включён). Годы, месяцы и диапазон дат
+сводятся к набору дат данных, которые они выбирают, - поэтому стартовый
+диапазон 'этот год' и фильтр по тому же году дают один ключ.
+
+Для типовых срезов (каждый год, последние 365 дней, каждый тип товара) Python
+считает результаты заранее (engine/analytics/slices.py) - они встраиваются
+через ResultCache.seed и не вычисляются в браузере вовсе.
+"""
+import json
+
+
+def get_result_cache_js(precomputed: dict = None) -> str:
+    """
+    Генерирует JS код кэша результатов (ResultCache)
+
+    API:
+        ResultCache.get(namespace, params, compute) - результат из кэша или compute()
+        ResultCache.seed(entries)   - записи {ключ: результат} (предрасчёт Python)
+        ResultCache.keyOf(namespace, params, state) - ключ результата
+        ResultCache.filterKey(state) - канонический ключ фильтров
+            (по умолчанию window.lastAppliedFilterState)
+        ResultCache.stats()         - {hits, misses, seeded, evictions, size}
+        ResultCache.clear()         - сброс вычисленных записей (предрасчёт остаётся)
+
+    Args:
+        precomputed: {ключ: результат} из precompute_slice_results (None - без предрасчёта)
+
+    Returns:
+        JS код
+    """
+    seed_js = ''
+    if precomputed:
+        # '</' внутри JSON закрыл бы тег <script>
+        payload = json.dumps(precomputed, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+        seed_js = f'ResultCache.seed({payload});'
+
+    return '''
+        // ============================================================================
+        // КЭШ РЕЗУЛЬТАТОВ РАСЧЁТОВ ГРАФИКОВ (LRU по ключу фильтров и параметров)
+        // ============================================================================
+        const ResultCache = (function () {
+
+            // Вычисленных записей в кэше (результаты DEA / кластеров по магазинам - десятки KB)
+            const MAX_ENTRIES = 128;
+
+            // Map сохраняет порядок вставки: первая запись - давно не использованная
+            const entries = new Map();
+            // Предрасчёт Python (seed): вне LRU, иначе большой seed вытеснял бы сам себя
+            const seeded = new Map();
+            const counters = { hits: 0, misses: 0, seeded: 0, evictions: 0 };
+
+            // Календарь дат данных: [{day, year, month}] по возрастанию day
+            let calendar = null;
+
+            function getCalendar() {
+                if (calendar) return calendar;
+                const rows = window.rawData || [];
+                const byDay = new Map();
+                for (let i = 0; i < rows.length; i++) {
+                    const row = rows[i];
+                    const day = FilterIndex.dayNumber(row['Дата']);
+                    if (!day || byDay.has(day)) continue;
+                    byDay.set(day, { day, year: parseInt(row['Год']), month: String(row['Месяц']) });
+                }
+                calendar = Array.from(byDay.values()).sort((a, b) => a.day - b.day);
+                return calendar;
+            }
+
+            /**
+             * Ключ набора дат: диапазоны подряд идущих выбранных дат ('' - выбраны все)
+             */
+            function periodKey(state) {
+                const years = state.years || [];
+                const months = (state.months || []).map(String);
+                const start = state.startDay || 0;
+                const end = state.endDay || 0;
+                const days = getCalendar();
+
+                const ranges = [];
+                let first = null;
+                let last = null;
+                let all = true;
+                days.forEach(entry => {
+                    const matched = (years.length === 0 || years.includes(entry.year)) &&
+                        (months.length === 0 || months.includes(entry.month)) &&
+                        entry.day >= start && (!end || entry.day <= end);
+                    if (matched) {
+                        if (first === null) first = entry.day;
+                        last = entry.day;
+                    } else {
+                        all = false;
+                        if (first !== null) ranges.push(first + '-' + last);
+                        first = null;
+                    }
+                });
+                if (all) return '';
+                if (first !== null) ranges.push(first + '-' + last);
+                return ranges.join(',') || 'none';
+            }
+
+            function listKey(values) {
+                if (!values || values.length === 0) return '';
+                return JSON.stringify(values.map(String).sort());
+            }
+
+            function filterKey(state) {
+                state = state || window.lastAppliedFilterState || {};
+                const area = state.areaFilterActive ? state.minArea + ':' + state.maxArea : '';
+                return [
+                    listKey(state.magazines),
+                    listKey(state.productTypes),
+                    listKey(state.products),
+                    area,
+                    periodKey(state)
+                ].join('|');
+            }
+
+            function keyOf(namespace, params, state) {
+                return filterKey(state) + '#' + namespace + '#' + JSON.stringify(params);
+            }
+
+            function store(key, value) {
+                entries.delete(key);
+                entries.set(key, value);
+                while (entries.size > MAX_ENTRIES) {
+                    entries.delete(entries.keys().next().value);
+                    counters.evictions++;
+                }
+            }
+
+            /**
+             * Результат для текущих фильтров: из кэша или compute() с сохранением
+             */
+            function get(namespace, params, compute) {
+                const key = keyOf(namespace, params);
+                if (seeded.has(key)) {
+                    counters.hits++;
+                    return seeded.get(key);
+                }
+                if (entries.has(key)) {
+                    const value = entries.get(key);
+                    store(key, value);  // в конец очереди LRU
+                    counters.hits++;
+                    return value;
+                }
+                counters.misses++;
+                const value = compute();
+                store(key, value);
+                return value;
+            }
+
+            function seed(values) {
+                Object.keys(values || {}).forEach(key => {
+                    seeded.set(key, values[key]);
+                    counters.seeded++;
+                });
+            }
+
+            function stats() {
+                return Object.assign({ size: entries.size + seeded.size }, counters);
+            }
+
+            function clear() {
+                entries.clear();
+            }
+
+            return { get, seed, keyOf, filterKey, stats, clear, MAX_ENTRIES };
+        })();
+        window.ResultCache = ResultCache;
+''' + seed_js + '\n'
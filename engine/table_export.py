@@ -0,0 +1,194 @@
+# PROJECT_ROOT: engine/table_export.py
+"""
+Потоковая выгрузка таблиц графиков в CSV и Excel (JS, выгружается в шаблон один раз)
+
+Раньше exportTableToCSV_* / exportTableToExcel_* собирали весь файл одной
+строкой за один синхронный проход: на многолетней таблице по товарам вкладка
+зависала, а строка в сотни мегабайт упиралась в лимиты памяти.
+
+TableExport обрабатывает строки порциями по CHUNK_ROWS:
+- CSV: каждая порция - отдельная часть Blob (итоговая строка не собирается)
+- Excel: колонки сначала переводятся в типизированные массивы (Float64Array
+  для числовых), затем лист SheetJS дописывается порциями (sheet_add_aoa).
+  Без SheetJS (нет сети) - HTML-таблица .xls, тоже частями Blob
+Между порциями управление возвращается браузеру, на кнопке выгрузки
+показывается прогресс.
+"""
+
+
+def get_table_export_js() -> str:
+    """
+    Генерирует JS код потоковой выгрузки таблиц (TableExport)
+
+    API:
+        TableExport.toCSV(rows, options)    - Promise, CSV файл
+        TableExport.toExcel(rows, options)  - Promise, .xlsx (SheetJS) или .xls
+            rows             - массив строк-объектов (в порядке выгрузки)
+            options.columns  - колонки (по умолчанию Object.keys(rows[0]))
+            options.fileName - имя файла без расширения
+            options.button   - кнопка, на которой показывается прогресс
+
+    Returns:
+        JS код
+    """
+    return '''
+        // ============================================================================
+        // ПОТОКОВАЯ ВЫГРУЗКА ТАБЛИЦ (CSV / Excel порциями)
+        // ============================================================================
+        const TableExport = (function () {
+
+            // Строк в одной порции (между порциями браузер обрабатывает события)
+            const CHUNK_ROWS = 5000;
+
+            function nextFrame() {
+                return new Promise(resolve => setTimeout(resolve, 0));
+            }
+
+            function download(blob, fileName) {
+                const link = document.createElement('a');
+                link.href = URL.createObjectURL(blob);
+                link.download = fileName;
+                link.click();
+                setTimeout(() => URL.revokeObjectURL(link.href), 10000);
+            }
+
+            /**
+             * Прогресс на кнопке выгрузки; повторный запуск, пока идёт выгрузка, игнорируется
+             */
+            function startProgress(button) {
+                if (!button) return { update() {}, done() {}, busy: false };
+                if (button.dataset.exporting) return { busy: true };
+                const label = button.textContent;
+                button.dataset.exporting = '1';
+                button.disabled = true;
+                return {
+                    busy: false,
+                    update(done, total) {
+                        button.textContent = '⏳ ' + Math.floor(done / Math.max(total, 1) * 100) + '%';
+                    },
+                    done() {
+                        button.textContent = label;
+                        button.disabled = false;
+                        delete button.dataset.exporting;
+                    }
+                };
+            }
+
+            function csvValue(value) {
+                if (value === null || value === undefined) return '';
+                const text = String(value);
+                return /[",\\n\\r]/.test(text) ? '"' + text.replace(/"/g, '""') + '"' : text;
+            }
+
+            async function toCSV(rows, options) {
+                options = options || {};
+                if (!rows || rows.length === 0) return;
+                const progress = startProgress(options.button);
+                if (progress.busy) return;
+
+                try {
+                    const columns = options.columns || Object.keys(rows[0]);
+                    const parts = [columns.map(csvValue).join(',') + '\\n'];
+
+                    for (let start = 0; start < rows.length; start += CHUNK_ROWS) {
+                        const end = Math.min(rows.length, start + CHUNK_ROWS);
+                        const lines = new Array(end - start);
+                        for (let i = start; i < end; i++) {
+                            const row = rows[i];
+                            lines[i - start] = columns.map(col => csvValue(row[col])).join(',');
+                        }
+                        parts.push(lines.join('\\n') + '\\n');
+                        progress.update(end, rows.length);
+                        await nextFrame();
+                    }
+
+                    download(new Blob(parts, { type: 'text/csv;charset=utf-8;' }), (options.fileName || 'table') + '.csv');
+                } finally {
+                    progress.done();
+                }
+            }
+
+            /**
+             * Колонки таблицы как массивы: числовые - Float64Array (NaN - пусто), остальные - обычные
+             */
+            function columnArrays(rows, columns) {
+                return columns.map(col => {
+                    const numeric = rows.every(row => {
+                        const v = row[col];
+                        return typeof v === 'number' || v === null || v === undefined;
+                    });
+                    if (!numeric) return rows.map(row => row[col]);
+                    const values = new Float64Array(rows.length);
+                    for (let i = 0; i < rows.length; i++) {
+                        const v = rows[i][col];
+                        values[i] = typeof v === 'number' ? v : NaN;
+                    }
+                    return values;
+                });
+            }
+
+            function cellValue(arrays, j, i) {
+                const v = arrays[j][i];
+                if (typeof v === 'number' && v !== v) return null;
+                return v === undefined ? null : v;
+            }
+
+            async function toExcel(rows, options) {
+                options = options || {};
+                if (!rows || rows.length === 0) return;
+                const progress = startProgress(options.button);
+                if (progress.busy) return;
+
+                try {
+                    const columns = options.columns || Object.keys(rows[0]);
+                    const arrays = columnArrays(rows, columns);
+                    const fileName = options.fileName || 'table';
+
+                    if (window.XLSX) {
+                        const sheet = XLSX.utils.aoa_to_sheet([columns]);
+                        for (let start = 0; start < rows.length; start += CHUNK_ROWS) {
+                            const end = Math.min(rows.length, start + CHUNK_ROWS);
+                            const chunk = new Array(end - start);
+                            for (let i = start; i < end; i++) {
+                                const line = new Array(columns.length);
+                                for (let j = 0; j < columns.length; j++) line[j] = cellValue(arrays, j, i);
+                                chunk[i - start] = line;
+                            }
+                            XLSX.utils.sheet_add_aoa(sheet, chunk, { origin: -1 });
+                            progress.update(end, rows.length);
+                            await nextFrame();
+                        }
+                        const book = XLSX.utils.book_new();
+                        XLSX.utils.book_append_sheet(book, sheet, 'Данные');
+                        XLSX.writeFile(book, fileName + '.xlsx', { compression: true });
+                        return;
+                    }
+
+                    // SheetJS недоступен - HTML-таблица, которую открывает Excel
+                    const parts = ['<table><tr>' + columns.map(col => '<th>' + col + '</th>').join('') + '</tr>'];
+                    for (let start = 0; start < rows.length; start += CHUNK_ROWS) {
+                        const end = Math.min(rows.length, start + CHUNK_ROWS);
+                        const lines = new Array(end - start);
+                        for (let i = start; i < end; i++) {
+                            let line = '<tr>';
+                            for (let j = 0; j < columns.length; j++) {
+                                const v = cellValue(arrays, j, i);
+                                line += '<td>' + (v === null ? '' : v) + '</td>';
+                            }
+                            lines[i - start] = line + '</tr>';
+                        }
+                        parts.push(lines.join(''));
+                        progress.update(end, rows.length);
+                        await nextFrame();
+                    }
+                    parts.push('</table>');
+                    download(new Blob(parts, { type: 'application/vnd.ms-excel' }), fileName + '.xls');
+                } finally {
+                    progress.done();
+                }
+            }
+
+            return { toCSV, toExcel, CHUNK_ROWS };
+        })();
+        window.TableExport = TableExport;
+'''
@@ -0,0 +1,270 @@
+# PROJECT_ROOT: engine/virtual_table.py
+"""
+Виртуализированная таблица (JS, выгружается в шаблон один раз)
+
+Раньше generateTable_* каждого графика и buildOlapTable склеивали в innerHTML
+все строки таблицы: для разреза магазин×месяц×товар это десятки тысяч узлов DOM.
+
+VirtualTable рисует только видимые строки (плюс запас) между двумя строками-
+распорками нужной высоты и перерисовывает их при прокрутке. В транспонированном
+режиме так же виртуализируются колонки по горизонтали.
+
+Сортировка идёт по типизированным ключам колонки: числа - Float64Array,
+даты 'DD.MM.YYYY' - порядковый номер дня, строки - ранг среди уникальных
+значений (naturalCompare вызывается только для уникальных). Сортируется
+Uint32Array индексов строк, сами строки не переставляются.
+
+Экспорт CSV/Excel и транспонирование работают по данным (строки в порядке
+сортировки), а не по DOM.
+"""
+
+
+def get_virtual_table_js() -> str:
+    """
+    Генерирует JS код виртуализированной таблицы (VirtualTable)
+
+    API:
+        VirtualTable.render(container, options)    - отрисовать таблицу в контейнере
+            options.rows        - массив строк-объектов (в порядке отображения)
+            options.columns     - колонки (по умолчанию Object.keys(rows[0]))
+            options.transposed  - колонки по вертикали, строки по горизонтали
+            options.headerCell(column, index) - HTML ячейки <th> заголовка (по умолчанию <th>column</th>)
+            options.cell(row, column)         - HTML содержимого <td> (по умолчанию formatValue)
+            options.rowStyle(row)             - inline стиль <tr>
+            options.maxHeight   - высота области прокрутки, px (600)
+        VirtualTable.sortIndex(rows, column, direction) - Uint32Array индексов строк
+            в порядке сортировки ('asc' | 'desc')
+        VirtualTable.sortRows(rows, column, direction)  - новый массив строк в порядке сортировки
+        VirtualTable.formatValue(value)  - число в формате ru-RU, пусто -> '-'
+
+    Returns:
+        JS код
+    """
+    return '''
+        // ============================================================================
+        // ВИРТУАЛИЗИРОВАННАЯ ТАБЛИЦА (рисуются только видимые строки)
+        // ============================================================================
+        const VirtualTable = (function () {
+
+            // Строки сверх видимых (с каждой стороны) - прокрутка без пустых полос
+            const OVERSCAN = 12;
+            // Оценка высоты строки до первого замера, px
+            const DEFAULT_ROW_HEIGHT = 34;
+            // Ширина колонки в транспонированном режиме, px
+            const COLUMN_WIDTH = 140;
+            const HEADER_WIDTH = 180;
+
+            const DATE_PATTERN = /^(\\d{2})\\.(\\d{2})\\.(\\d{4})$/;
+
+            function formatValue(value) {
+                if (typeof value === 'number') return value.toLocaleString('ru-RU');
+                return value === null || value === undefined || value === '' ? '-' : value;
+            }
+
+            /**
+             * Ключи сортировки колонки: Float64Array (NaN - пусто, всегда в конце)
+             */
+            function sortKeys(rows, column) {
+                const n = rows.length;
+                const keys = new Float64Array(n);
+                let numeric = true;
+                let dates = true;
+
+                for (let i = 0; i < n; i++) {
+                    const v = rows[i][column];
+                    if (v === null || v === undefined || v === '') continue;
+                    if (typeof v !== 'number') numeric = false;
+                    if (typeof v !== 'string' || !DATE_PATTERN.test(v)) dates = false;
+                    if (!numeric && !dates) break;
+                }
+
+                if (numeric) {
+                    for (let i = 0; i < n; i++) {
+                        const v = rows[i][column];
+                        keys[i] = typeof v === 'number' ? v : NaN;
+                    }
+                } else if (dates) {
+                    for (let i = 0; i < n; i++) {
+                        const m = DATE_PATTERN.exec(rows[i][column] || '');
+                        keys[i] = m ? parseInt(m[3]) * 10000 + parseInt(m[2]) * 100 + parseInt(m[1]) : NaN;
+                    }
+                } else {
+                    // Ранг строки среди уникальных значений (натуральный порядок)
+                    const unique = new Map();
+                    for (let i = 0; i < n; i++) {
+                        const v = rows[i][column];
+                        if (v !== null && v !== undefined && v !== '') unique.set(String(v), 0);
+                    }
+                    Array.from(unique.keys()).sort(naturalCompare).forEach((v, rank) => unique.set(v, rank));
+                    for (let i = 0; i < n; i++) {
+                        const v = rows[i][column];
+                        keys[i] = v === null || v === undefined || v === '' ? NaN : unique.get(String(v));
+                    }
+                }
+                return keys;
+            }
+
+            function sortIndex(rows, column, direction) {
+                const n = rows.length;
+                const index = new Uint32Array(n);
+                for (let i = 0; i < n; i++) index[i] = i;
+                if (!column || n < 2) return index;
+
+                const keys = sortKeys(rows, column);
+                const sign = direction === 'desc' ? -1 : 1;
+                // Стабильная сортировка: при равных ключах - исходный порядок
+                index.sort((a, b) => {
+                    const ka = keys[a], kb = keys[b];
+                    const na = ka !== ka, nb = kb !== kb;
+                    if (na || nb) return na === nb ? a - b : (na ? 1 : -1);
+                    return ka === kb ? a - b : (ka < kb ? -sign : sign);
+                });
+                return index;
+            }
+
+            function sortRows(rows, column, direction) {
+                return Array.from(sortIndex(rows, column, direction), i => rows[i]);
+            }
+
+            function renderCell(state, row, column) {
+                return state.cell ? state.cell(row, column) : formatValue(row[column]);
+            }
+
+            function rowOpen(state, row) {
+                const style = state.rowStyle ? state.rowStyle(row) : '';
+                return style ? '<tr style="' + style + '">' : '<tr>';
+            }
+
+            function spacerRow(height, colspan) {
+                return '<tr class="vt-spacer" style="height: ' + height + 'px;"><td colspan="' + colspan + '"></td></tr>';
+            }
+
+            function spacerCell(width) {
+                return width > 0 ? '<td class="vt-spacer-cell" style="width: ' + width + 'px; min-width: ' + width + 'px;"></td>' : '';
+            }
+
+            /**
+             * Видимый диапазон [first, last) по позиции прокрутки
+             */
+            function visibleRange(scrollPos, viewport, itemSize, total) {
+                const first = Math.max(0, Math.floor(scrollPos / itemSize) - OVERSCAN);
+                const last = Math.min(total, Math.ceil((scrollPos + viewport) / itemSize) + OVERSCAN);
+                return [first, last];
+            }
+
+            function drawRows(state) {
+                const scroll = state.scroll;
+                const total = state.rows.length;
+                const [first, last] = visibleRange(scroll.scrollTop, scroll.clientHeight || state.maxHeight,
+                    state.rowHeight, total);
+                if (first === state.first && last === state.last) return;
+                state.first = first;
+                state.last = last;
+
+                const parts = [];
+                if (first > 0) parts.push(spacerRow(first * state.rowHeight, state.columns.length));
+                for (let i = first; i < last; i++) {
+                    const row = state.rows[i];
+                    parts.push(rowOpen(state, row));
+                    for (let j = 0; j < state.columns.length; j++) {
+                        parts.push('<td>' + renderCell(state, row, state.columns[j]) + '</td>');
+                    }
+                    parts.push('</tr>');
+                }
+                if (last < total) parts.push(spacerRow((total - last) * state.rowHeight, state.columns.length));
+                state.body.innerHTML = parts.join('');
+
+                // Уточняем высоту строки по факту отрисовки (один раз)
+                if (!state.measured) {
+                    const firstRow = state.body.querySelector('tr:not(.vt-spacer)');
+                    if (firstRow && firstRow.offsetHeight > 0) {
+                        state.measured = true;
+                        if (Math.abs(firstRow.offsetHeight - state.rowHeight) > 1) {
+                            state.rowHeight = firstRow.offsetHeight;
+                            state.first = state.last = -1;
+                            drawRows(state);
+                        }
+                    }
+                }
+            }
+
+            function drawTransposed(state) {
+                const scroll = state.scroll;
+                const total = state.rows.length;
+                const [first, last] = visibleRange(Math.max(0, scroll.scrollLeft - HEADER_WIDTH),
+                    scroll.clientWidth || 1200, COLUMN_WIDTH, total);
+                if (first === state.first && last === state.last) return;
+                state.first = first;
+                state.last = last;
+
+                const parts = [];
+                state.columns.forEach(column => {
+                    parts.push('<tr><th>' + column + '</th>');
+                    parts.push(spacerCell(first * COLUMN_WIDTH));
+                    for (let i = first; i < last; i++) {
+                        parts.push('<td>' + renderCell(state, state.rows[i], column) + '</td>');
+                    }
+                    parts.push(spacerCell((total - last) * COLUMN_WIDTH));
+                    parts.push('</tr>');
+                });
+                state.body.innerHTML = parts.join('');
+            }
+
+            function draw(state) {
+                if (state.transposed) drawTransposed(state);
+                else drawRows(state);
+            }
+
+            function render(container, options) {
+                if (typeof container === 'string') container = document.getElementById(container);
+                if (!container) return null;
+
+                const rows = options.rows || [];
+                const columns = options.columns || (rows.length > 0 ? Object.keys(rows[0]) : []);
+                const state = {
+                    rows,
+                    columns,
+                    transposed: Boolean(options.transposed),
+                    cell: options.cell || null,
+                    rowStyle: options.rowStyle || null,
+                    maxHeight: options.maxHeight || 600,
+                    rowHeight: DEFAULT_ROW_HEIGHT,
+                    measured: false,
+                    first: -1,
+                    last: -1
+                };
+
+                let html = '<div class="vt-scroll" style="max-height: ' + state.maxHeight + 'px;">';
+                if (state.transposed) {
+                    const width = HEADER_WIDTH + rows.length * COLUMN_WIDTH;
+                    html += '<table class="chart-table vt-table vt-transposed" style="width: ' + width + 'px;"><tbody></tbody></table>';
+                } else {
+                    const headerCell = options.headerCell || (column => '<th>' + column + '</th>');
+                    html += '<table class="chart-table vt-table"><thead><tr>' +
+                        columns.map((c, i) => headerCell(c, i)).join('') +
+                        '</tr></thead><tbody></tbody></table>';
+                }
+                html += '</div>';
+                container.innerHTML = html;
+
+                state.scroll = container.querySelector('.vt-scroll');
+                state.body = container.querySelector('.vt-table tbody');
+
+                let scheduled = false;
+                state.scroll.addEventListener('scroll', () => {
+                    if (scheduled) return;
+                    scheduled = true;
+                    requestAnimationFrame(() => {
+                        scheduled = false;
+                        draw(state);
+                    });
+                });
+
+                draw(state);
+                return state;
+            }
+
+            return { render, sortIndex, sortRows, formatValue };
+        })();
+        window.VirtualTable = VirtualTable;
+'''
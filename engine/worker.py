@@ -0,0 +1,253 @@
+# PROJECT_ROOT: engine/worker.py
+"""
+Режим Web Worker: фильтрация и агрегации вне основного потока
+
+При DashboardEngine(use_worker=True) payload данных (и куба) один раз передаётся
+в выделенный Web Worker. Воркер держит свою копию DataStore, FilterIndex и
+Aggregator. На 'Применить' основной поток отправляет только состояние фильтров
+и список запросов groupBy, которые графики уже делали. Воркер возвращает:
+- номера отфильтрованных строк (Uint32Array, передаётся без копирования)
+- готовые результаты groupBy для новой версии фильтров
+
+Основной поток собирает window.filteredData по номерам строк, заполняет кэш
+Aggregator и только после этого перерисовывает графики. Графики на groupBy
+получают результат из кэша без прохода по данным. Графики, которые сами
+обходят строки, по-прежнему считают в основном потоке.
+
+Код воркера собирается из тех же генераторов, что и основной поток
+(get_data_store_js, get_filter_index_js, get_aggregation_js), и запускается
+через Blob URL: дашборд остаётся одним self-contained HTML файлом.
+"""
+import json
+from .data_store import get_data_store_js
+from .filters import get_filter_index_js
+from .aggregation import get_aggregation_js
+
+
+def _get_worker_source() -> str:
+    """
+    Исходный код воркера
+
+    Returns:
+        JS код (выполняется в контексте WorkerGlobalScope)
+    """
+    return '''
+        // Общие модули обращаются к window - в воркере это глобальный scope
+        const window = self;
+
+        ''' + get_data_store_js() + get_filter_index_js() + '''
+
+        // Те же правила выбора данных, что и в основном потоке (см. шаблон)
+        function getStoreLevelData() {
+            if (window.filteredCube && !window.productFilterActive) {
+                return window.filteredCube;
+            }
+            return window.filteredData || window.rawData;
+        }
+
+        function getStoreLevelRawData() {
+            return window.cubeData || window.rawData;
+        }
+
+        ''' + get_aggregation_js() + '''
+
+        let dataIndex = null;
+        let cubeIndex = null;
+
+        function handleInit(msg) {
+            const dataStore = DataStore.load(msg.data);
+            const cubeStore = msg.cube ? DataStore.load(msg.cube) : null;
+            window.rawData = dataStore.rows();
+            window.filteredData = window.rawData;
+            window.cubeData = cubeStore ? cubeStore.rows() : null;
+            window.filteredCube = window.cubeData;
+            window.productFilterActive = false;
+            window.filterVersion = 0;
+            dataIndex = FilterIndex.create(dataStore);
+            cubeIndex = cubeStore ? FilterIndex.create(cubeStore) : null;
+            self.postMessage({ id: msg.id, rows: dataStore.length });
+        }
+
+        function handleFilter(msg) {
+            const state = msg.state;
+            const result = dataIndex.update(state);
+            if (result.changed.length === 0) {
+                self.postMessage({ id: msg.id, changed: [] });
+                return;
+            }
+
+            const dataIds = dataIndex.indices(result.bits);
+            window.filteredData = dataIds ? Array.from(dataIds, i => window.rawData[i]) : window.rawData;
+
+            window.productFilterActive = state.products.length > 0;
+            const cubeActive = Boolean(cubeIndex && !window.productFilterActive);
+            const cubeIds = cubeActive ? cubeIndex.indices(cubeIndex.update(state).bits) : null;
+            window.filteredCube = cubeActive
+                ? (cubeIds ? Array.from(cubeIds, i => window.cubeData[i]) : window.cubeData)
+                : null;
+            window.filterVersion = msg.version;
+
+            const aggregates = (msg.requests || []).map(r => [
+                Aggregator.cacheKeyOf(r.keys, r.measures, r.options),
+                Aggregator.groupBy(r.keys, r.measures, r.options)
+            ]);
+
+            const transfer = [dataIds, cubeIds].filter(ids => ids).map(ids => ids.buffer);
+            self.postMessage({
+                id: msg.id,
+                changed: result.changed,
+                dataIds,
+                cubeIds,
+                cubeActive,
+                productFilterActive: window.productFilterActive,
+                aggregates
+            }, transfer);
+        }
+
+        self.onmessage = function (e) {
+            const msg = e.data;
+            if (msg.type === 'init') handleInit(msg);
+            else if (msg.type === 'filter') handleFilter(msg);
+            else if (msg.type === 'count') {
+                self.postMessage({ id: msg.id, count: dataIndex.count(dataIndex.match(msg.state)) });
+            }
+        };
+    '''
+
+
+def get_worker_js() -> str:
+    """
+    Генерирует JS код моста к Web Worker (DashboardWorker) для основного потока
+
+    API:
+        DashboardWorker.start(dataPayload, cubePayload) - запуск воркера и передача данных
+        DashboardWorker.isActive()                      - воркер загрузил данные
+        DashboardWorker.applyFilters(state)             - фильтрация + агрегации в воркере,
+                                                          затем onFiltersApplied(changed)
+        DashboardWorker.count(state)                    - Promise числа строк (предпросмотр)
+
+    При ошибке воркера (onerror) он останавливается, ожидающие запросы
+    отклоняются, последний запрос applyFilters выполняется в основном потоке
+    (applyFilterState), новые вызовы - тоже.
+
+    Returns:
+        JS код
+    """
+    worker_source_json = json.dumps(_get_worker_source(), ensure_ascii=False)
+    # Закрывающий тег внутри строки завершил бы <script> шаблона
+    worker_source_json = worker_source_json.replace('</', '<\\/')
+
+    return '''
+        // ============================================================================
+        // WEB WORKER: ФИЛЬТРАЦИЯ И АГРЕГАЦИИ ВНЕ ОСНОВНОГО ПОТОКА
+        // ============================================================================
+        const DashboardWorker = (function () {
+
+            const WORKER_SOURCE = ''' + worker_source_json + ''';
+
+            let worker = null;
+            let active = false;
+            let nextId = 1;
+            let versionCounter = 0;
+            let lastCountId = 0;
+            const pending = new Map();
+
+            function call(type, body, transfer) {
+                if (!worker) return Promise.reject(new Error('Web Worker не запущен'));
+                const id = nextId++;
+                return new Promise((resolve, reject) => {
+                    pending.set(id, { resolve, reject });
+                    worker.postMessage(Object.assign({ type, id }, body), transfer || []);
+                });
+            }
+
+            /**
+             * Отказ воркера: остановить его и отклонить все ожидающие запросы
+             * (их вызывающие переходят на основной поток)
+             */
+            function fail(reason) {
+                if (!worker) return;
+                console.warn('⚙️ Ошибка Web Worker, фильтрация в основном потоке:', reason);
+                active = false;
+                worker.terminate();
+                worker = null;
+                const error = new Error('Web Worker: ' + reason);
+                const entries = Array.from(pending.values());
+                pending.clear();
+                entries.forEach(entry => entry.reject(error));
+            }
+
+            function start(dataPayload, cubePayload) {
+                try {
+                    const url = URL.createObjectURL(new Blob([WORKER_SOURCE], { type: 'application/javascript' }));
+                    worker = new Worker(url);
+                } catch (e) {
+                    console.warn('⚙️ Web Worker недоступен, фильтрация в основном потоке:', e);
+                    return;
+                }
+
+                worker.onmessage = e => {
+                    const entry = pending.get(e.data.id);
+                    if (entry) {
+                        pending.delete(e.data.id);
+                        entry.resolve(e.data);
+                    }
+                };
+                worker.onerror = e => {
+                    e.preventDefault();
+                    fail(e.message);
+                };
+                worker.onmessageerror = () => fail('сообщение не разобрано');
+
+                const startTime = performance.now();
+                call('init', { data: dataPayload, cube: cubePayload }).then(res => {
+                    // Фильтры, применённые до готовности воркера, синхронизируем с его индексом
+                    if (window.lastAppliedFilterState) {
+                        call('filter', { state: window.lastAppliedFilterState, version: 0, requests: [] })
+                            .catch(() => {});
+                    }
+                    active = true;
+                    console.log('⚙️ Web Worker готов:', res.rows, 'строк за',
+                        (performance.now() - startTime).toFixed(0), 'мс');
+                }, () => { /* fail() уже сообщил; фильтры остаются в основном потоке */ });
+            }
+
+            function applyFilters(state) {
+                const version = ++versionCounter;
+                const startTime = performance.now();
+                call('filter', { state, version, requests: Aggregator.requests() }).then(res => {
+                    window.lastAppliedFilterState = state;
+                    if (res.changed.length === 0) {
+                        console.log('🔍 Фильтры не изменились');
+                        updateApplyButtonText();
+                        return;
+                    }
+
+                    window.filteredData = res.dataIds
+                        ? Array.from(res.dataIds, i => window.rawData[i])
+                        : window.rawData;
+                    window.productFilterActive = res.productFilterActive;
+                    window.filteredCube = res.cubeActive
+                        ? (res.cubeIds ? Array.from(res.cubeIds, i => window.cubeData[i]) : window.cubeData)
+                        : null;
+                    window.filterVersion = version;
+                    Aggregator.prime(version, res.aggregates);
+
+                    console.log('⚙️ Web Worker: фильтры и', res.aggregates.length, 'агрегаций за',
+                        (performance.now() - startTime).toFixed(0), 'мс');
+                    onFiltersApplied(res.changed);
+                }, () => {
+                    // Воркер упал до ответа: последнее запрошенное состояние - в основном потоке
+                    if (version === versionCounter) applyFilterState(state);
+                });
+            }
+
+            function count(state) {
+                const id = ++lastCountId;
+                return call('count', { state }).then(res => id === lastCountId ? res.count : null);
+            }
+
+            return { start, isActive: () => active, applyFilters, count };
+        })();
+        window.DashboardWorker = DashboardWorker;
+'''
@@ -2,10 +2,11 @@
 import pandas as pd
 import webbrowser
 from engine.data_processor import (
-    load_sales_data, merge_store_area,
-    merge_checks_by_type, merge_total_checks
+    load_sales_data, normalize_sales_schema, merge_store_area,
+    enrich_with_checks, build_sales_cube
 )
 from engine.dashboard import DashboardEngine
+from engine.analytics import dea_lp_payload, precompute_slice_results, decompose_store_series
 from engine.grid_manager import GridLayout, GridRow
 from charts.chart_revenue_dynamics import ChartRevenueDynamics
 from charts.chart_lifecycle_phases import ChartLifecyclePhases
@@ -22,62 +23,27 @@ from charts.chart_optimal_area_trend import ChartOptimalAreaTrend
 from charts.chart_store_cards import ChartStoreCards
 
 
-def main():
-    print("="*80)
-    print("ГЕНЕРАЦИЯ ДАШБОРДА АНАЛИТИКИ МАГАЗИНОВ")
-    print("="*80)
+# Фильтры дашборда: {колонка: {'type', 'label'}}
+FILTER_CONFIG = {
+    'Магазин': {'type': 'multiselect', 'label': 'Магазин'},
+    'Товар': {'type': 'multiselect', 'label': 'Товар'},
+    'Тип': {'type': 'multiselect', 'label': 'Тип товара'},
+    'Год': {'type': 'multiselect', 'label': 'Год'},
+    'Месяц': {'type': 'multiselect', 'label': 'Месяц'}
+}
 
-    print("\n1. Загрузка данных...")
-    df = load_sales_data('final_flat_clean.xlsx')
-    print(f"   Загружено строк: {len(df):,}")
-    print(f"   Магазинов: {df['Магазин'].nunique()}")
-    print(f"   Товаров: {df['Товар'].nunique()}")
-    print(f"   Период: {df['Год'].min()}-{df['Год'].max()}")
 
-    print("\n2. Мердж с площадью...")
-    df = merge_store_area(df, 'store.xlsx')
-    missing_area = df['Торговая площадь магазина'].isna().sum()
-    if missing_area > 0:
-        print(f"   Магазинов без площади: {missing_area}")
-    else:
-        print(f"   Площадь добавлена для всех магазинов")
+def build_tabs(cube, available_levels):
+    """
+    Создаёт графики и вкладки дашборда
 
-    print("\n2.1. Мердж с корректными чеками по типам...")
-    print(f"   До мерджа - колонки: {list(df.columns)}")
-    print(f"   До мерджа - строк: {len(df)}")
-    print(f"   Уникальные Тип в df: {df['Тип'].unique().tolist()}")
-    print(f"   Уникальные Месяц в df: {df['Месяц'].unique().tolist()[:3]}...")
-
-    # Загружаем чеки для диагностики
-    from engine.data_processor import load_checks_by_type
-    df_checks = load_checks_by_type('final_flat_clean_chek_type.xlsx')
-    print(f"   Чеки - строк: {len(df_checks)}")
-    print(f"   Чеки - колонки: {list(df_checks.columns)}")
-    print(f"   Уникальные Тип в чеках: {df_checks['Тип'].unique().tolist()}")
-    print(f"   Уникальные Месяц в чеках: {df_checks['Месяц'].unique().tolist()[:3]}...")
-
-    df = merge_checks_by_type(df, 'final_flat_clean_chek_type.xlsx')
-    print(f"   После merge_checks_by_type - строк: {len(df)}")
-    print(f"   Чеки_по_типу NaN: {df['Чеки_по_типу'].isna().sum() if 'Чеки_по_типу' in df.columns else 'колонки нет'}")
-
-    df = merge_total_checks(df, 'final_flat_clean_chek_type.xlsx')
-    print(f"   После merge_total_checks - строк: {len(df)}")
-    print(f"   Чеки_всего NaN: {df['Чеки_всего'].isna().sum() if 'Чеки_всего' in df.columns else 'колонки нет'}")
-
-    if 'Чеки_по_типу' in df.columns and 'Чеки_всего' in df.columns:
-        print(f"   Добавлены колонки: Чеки_по_типу, Чеки_всего")
-        print(f"   Пример данных:")
-        print(df[['Магазин', 'Год', 'Месяц', 'Тип', 'Чеки_по_типу', 'Чеки_всего']].head(5).to_string())
-    else:
-        print(f"   ВНИМАНИЕ: Чеки не загружены, используются данные из основного файла")
-
-    print("\n3. Определение уровней детализации...")
-    # Определяем доступные уровни на основе данных
-    from engine.filters import GlobalFilters
-    temp_filters = GlobalFilters(df)
-    available_levels = temp_filters.available_detail_levels
-    print(f"   Доступные уровни детализации: {available_levels}")
+    Args:
+        cube: куб Магазин×Год×Месяц×Тип (build_sales_cube) - для предрасчётов DEA и декомпозиции
+        available_levels: доступные уровни детализации (GlobalFilters.available_detail_levels)
 
+    Returns:
+        dict вкладок для DashboardEngine
+    """
     print("\n4. Создание графиков...")
     chart_revenue_dynamics = ChartRevenueDynamics(
         chart_id='chart_revenue_dynamics',
@@ -131,13 +97,15 @@ def main():
 
     chart_dea = ChartDEAAnalysis(
         chart_id='chart_dea_analysis',
-        width=100
+        width=100,
+        lp_results=dea_lp_payload(cube)
     )
     print("   Метод 5: DEA анализ границы эффективности")
 
     chart_time_decomposition = ChartTimeDecomposition(
         chart_id='chart_time_decomposition',
-        width=100
+        width=100,
+        decomposition=decompose_store_series(cube)
     )
     print("   График 1: Декомпозиция временных рядов")
 
@@ -206,19 +174,81 @@ def main():
         }
     }
 
+    return tabs
+
+
+def main():
+    print("="*80)
+    print("ГЕНЕРАЦИЯ ДАШБОРДА АНАЛИТИКИ МАГАЗИНОВ")
+    print("="*80)
+
+    print("\n1. Загрузка данных...")
+    df = load_sales_data('final_flat_clean.xlsx')
+    print(f"   Загружено строк: {len(df):,}")
+    print(f"   Магазинов: {df['Магазин'].nunique()}")
+    print(f"   Товаров: {df['Товар'].nunique()}")
+    print(f"   Период: {df['Год'].min()}-{df['Год'].max()}")
+
+    print("\n1.1. Нормализация типов (Categorical + понижение разрядности)...")
+    memory_before = df.memory_usage(deep=True).sum()
+    df = normalize_sales_schema(df)
+    memory_after = df.memory_usage(deep=True).sum()
+    print(f"   Память: {memory_before / 1024 / 1024:.1f} МБ -> {memory_after / 1024 / 1024:.1f} МБ "
+          f"(-{(1 - memory_after / memory_before) * 100:.0f}%)")
+
+    print("\n2. Мердж с площадью...")
+    df = merge_store_area(df, 'store.xlsx')
+    missing_area = df['Торговая площадь магазина'].isna().sum()
+    if missing_area > 0:
+        print(f"   Магазинов без площади: {missing_area}")
+    else:
+        print(f"   Площадь добавлена для всех магазинов")
+
+    print("\n2.1. Мердж с корректными чеками по типам...")
+    print(f"   До мерджа - колонки: {list(df.columns)}")
+    print(f"   До мерджа - строк: {len(df)}")
+    print(f"   Уникальные Тип в df: {df['Тип'].unique().tolist()}")
+    print(f"   Уникальные Месяц в df: {df['Месяц'].unique().tolist()[:3]}...")
+
+    # Загружаем чеки для диагностики
+    from engine.data_processor import load_checks_by_type
+    df_checks = load_checks_by_type('final_flat_clean_chek_type.xlsx')
+    print(f"   Чеки - строк: {len(df_checks)}")
+    print(f"   Чеки - колонки: {list(df_checks.columns)}")
+    print(f"   Уникальные Тип в чеках: {df_checks['Тип'].unique().tolist()}")
+    print(f"   Уникальные Месяц в чеках: {df_checks['Месяц'].unique().tolist()[:3]}...")
+
+    df = enrich_with_checks(df, 'final_flat_clean_chek_type.xlsx')
+    print(f"   После enrich_with_checks - строк: {len(df)}")
+    print(f"   Чеки_всего NaN: {df['Чеки_всего'].isna().sum() if 'Чеки_всего' in df.columns else 'колонки нет'}")
+
+    if 'Чеки_по_типу' in df.columns and 'Чеки_всего' in df.columns:
+        print(f"   Добавлены колонки: Чеки_по_типу, Чеки_всего")
+        print(f"   Пример данных:")
+        print(df[['Магазин', 'Год', 'Месяц', 'Тип', 'Чеки_по_типу', 'Чеки_всего']].head(5).to_string())
+    else:
+        print(f"   ВНИМАНИЕ: Чеки не загружены, используются данные из основного файла")
+
+    print("\n2.2. Предагрегация куба Магазин×Год×Месяц×Тип...")
+    cube = build_sales_cube(df)
+    print(f"   Строк куба: {len(cube):,} (исходных строк: {len(df):,})")
+
+    print("\n3. Определение уровней детализации...")
+    # Определяем доступные уровни на основе данных
+    from engine.filters import GlobalFilters
+    temp_filters = GlobalFilters(df)
+    available_levels = temp_filters.available_detail_levels
+    print(f"   Доступные уровни детализации: {available_levels}")
+
+    tabs = build_tabs(cube, available_levels)
     print(f"   Вкладок: {len(tabs)}")
 
     print("\n6. Генерация HTML...")
-    filter_config = {
-        'Магазин': {'type': 'multiselect', 'label': 'Магазин'},
-        'Товар': {'type': 'multiselect', 'label': 'Товар'},
-        'Тип': {'type': 'multiselect', 'label': 'Тип товара'},
-        'Год': {'type': 'multiselect', 'label': 'Год'},
-        'Месяц': {'type': 'multiselect', 'label': 'Месяц'}
-    }
-    engine = DashboardEngine(df, tabs=tabs, enable_context=False, filter_config=filter_config)
+    engine = DashboardEngine(df, tabs=tabs, enable_context=False, filter_config=FILTER_CONFIG,
+                             data_format='columnar', cube=cube, lazy_tabs=True,
+                             precomputed_results=precompute_slice_results(df))
     output_file = 'store_dashboard.html'
-    engine.generate_html(output_file)
+    engine.generate_html(output_file, binary_numeric=True)
 
     print(f"\n{'='*80}")
     print(f"ДАШБОРД СОЗДАН: {output_file}")
@@ -0,0 +1,8 @@
+# PROJECT_ROOT: tests/conftest.py
+"""
+Общие настройки тестов: корень проекта в sys.path (запуск pytest из любого каталога)
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
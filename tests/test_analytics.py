@@ -0,0 +1,162 @@
+# PROJECT_ROOT: tests/test_analytics.py
+"""
+Тесты расчётов по магазинам (engine/analytics): суммы и показатели на м²,
+DEA-балл, регрессии площадь -> показатель, предельный анализ, медианы сети
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.analytics import (
+    store_totals, add_per_m2, dea_scores, find_benchmarks,
+    linear_regression, quadratic_regression, marginal_analysis,
+    metric_medians, efficiency_status,
+)
+
+
+@pytest.fixture
+def sales():
+    """Строки продаж: магазин B встречается первым, у C нет площади, одна строка без магазина"""
+    return pd.DataFrame({
+        'Магазин': ['B', 'A', 'B', 'C', 'D', None],
+        'Сумма в чеке': [1000.0, 500.0, 600.0, 50.0, 325.0, 999.0],
+        'Наценка продажи в чеке': [500.0, 100.0, np.nan, 10.0, 50.0, 999.0],
+        'Себестоимость продажи в чеке': [500.0, 400.0, 600.0, 40.0, 275.0, 999.0],
+        'Торговая площадь магазина': [200.0, 100.0, 200.0, np.nan, 50.0, 999.0],
+    })
+
+
+def test_store_totals_sums_in_first_appearance_order(sales):
+    totals = store_totals(sales)
+
+    assert list(totals.columns) == ['store', 'area', 'revenue', 'profit', 'cost']
+    assert totals['store'].tolist() == ['B', 'A', 'C', 'D']
+    assert totals['revenue'].tolist() == [1600.0, 500.0, 50.0, 325.0]
+    # Пропуск в суммируемой колонке - ноль, пропуск площади - 0
+    assert totals['profit'].tolist() == [500.0, 100.0, 10.0, 50.0]
+    assert totals['area'].tolist() == [200.0, 100.0, 0.0, 50.0]
+
+
+def test_add_per_m2_rounds_half_up(sales):
+    stores = add_per_m2(store_totals(sales))
+
+    assert stores['revenuePerM2'].tolist() == [8.0, 5.0, 0.0, 7.0]
+    # 500 / 200 = 2.5 -> 3 (Math.round), 325 / 50 = 6.5 -> 7
+    assert stores['profitPerM2'].tolist() == [3.0, 1.0, 0.0, 1.0]
+    assert 'ebitda' not in stores.columns
+
+
+def test_add_per_m2_unrounded_adds_ebitda(sales):
+    totals = store_totals(sales)
+    stores = add_per_m2(totals, rounded=False)
+
+    assert stores['profitPerM2'].tolist() == [2.5, 1.0, 0.0, 1.0]
+    assert stores['ebitda'].tolist() == stores['profit'].tolist()
+    assert stores['ebitdaPerM2'].tolist() == stores['profitPerM2'].tolist()
+    # Исходная таблица не меняется
+    assert 'revenuePerM2' not in totals.columns
+
+
+def test_dea_scores_weights_and_order(sales):
+    stores = add_per_m2(store_totals(sales), rounded=False)
+    dea = dea_scores(stores[stores['area'] > 0])
+
+    # B - максимум всех показателей, A - минимум; у D выручка на м² посередине (6.5 из 5..8)
+    assert dea['store'].tolist() == ['B', 'D', 'A']
+    assert dea['efficiencyScore'].tolist() == [100.0, 20.0, 0.0]
+    assert dea['potentialImprovement'].tolist() == [0.0, 80.0, 100.0]
+    assert dea['isEfficient'].tolist() == [True, False, False]
+    assert dea['rank'].tolist() == [1, 2, 3]
+    assert dea['revenueNorm'].tolist() == [100.0, 50.0, 0.0]
+    assert find_benchmarks(dea).tolist() == ['B', 'B', 'B']
+
+
+def test_dea_scores_equal_values_are_all_efficient():
+    stores = add_per_m2(pd.DataFrame({
+        'store': ['A', 'B'], 'area': [100.0, 200.0], 'revenue': [1000.0, 2000.0],
+        'profit': [100.0, 200.0], 'cost': [900.0, 1800.0],
+    }), rounded=False)
+    dea = dea_scores(stores, output_metric='profit')
+
+    assert dea['efficiencyScore'].tolist() == [100.0, 100.0]
+    assert dea['isEfficient'].all()
+    assert dea['output'].tolist() == [100.0, 200.0]
+
+
+def test_linear_regression_exact_line():
+    result = linear_regression([1, 2, 3, 4], [3, 5, 7, 9])
+
+    assert result['slope'] == pytest.approx(2.0)
+    assert result['intercept'] == pytest.approx(1.0)
+    assert result['r2'] == pytest.approx(1.0)
+
+
+def test_quadratic_regression_vertex():
+    x = np.arange(5, dtype=float)
+    result = quadratic_regression(x, 1 + 4 * x - x * x)
+
+    assert (result['a'], result['b'], result['c']) == pytest.approx((1.0, 4.0, -1.0))
+    assert result['r2'] == pytest.approx(1.0)
+    assert result['optimal'] == pytest.approx(2.0)
+
+
+def test_quadratic_regression_without_maximum_has_no_optimum():
+    x = np.arange(5, dtype=float)
+    assert quadratic_regression(x, x * x)['optimal'] is None
+
+
+def test_quadratic_regression_degenerate_system():
+    # Все X равны - определитель системы нулевой
+    result = quadratic_regression([3, 3, 3], [1, 2, 3])
+    assert result == {'a': 0.0, 'b': 0.0, 'c': 0.0, 'r2': 0.0, 'optimal': None}
+
+    matrix = quadratic_regression([3, 3, 3], np.array([[1, 4], [2, 5], [3, 6]], dtype=float))
+    for name in ('a', 'b', 'c', 'r2'):
+        assert matrix[name].tolist() == [0.0, 0.0]
+    assert np.isnan(matrix['optimal']).all()
+
+
+def test_regressions_by_column_match_single_calls():
+    x = np.array([50, 120, 200, 260, 400], dtype=float)
+    y = np.column_stack([3 * x + 10 + np.array([5, -3, 2, 0, -4]),
+                         -0.01 * x * x + 6 * x + np.array([1, -2, 0, 3, -1])])
+
+    linear = linear_regression(x, y)
+    quadratic = quadratic_regression(x, y)
+    for k in range(y.shape[1]):
+        single = linear_regression(x, y[:, k])
+        assert [linear[name][k] for name in single] == pytest.approx(list(single.values()))
+        single = quadratic_regression(x, y[:, k])
+        optimal = single.pop('optimal')
+        assert [quadratic[name][k] for name in single] == pytest.approx(list(single.values()))
+        if optimal is None:
+            assert np.isnan(quadratic['optimal'][k])
+        else:
+            assert quadratic['optimal'][k] == pytest.approx(optimal)
+
+
+def test_marginal_analysis_by_area():
+    stores = pd.DataFrame({'store': ['C', 'A', 'B', 'D'], 'area': [300.0, 100.0, 200.0, 200.0],
+                           'revenue': [900.0, 500.0, 700.0, 800.0]})
+    result = marginal_analysis(stores, 'revenue', ma_window=2)
+
+    assert result['store'].tolist() == ['A', 'B', 'D', 'C']
+    # Равные площади (B, D) - предельное значение не определено и не входит в среднее
+    assert result['marginal'].tolist()[1] == pytest.approx(2.0)
+    assert np.isnan(result['marginal'].tolist()[2])
+    assert result['marginal'].tolist()[3] == pytest.approx(1.0)
+    assert result['marginalMA'].tolist()[2:] == pytest.approx([2.0, 1.0])
+
+
+def test_efficiency_status_against_medians():
+    stores = pd.DataFrame({'store': ['A', 'B', 'C', 'D'],
+                           'revenue_per_m2': [10.0, 20.0, 30.0, 0.0],
+                           'checks': [300.0, 100.0, 200.0, 0.0]})
+    medians = metric_medians(stores, ['revenue_per_m2', 'checks'])
+    # Нулевые значения в медиану не входят
+    assert medians == {'revenue_per_m2': 20.0, 'checks': 200.0}
+
+    result = efficiency_status(stores, [], medians)
+    assert result['efficiencyScore'].tolist() == [1, 1, 2, 0]
+    assert result['isEfficient'].tolist() == [False, False, True, False]
+    assert result['vsMedian'].tolist() == [-50.0, 0.0, 50.0, -100.0]
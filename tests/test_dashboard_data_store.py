@@ -0,0 +1,76 @@
+# PROJECT_ROOT: tests/test_dashboard_data_store.py
+"""
+Сборка страницы дашборда и загрузка данных DataStore в node (records и columnar)
+"""
+import json
+import re
+import shutil
+import subprocess
+
+import pytest
+
+from benchmarks.synthetic import generate_inputs
+from charts.chart_revenue_dynamics import ChartRevenueDynamics
+from engine.dashboard import DashboardEngine
+from engine.data_processor import create_date_column
+from engine.grid_manager import GridLayout, GridRow
+
+
+NODE = shutil.which('node')
+
+# Код страницы от DataStore до записей графиков (шаблон: DATA_STORE_JS, WORKER_JS, загрузка payload)
+DATA_LOADING = re.compile(r'const DataStore = \(function.*?window\.rawData = window\.dataStore\.rows\(\);', re.S)
+
+
+def sales_frame():
+    inputs = generate_inputs(stores=3, products=2, years=1, seed=1)
+    df = create_date_column(inputs['sales'].astype({'Месяц': str}))
+    return df.merge(inputs['store_area'], on='Магазин', how='left')
+
+
+def build_page(tmp_path, data_format, binary_numeric=False):
+    df = sales_frame()
+    chart = ChartRevenueDynamics(chart_id='chart_revenue_dynamics', width=100,
+                                 available_detail_levels=['month'])
+    engine = DashboardEngine(df, layout=GridLayout([GridRow([chart])]), data_format=data_format,
+                             enable_context=False)
+    path = engine.generate_html(str(tmp_path / 'dashboard.html'), binary_numeric=binary_numeric)
+    with open(path, encoding='utf-8') as f:
+        return df, f.read()
+
+
+def load_in_node(html, tmp_path):
+    """Выполнить загрузку данных страницы в node: число строк и первая запись"""
+    loading = DATA_LOADING.search(html)
+    assert loading, 'код загрузки данных не найден в странице'
+    script = tmp_path / 'load.js'
+    script.write_text(
+        'const window = globalThis;\nconsole.log = () => {};\n' + loading.group(0) +
+        '\nprocess.stdout.write(JSON.stringify({rows: window.rawData.length, first: window.rawData[0],'
+        ' decodeStats: window.dataStore.decodeStats}));\n',
+        encoding='utf-8'
+    )
+    result = subprocess.run([NODE, str(script)], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout)
+
+
+@pytest.mark.skipif(NODE is None, reason='нужен node')
+@pytest.mark.parametrize('data_format, binary_numeric', [
+    ('records', False),
+    ('columnar', False),
+    ('columnar', True),
+])
+def test_page_data_loads_in_node(tmp_path, data_format, binary_numeric):
+    df, html = build_page(tmp_path, data_format, binary_numeric)
+    loaded = load_in_node(html, tmp_path)
+
+    assert loaded['rows'] == len(df)
+    first = df.iloc[0]
+    assert loaded['first']['Магазин'] == first['Магазин']
+    assert loaded['first']['Дата'] == first['Дата'].strftime('%d.%m.%Y')
+    assert loaded['first']['Сумма в чеке'] == pytest.approx(first['Сумма в чеке'])
+    if data_format == 'records':
+        assert loaded['decodeStats'] is None
+    else:
+        assert loaded['decodeStats']['totalMs'] >= 0
@@ -0,0 +1,126 @@
+# PROJECT_ROOT: tests/test_dea_lp.py
+"""
+Тесты DEA на линейном программировании (engine/analytics/dea_lp.py, lp.py)
+
+Основные тесты идут через собственный симплекс-метод (SciPy отключается),
+сверка с HiGHS - только если SciPy установлен.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.analytics import lp
+from engine.analytics.dea_lp import dea_lp
+
+
+@pytest.fixture(autouse=True)
+def simplex_only(monkeypatch):
+    """Решатель без SciPy: двухфазный симплекс lp._simplex"""
+    monkeypatch.setattr(lp, '_SCIPY_LINPROG', False)
+
+
+def make_stores(area, revenue, profit=None):
+    """Таблица магазинов в формате store_card_metrics"""
+    area = np.asarray(area, dtype=float)
+    return pd.DataFrame({
+        'store': [f'Магазин {i + 1}' for i in range(len(area))],
+        'area': area,
+        'revenue': np.asarray(revenue, dtype=float),
+        'profit': np.asarray(revenue if profit is None else profit, dtype=float),
+    })
+
+
+def efficiency_by_store(result):
+    return result.set_index('store')['efficiency']
+
+
+def test_ccr_single_input_output_is_ratio_to_best():
+    stores = make_stores([100, 200, 150, 80, 300], [1000, 1500, 1800, 400, 2400])
+    result = dea_lp(stores, outputs=['revenue'], model='ccr', processes=1)
+
+    ratio = stores['revenue'] / stores['area']
+    expected = pd.Series((ratio / ratio.max()).to_numpy(), index=stores['store'])
+    pd.testing.assert_series_equal(efficiency_by_store(result).loc[expected.index], expected,
+                                   check_names=False, atol=1e-9)
+    assert result['store'].iloc[0] == 'Магазин 3'
+    assert result['rank'].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_ccr_matches_scipy_when_available(monkeypatch):
+    pytest.importorskip('scipy')
+    rng = np.random.default_rng(7)
+    stores = make_stores(rng.uniform(50, 500, 40), rng.uniform(1e3, 1e4, 40), rng.uniform(-1e2, 3e3, 40))
+
+    simplex = efficiency_by_store(dea_lp(stores, model='bcc', processes=1))
+    monkeypatch.setattr(lp, '_SCIPY_LINPROG', None)
+    highs = efficiency_by_store(dea_lp(stores, model='bcc', processes=1))
+    pd.testing.assert_series_equal(simplex, highs.loc[simplex.index], atol=1e-7)
+
+
+def test_bcc_not_below_ccr():
+    rng = np.random.default_rng(1)
+    stores = make_stores(rng.uniform(50, 500, 30), rng.uniform(1e3, 1e4, 30), rng.uniform(0, 3e3, 30))
+    ccr = efficiency_by_store(dea_lp(stores, model='ccr', processes=1))
+    bcc = efficiency_by_store(dea_lp(stores, model='bcc', processes=1))
+
+    assert (bcc.loc[ccr.index] >= ccr - 1e-9).all()
+    assert ((ccr > 0) & (ccr <= 1 + 1e-9)).all()
+    assert np.isclose(ccr.max(), 1.0)
+
+
+def test_duplicate_stores_get_equal_scores():
+    stores = make_stores([100, 100, 250, 400], [2000, 2000, 3000, 4200], [500, 500, 900, 700])
+    result = efficiency_by_store(dea_lp(stores, model='ccr', processes=1))
+
+    assert result['Магазин 1'] == pytest.approx(result['Магазин 2'])
+    assert result['Магазин 1'] == pytest.approx(1.0)
+
+
+def test_zero_output_store_has_zero_efficiency():
+    stores = make_stores([100, 200, 150], [1000, 0, 1800], [300, -50, 400])
+    result = dea_lp(stores, model='ccr', processes=1)
+    row = result.set_index('store').loc['Магазин 2']
+
+    assert row['efficiency'] == pytest.approx(0.0, abs=1e-9)
+    assert row['profit'] == 0.0  # отрицательный выход приравнивается к нулю
+    assert not row['isEfficient']
+
+
+def test_stores_without_area_are_excluded():
+    stores = make_stores([100, 0, 150, -5], [1000, 900, 1800, 700])
+    result = dea_lp(stores, outputs=['revenue'], processes=1)
+
+    assert sorted(result['store']) == ['Магазин 1', 'Магазин 3']
+
+
+def test_empty_input():
+    result = dea_lp(make_stores([], []), processes=1)
+
+    assert result.empty
+    assert {'store', 'efficiency', 'rank', 'peers', 'target_area', 'slack_revenue'} <= set(result.columns)
+
+
+def test_efficient_store_is_its_own_peer_and_targets_are_reachable():
+    stores = make_stores([100, 200, 150, 80], [1000, 1500, 1800, 400], [200, 500, 300, 100])
+    result = dea_lp(stores, model='bcc', processes=1).set_index('store')
+
+    for store, row in result.iterrows():
+        if row['isEfficient']:
+            assert [peer for peer, _ in row['peers']] == [store]
+        assert row['target_area'] <= row['area'] + 1e-6
+        assert row['target_revenue'] >= row['revenue'] - 1e-6
+
+
+def test_process_pool_matches_serial():
+    rng = np.random.default_rng(3)
+    stores = make_stores(rng.uniform(50, 500, 25), rng.uniform(1e3, 1e4, 25), rng.uniform(0, 3e3, 25))
+    serial = dea_lp(stores, model='bcc', processes=1)
+    pooled = dea_lp(stores, model='bcc', processes=2)
+
+    pd.testing.assert_frame_equal(serial.drop(columns='peers'), pooled.drop(columns='peers'))
+    assert serial['peers'].tolist() == pooled['peers'].tolist()
+
+
+def test_unknown_model():
+    with pytest.raises(ValueError):
+        dea_lp(make_stores([100], [1000]), model='sbm')
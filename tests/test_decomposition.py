@@ -0,0 +1,84 @@
+# PROJECT_ROOT: tests/test_decomposition.py
+"""
+Тесты классической декомпозиции рядов (engine/analytics/decomposition.py):
+сетка месяцев по порядковому номеру, пропущенные месяцы, пакетный расчёт
+"""
+import numpy as np
+import pytest
+
+from engine.analytics import SEASONAL_PERIOD, seasonal_decompose, seasonal_decompose_batch
+
+
+FIRST_PERIOD = 2022 * 12 + 1  # январь 2022
+
+PATTERN = np.array([-5, -3, -1, 0, 2, 4, 6, 4, 2, 0, -3, -6], dtype=float)
+
+
+def linear_with_season(months, first_period=FIRST_PERIOD, slope=2.0, level=100.0):
+    """Линейный тренд + сезонность PATTERN по календарному месяцу"""
+    t = np.arange(months)
+    return level + slope * t + PATTERN[(first_period + t) % SEASONAL_PERIOD]
+
+
+def test_recovers_linear_trend_and_season():
+    values = linear_with_season(48)
+    result = seasonal_decompose_batch(values[None, :], FIRST_PERIOD)
+    trend, seasonal, residual = (result[name][0] for name in ('trend', 'seasonal', 'residual'))
+
+    half = SEASONAL_PERIOD // 2
+    assert np.isnan(trend[:half]).all() and np.isnan(trend[-half:]).all()
+    np.testing.assert_allclose(trend[half:-half], (100.0 + 2.0 * np.arange(48))[half:-half])
+
+    position = (FIRST_PERIOD + np.arange(48)) % SEASONAL_PERIOD
+    np.testing.assert_allclose(seasonal, PATTERN[position] - PATTERN.mean(), atol=1e-9)
+    np.testing.assert_allclose(residual[half:-half], 0.0, atol=1e-9)
+
+
+def test_missing_month_leaves_gap_instead_of_shifting():
+    periods = FIRST_PERIOD + np.arange(36)
+    values = linear_with_season(36)
+    keep = periods != FIRST_PERIOD + 17
+
+    result = seasonal_decompose(values[keep], periods[keep])
+
+    assert len(result['periods']) == 36
+    np.testing.assert_array_equal(result['periods'], periods)
+    assert np.isnan(result['values'][17])
+    np.testing.assert_array_equal(result['values'][keep], values[keep])
+    # Тренд не определён в окнах с пропуском (13 точек вокруг него)
+    assert np.isnan(result['trend'][11:24]).all()
+    assert not np.isnan(result['trend'][6:11]).any() and not np.isnan(result['trend'][24:30]).any()
+    # Сезонность определена везде и не сдвинута пропуском
+    assert not np.isnan(result['seasonal']).any()
+    assert result['seasonal'][5] == pytest.approx(result['seasonal'][29])
+    assert np.isnan(result['residual'][17])
+
+
+def test_batch_equals_single_series_with_missing_values():
+    rng = np.random.default_rng(0)
+    values = rng.uniform(50, 150, (4, 40))
+    values[1, 5] = np.nan
+    values[2, 20:23] = np.nan
+    values[3, :14] = np.nan
+
+    batch = seasonal_decompose_batch(values, FIRST_PERIOD)
+    for i, row in enumerate(values):
+        single = seasonal_decompose_batch(row[None, :], FIRST_PERIOD)
+        for name in ('trend', 'seasonal', 'residual'):
+            np.testing.assert_allclose(batch[name][i], single[name][0], equal_nan=True)
+
+
+def test_seasonal_follows_calendar_month_of_first_period():
+    values = linear_with_season(36, first_period=FIRST_PERIOD + 4)
+    result = seasonal_decompose_batch(values[None, :], FIRST_PERIOD + 4)
+
+    # Первая точка - май: её сезонность - сезонность мая в PATTERN
+    assert result['seasonal'][0, 0] == pytest.approx(PATTERN[(FIRST_PERIOD + 4) % SEASONAL_PERIOD] - PATTERN.mean())
+
+
+def test_short_series_has_no_trend_and_zero_season():
+    result = seasonal_decompose_batch(np.arange(10, dtype=float)[None, :], FIRST_PERIOD)
+
+    assert np.isnan(result['trend']).all()
+    np.testing.assert_array_equal(result['seasonal'], 0.0)
+    assert np.isnan(result['residual']).all()
@@ -0,0 +1,74 @@
+# PROJECT_ROOT: tests/test_kmeans.py
+"""
+Тесты k-means++ (engine/analytics/kmeans.py): генератор mulberry32 как в JS,
+детерминированность разбиения при заданном seed
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.analytics import CLUSTER_FEATURES, mulberry32, standardize, kmeans, kmeans_clusters
+
+
+# Первые значения mulberry32 в браузере (clusterAnalysis: mulberry32_<id>(42), (0))
+JS_MULBERRY32 = {
+    42: [0.6011037519201636, 0.44829055899754167, 0.8524657934904099, 0.6697340414393693, 0.17481389874592423],
+    0: [0.26642920868471265, 0.0003297457005828619],
+}
+
+
+def blobs(seed=0, per_cluster=20):
+    """Три хорошо разделённых облака точек в 4 признаках"""
+    rng = np.random.default_rng(seed)
+    centers = np.array([[0, 0, 0, 0], [10, 10, 0, 0], [0, 10, 10, 10]], dtype=float)
+    return np.vstack([center + rng.normal(0, 0.5, (per_cluster, 4)) for center in centers])
+
+
+@pytest.mark.parametrize('seed', sorted(JS_MULBERRY32))
+def test_mulberry32_matches_js(seed):
+    random = mulberry32(seed)
+    assert [random() for _ in JS_MULBERRY32[seed]] == JS_MULBERRY32[seed]
+
+
+def test_mulberry32_range_and_seed_wraparound():
+    random = mulberry32(2 ** 32 + 42)
+    values = [random() for _ in range(1000)]
+    assert values[:5] == JS_MULBERRY32[42]
+    assert all(0.0 <= v < 1.0 for v in values)
+
+
+def test_kmeans_is_deterministic_for_seed():
+    X = standardize(blobs())
+    labels_a, centers_a, inertia_a = kmeans(X, 3, seed=42)
+    labels_b, centers_b, inertia_b = kmeans(X, 3, seed=42)
+
+    np.testing.assert_array_equal(labels_a, labels_b)
+    np.testing.assert_array_equal(centers_a, centers_b)
+    assert inertia_a == inertia_b
+
+
+def test_kmeans_finds_separated_clusters_for_any_seed():
+    X = standardize(blobs())
+    truth = np.repeat(np.arange(3), 20)
+    for seed in (1, 7, 42):
+        labels, centers, _ = kmeans(X, 3, seed=seed)
+        # Одна метка на облако, облака не сливаются
+        assert all(len(set(labels[truth == j])) == 1 for j in range(3))
+        assert len(set(labels)) == 3
+        assert centers.shape == (3, 4)
+
+
+def test_kmeans_clusters_auto_is_deterministic():
+    X = blobs(seed=3)
+    stores = pd.DataFrame(X, columns=CLUSTER_FEATURES)
+    stores.insert(0, 'store', [f'Магазин {i + 1}' for i in range(len(stores))])
+    stores['area'] = np.arange(len(stores), dtype=float) + 100
+
+    first, k, quality = kmeans_clusters(stores, 'auto')
+    second, _, _ = kmeans_clusters(stores.sample(frac=1, random_state=0), 'auto')
+
+    assert k == 3
+    assert [q['k'] for q in quality] == [2, 3, 4, 5, 6]
+    assert max(quality, key=lambda q: q['silhouette'])['k'] == 3
+    # Порядок строк на входе не влияет: магазины сортируются по площади
+    pd.testing.assert_frame_equal(first, second)
@@ -0,0 +1,83 @@
+# PROJECT_ROOT: tests/test_result_cache.py
+"""
+Тесты ResultCache (engine/result_cache.py): ключи фильтров Python и JS совпадают,
+предрасчёт (seed) не вытесняется вычисленными записями
+"""
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from benchmarks.synthetic import generate_inputs
+from engine.analytics import build_calendar, filter_key
+from engine.data_processor import create_date_column
+from engine.filters import get_filter_index_js
+from engine.result_cache import get_result_cache_js
+
+
+NODE = shutil.which('node')
+
+STATES = {
+    'все данные': {},
+    'год': {'years': [2023]},
+    'диапазон дат того же года': {'startDay': 20230101, 'endDay': 20231231},
+    'месяцы': {'months': ['Январь', 'Февраль']},
+    'магазины и площадь': {'magazines': ['Магазин 2', 'Магазин 1'], 'areaFilterActive': True,
+                           'minArea': 100, 'maxArea': 400},
+}
+
+
+def sales_frame():
+    return create_date_column(generate_inputs(stores=2, products=2, years=2, seed=1)['sales'])
+
+
+def run_in_node(tmp_path, df, body):
+    """Выполнить body после загрузки FilterIndex и ResultCache; rawData - строки df"""
+    rows = df[['Год', 'Месяц']].astype({'Месяц': str}).assign(Дата=df['Дата'].dt.strftime('%d.%m.%Y'))
+    script = tmp_path / 'cache.js'
+    script.write_text(
+        'const window = globalThis;\n' + get_filter_index_js() + get_result_cache_js() +
+        f'\nwindow.rawData = {rows.to_json(orient="records", force_ascii=False)};\n' + body,
+        encoding='utf-8'
+    )
+    result = subprocess.run([NODE, str(script)], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout)
+
+
+def test_year_and_equivalent_date_range_share_key():
+    calendar = build_calendar(sales_frame())
+    assert filter_key(calendar, STATES['год']) == filter_key(calendar, STATES['диапазон дат того же года'])
+    assert filter_key(calendar, STATES['год']) != filter_key(calendar, STATES['все данные'])
+
+
+@pytest.mark.skipif(NODE is None, reason='нужен node')
+def test_filter_key_matches_js(tmp_path):
+    df = sales_frame()
+    calendar = build_calendar(df)
+    js_keys = run_in_node(
+        tmp_path, df,
+        f'const states = {json.dumps(STATES, ensure_ascii=False)};\n'
+        'const keys = {};\n'
+        'Object.keys(states).forEach(name => { keys[name] = ResultCache.filterKey(states[name]); });\n'
+        'process.stdout.write(JSON.stringify(keys));\n'
+    )
+    assert js_keys == {name: filter_key(calendar, state) for name, state in STATES.items()}
+
+
+@pytest.mark.skipif(NODE is None, reason='нужен node')
+def test_seeded_entries_survive_lru_eviction(tmp_path):
+    stats = run_in_node(
+        tmp_path, sales_frame(),
+        'const seed = {};\n'
+        'for (let i = 0; i < ResultCache.MAX_ENTRIES * 2; i++) seed["seed" + i] = i;\n'
+        'seed[ResultCache.keyOf("dea", {})] = "seeded";\n'
+        'ResultCache.seed(seed);\n'
+        'for (let i = 0; i < ResultCache.MAX_ENTRIES * 2; i++) ResultCache.get("other", {i}, () => i);\n'
+        'const value = ResultCache.get("dea", {}, () => "computed");\n'
+        'process.stdout.write(JSON.stringify(Object.assign({value}, ResultCache.stats())));\n'
+    )
+    assert stats['value'] == 'seeded'
+    assert stats['seeded'] == 2 * 128 + 1
+    assert stats['evictions'] == 128